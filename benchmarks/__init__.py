@@ -0,0 +1 @@
+"""Benchmarks and the simulated Music app they run against."""
@@ -0,0 +1,318 @@
+"""Benchmark every CLI command against a simulated Music app.
+
+Usage: PYTHONPATH=src python -m benchmarks.cli_bench [--tracks N]
+       [--launch-ms MS] [--event-ms MS] [--connect-ms MS] [--http-ms MS]
+       [--repeat N] [--json]
+       [--output FILE] [--baseline FILE] [--update-baseline]
+
+Each scenario runs a command through click's CliRunner with a fresh cache
+directory and a fresh SimulatedMusic, so runs are independent and
+repeatable. For each scenario it records the median wall time, the number of
+processes launched (osascript, open), the Apple Events those scripts would
+send, catalog HTTP connections and requests, and peak Python memory.
+
+The results are compared with the baseline file when it was recorded with
+the same configuration: counts must not grow, and time and memory may grow
+by a ratio plus a small absolute slack to absorb noise. Exits with 1 on a
+regression. The test suite also checks the counts, which do not depend on
+the machine, against the baseline, so CI fails when they grow. `serve` is
+not covered; it runs until interrupted.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from click.testing import CliRunner
+
+from benchmarks.simulated_music import SimulatedMusic
+from clawtunes.cli import cli
+from clawtunes_helpers import httpclient, session
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Metric -> (allowed ratio, absolute slack) before it counts as a regression.
+THRESHOLDS = {
+    "processes": (1.0, 0),
+    "apple_events": (1.0, 0),
+    "http_connections": (1.0, 0),
+    "http_requests": (1.0, 0),
+    "wall_ms": (1.3, 5.0),
+    "peak_kib": (1.2, 64.0),
+}
+
+# The metrics that do not depend on the speed of the machine.
+COUNTS = ("processes", "apple_events", "http_connections", "http_requests")
+
+
+@dataclass(frozen=True)
+class Config:
+    tracks: int = 2000
+    launch_ms: float = 20.0
+    event_ms: float = 0.2
+    connect_ms: float = 30.0
+    http_ms: float = 20.0
+    repeat: int = 3
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    argv: tuple[str, ...]
+    input: str | None = None
+    # Commands run before the measured one, e.g. to have something to undo,
+    # and what they read from stdin.
+    setup: tuple[tuple[str, ...], ...] = ()
+    setup_input: str | None = None
+
+
+SCENARIOS = [
+    Scenario("play song", ("-1", "play", "song", "Love")),
+    Scenario("play song no exact", ("-1", "play", "song", "Track 1")),
+    Scenario(
+        "play song remembered",
+        ("play", "song", "Love"),
+        setup=(("play", "song", "Love"),),
+        setup_input="1\n",
+    ),
+    Scenario("play album", ("-1", "play", "album", "Album 7")),
+    Scenario("play playlist", ("-1", "play", "playlist", "Playlist 3")),
+    Scenario("pause", ("pause",)),
+    Scenario("resume", ("resume",)),
+    Scenario("next", ("next",)),
+    Scenario("prev", ("prev",)),
+    Scenario("status", ("status",)),
+    Scenario("status --json", ("status", "--json")),
+    Scenario("history", ("history",), setup=(("play", "song", "Track 14 "),)),
+    Scenario("volume", ("volume",)),
+    Scenario("volume 30", ("volume", "30")),
+    Scenario("volume +5", ("volume", "+5")),
+    Scenario("mute", ("mute",)),
+    Scenario("unmute", ("unmute",), setup=(("mute",),)),
+    Scenario("shuffle on", ("shuffle", "on")),
+    Scenario("repeat all", ("repeat", "all")),
+    Scenario("love", ("love",)),
+    Scenario("dislike", ("dislike",)),
+    Scenario("search", ("search", "Love")),
+    Scenario("search --playlists", ("search", "Playlist", "--playlists")),
+    Scenario("playlists", ("playlists",)),
+    Scenario("playlist create", ("playlist", "create", "Benchmark Mix")),
+    Scenario("playlist add", ("-1", "playlist", "add", "Playlist 1", "Love")),
+    Scenario("playlist remove", ("-1", "playlist", "remove", "Playlist 0", "Track")),
+    Scenario("dedupe", ("dedupe",)),
+    Scenario("dedupe --playlist", ("dedupe", "--playlist", "Road Trip")),
+    Scenario(
+        "dedupe --remove",
+        ("dedupe", "--playlist", "Road Trip", "--remove", "--yes"),
+    ),
+    Scenario("airplay", ("airplay",)),
+    Scenario("airplay device", ("airplay", "Kitchen")),
+    Scenario("catalog search", ("-1", "catalog", "search", "Love")),
+    Scenario(
+        "catalog search cached",
+        ("-1", "catalog", "search", "Love"),
+        setup=(("-1", "catalog", "search", "love"),),
+    ),
+    Scenario(
+        "catalog lookup",
+        ("catalog", "lookup"),
+        input="\n".join(str(900000 + i) for i in range(1000)) + "\n",
+    ),
+    Scenario(
+        "catalog import",
+        ("catalog", "import", "-", "--playlist", "Imported"),
+        input="".join(f"Artist {i} - Track {i} Song\n" for i in range(1, 41)),
+    ),
+    Scenario(
+        "batch",
+        ("batch",),
+        input="pause\nvolume 30\nshuffle on\nnext\n-1 play playlist 'Playlist 3'\n",
+    ),
+    Scenario(
+        "shell",
+        ("shell",),
+        input="search Love --no-albums\nsearch Love --no-albums\nplay 2\nexit\n",
+    ),
+]
+
+
+@contextlib.contextmanager
+def simulated(config: Config) -> Iterator[SimulatedMusic]:
+    """Install a fresh SimulatedMusic with an empty cache directory."""
+    # The stand-in catalog server has no rate limit to respect.
+    env = {"CLAWTUNES_CATALOG_RATE": "0"}
+    saved = {name: os.environ.get(name) for name in [*env, "CLAWTUNES_CACHE_DIR"]}
+    with (
+        tempfile.TemporaryDirectory() as cache,
+        SimulatedMusic(
+            tracks=config.tracks,
+            launch_latency=config.launch_ms / 1000,
+            event_latency=config.event_ms / 1000,
+            connect_latency=config.connect_ms / 1000,
+            http_latency=config.http_ms / 1000,
+        ) as music,
+    ):
+        os.environ.update(env, CLAWTUNES_CACHE_DIR=cache)
+        try:
+            yield music
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            # Pooled connections to this run's catalog server.
+            httpclient.close()
+            # The shell keeps its session enabled after it returns.
+            session._enabled = False
+            session.invalidate()
+
+
+def _run_once(scenario: Scenario, config: Config, trace_memory: bool) -> dict:
+    runner = CliRunner()
+    with simulated(config) as music:
+        for argv in scenario.setup:
+            runner.invoke(cli, list(argv), input=scenario.setup_input)
+        music.reset_counters()
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = runner.invoke(cli, list(scenario.argv), input=scenario.input)
+        wall_ms = (time.perf_counter() - started) * 1000
+        peak_kib = 0.0
+        if trace_memory:
+            peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        return {
+            "exit_code": result.exit_code,
+            "wall_ms": wall_ms,
+            "processes": music.launches,
+            "apple_events": music.events,
+            "http_connections": music.http_connections,
+            "http_requests": music.http_requests,
+            "peak_kib": peak_kib,
+        }
+
+
+def run_scenario(scenario: Scenario, config: Config) -> dict:
+    """Return the metrics of one scenario.
+
+    Time is the median over config.repeat runs; memory comes from a separate
+    run, since tracing allocations slows everything else down.
+    """
+    runs = [_run_once(scenario, config, False) for _ in range(config.repeat)]
+    traced = _run_once(scenario, config, True)
+    return {
+        **runs[-1],
+        "wall_ms": round(statistics.median(r["wall_ms"] for r in runs), 2),
+        "peak_kib": round(traced["peak_kib"], 1),
+    }
+
+
+def run_all(config: Config, scenarios: list[Scenario] = SCENARIOS) -> dict:
+    return {scenario.name: run_scenario(scenario, config) for scenario in scenarios}
+
+
+def compare(
+    results: dict, baseline: dict, only: Iterable[str] = THRESHOLDS
+) -> list[str]:
+    """Return a description of every regression in the metrics in `only`."""
+    regressions = []
+    for name, metrics in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if metrics["exit_code"] != before["exit_code"]:
+            regressions.append(
+                f"{name}: exit code {before['exit_code']} -> {metrics['exit_code']}"
+            )
+        for metric in only:
+            ratio, slack = THRESHOLDS[metric]
+            if metrics[metric] > before[metric] * ratio + slack:
+                regressions.append(
+                    f"{name}: {metric} {before[metric]} -> {metrics[metric]}"
+                )
+    return regressions
+
+
+def _print_table(results: dict, regressions: list[str]) -> None:
+    regressed = {line.split(":", 1)[0] for line in regressions}
+    print(
+        f"{'scenario':<20} {'exit':>4} {'wall ms':>9} {'procs':>6} "
+        f"{'events':>7} {'conns':>5} {'http':>5} {'peak KiB':>9}"
+    )
+    for name, m in results.items():
+        flag = "  REGRESSED" if name in regressed else ""
+        print(
+            f"{name:<20} {m['exit_code']:>4} {m['wall_ms']:>9.1f} "
+            f"{m['processes']:>6} {m['apple_events']:>7} "
+            f"{m['http_connections']:>5} {m['http_requests']:>5} "
+            f"{m['peak_kib']:>9.1f}{flag}"
+        )
+    for line in regressions:
+        print(f"regression: {line}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = Config()
+    parser.add_argument("--tracks", type=int, default=defaults.tracks)
+    parser.add_argument("--launch-ms", type=float, default=defaults.launch_ms)
+    parser.add_argument("--event-ms", type=float, default=defaults.event_ms)
+    parser.add_argument("--connect-ms", type=float, default=defaults.connect_ms)
+    parser.add_argument("--http-ms", type=float, default=defaults.http_ms)
+    parser.add_argument("--repeat", type=int, default=defaults.repeat)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", type=Path, help="Also write results to a file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Save results as baseline"
+    )
+    args = parser.parse_args()
+
+    config = Config(
+        args.tracks,
+        args.launch_ms,
+        args.event_ms,
+        args.connect_ms,
+        args.http_ms,
+        args.repeat,
+    )
+    results = run_all(config)
+    report: dict[str, Any] = {"config": asdict(config), "scenarios": results}
+
+    regressions: list[str] = []
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["config"] != report["config"]:
+            print(
+                f"Not comparing: {args.baseline} was recorded with "
+                f"{baseline['config']}",
+                file=sys.stderr,
+            )
+        else:
+            regressions = compare(results, baseline["scenarios"])
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.json:
+        print(json.dumps({**report, "regressions": regressions}, indent=2))
+    else:
+        _print_table(results, regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
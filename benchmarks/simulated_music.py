@@ -0,0 +1,584 @@
+"""A simulated Music app for benchmarks that run on any OS.
+
+SimulatedMusic replaces subprocess.run while installed and serves a
+stand-in iTunes API on a local port, pointed at by CLAWTUNES_ITUNES_URL.
+Every osascript launch is answered from an in-memory library, so the real
+AppleScript wrappers, parsers and CLI commands run unmodified. Each script
+is recognised by its text; its answer comes with an estimate of the Apple
+Events the real script would send to Music, counting the events it sends per
+call and per loop iteration. Launches, events, catalog connections and
+catalog requests cost configurable simulated latency.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+FS = "\x1f"
+RS = "\x1e"
+GS = "\x1d"
+
+
+@dataclass
+class Track:
+    track_id: int
+    database_id: int
+    name: str
+    artist: str
+    album: str
+    duration: float
+    rating: int = 0
+    play_count: int = 0
+
+
+@dataclass
+class Answer:
+    stdout: str = ""
+    events: int = 1
+    stderr: str = ""
+    returncode: int = 0
+
+
+@dataclass
+class SimulatedMusic:
+    """In-memory library and player answering the scripts clawtunes sends."""
+
+    tracks: int = 2000
+    launch_latency: float = 0.0
+    event_latency: float = 0.0
+    http_latency: float = 0.0
+    connect_latency: float = 0.0
+    launches: int = 0
+    events: int = 0
+    http_connections: int = 0
+    http_requests: int = 0
+    library: list[Track] = field(default_factory=list)
+    playlists: dict[str, list[Track]] = field(default_factory=dict)
+    devices: list[tuple[str, str, bool, bool]] = field(default_factory=list)
+    state: dict[str, Any] = field(default_factory=dict)
+    _original_run: Callable[..., Any] | None = None
+    _catalog: ThreadingHTTPServer | None = None
+    _original_url: str | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self.library = [
+            Track(
+                track_id=1000 + i,
+                database_id=50000 + i,
+                # One song is called just "Love", so searching for it finds
+                # an exact match among a few hundred partial ones.
+                name=(
+                    "Love"
+                    if i == 98
+                    else f"Track {i} {'Love' if i % 7 == 0 else 'Song'}"
+                ),
+                artist=f"Artist {i % 50}",
+                album=f"Album {i % 200}",
+                duration=180.0 + i % 120,
+                rating=20 * (i % 6),
+                play_count=i % 13,
+            )
+            for i in range(self.tracks)
+        ]
+        self.playlists = {
+            f"Playlist {p}": self.library[p * 10 : p * 10 + 25] for p in range(20)
+        }
+        # A playlist with every entry twice, for dedupe.
+        self.playlists["Road Trip"] = self.library[:100] * 2
+        self.devices = [
+            ("Computer", "computer", True, True),
+            ("Kitchen", "AirPlay device", True, False),
+            ("Bedroom", "AirPlay device", False, False),
+        ]
+        self.state = {
+            "player_state": "playing",
+            "volume": 50,
+            "muted": False,
+            "shuffle": False,
+            "repeat": "off",
+            "current": self.library[0],
+            "position": 42.0,
+            "favorited": False,
+            "disliked": False,
+        }
+
+    # Installation
+
+    def install(self) -> "SimulatedMusic":
+        self._original_run = subprocess.run
+        subprocess.run = self.run  # type: ignore[assignment]
+        self._catalog = _CatalogServer(self)
+        threading.Thread(
+            target=self._catalog.serve_forever, args=(0.01,), daemon=True
+        ).start()
+        self._original_url = os.environ.get("CLAWTUNES_ITUNES_URL")
+        os.environ["CLAWTUNES_ITUNES_URL"] = (
+            f"http://127.0.0.1:{self._catalog.server_port}"
+        )
+        return self
+
+    def uninstall(self) -> None:
+        if self._original_run is not None:
+            subprocess.run = self._original_run  # type: ignore[assignment]
+            self._original_run = None
+        if self._catalog is not None:
+            self._catalog.shutdown()
+            self._catalog.server_close()
+            self._catalog = None
+            if self._original_url is None:
+                os.environ.pop("CLAWTUNES_ITUNES_URL", None)
+            else:
+                os.environ["CLAWTUNES_ITUNES_URL"] = self._original_url
+
+    def __enter__(self) -> "SimulatedMusic":
+        return self.install()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.uninstall()
+
+    def reset_counters(self) -> None:
+        self.launches = 0
+        self.events = 0
+        self.http_connections = 0
+        self.http_requests = 0
+
+    # subprocess.run replacement
+
+    def run(self, command: Sequence[str], *args: Any, **kwargs: Any) -> Any:
+        program = command[0]
+        if program == "open":
+            self.launches += 1
+            self._sleep(self.launch_latency)
+            return subprocess.CompletedProcess(command, 0, "", "")
+        if program != "osascript" or len(command) < 3 or command[1] != "-e":
+            raise RuntimeError(f"Unexpected command in benchmark: {command[:2]}")
+        script, argv = command[2], list(command[3:])
+        self.launches += 1
+        answer = self.answer(script, argv)
+        self.events += answer.events
+        self._sleep(self.launch_latency + answer.events * self.event_latency)
+        # osascript prints the result followed by a newline.
+        return subprocess.CompletedProcess(
+            command, answer.returncode, answer.stdout + "\n", answer.stderr
+        )
+
+    # iTunes API, called from the catalog server's threads
+
+    def catalog_connected(self) -> None:
+        with self._lock:
+            self.http_connections += 1
+        # Stands in for the TCP and TLS handshakes.
+        self._sleep(self.connect_latency)
+
+    def catalog_response(self, path: str) -> dict[str, Any]:
+        with self._lock:
+            self.http_requests += 1
+        self._sleep(self.http_latency)
+        parts = urllib.parse.urlsplit(path)
+        query = urllib.parse.parse_qs(parts.query)
+        if parts.path == "/lookup":
+            ids = query.get("id", [""])[0].split(",")
+            results = [self._catalog_item("song", "Lookup", int(i)) for i in ids]
+            return {"resultCount": len(results), "results": results}
+        term = query.get("term", [""])[0]
+        entity = query.get("entity", ["song"])[0]
+        limit = int(query.get("limit", ["50"])[0])
+        results = [
+            self._catalog_item(entity, term, 900000 + i) for i in range(min(limit, 50))
+        ]
+        return {"resultCount": len(results), "results": results}
+
+    @staticmethod
+    def _catalog_item(entity: str, term: str, item_id: int) -> dict[str, Any]:
+        url = f"https://music.apple.com/us/{entity}/{item_id}"
+        if entity == "album":
+            return {
+                "wrapperType": "collection",
+                "collectionId": item_id,
+                "collectionName": f"{term} Album {item_id}",
+                "artistName": f"Catalog Artist {item_id}",
+                "collectionViewUrl": url,
+            }
+        if entity == "musicArtist":
+            return {
+                "wrapperType": "artist",
+                "artistId": item_id,
+                "artistName": f"{term} Artist {item_id}",
+                "primaryGenreName": "Rock",
+                "artistLinkUrl": url,
+            }
+        return {
+            "wrapperType": "track",
+            "trackId": item_id,
+            "trackName": f"{term} {item_id}",
+            "artistName": f"Catalog Artist {item_id}",
+            "collectionName": f"Catalog Album {item_id}",
+            "trackViewUrl": url,
+        }
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    # Script recognition
+
+    def answer(self, script: str, argv: list[str]) -> Answer:
+        for marker, handler in self._handlers():
+            if marker in script:
+                return handler(script, argv)
+        raise RuntimeError(f"Simulated Music does not understand:\n{script}")
+
+    def _handlers(self) -> list[tuple[str, Callable[[str, list[str]], Answer]]]:
+        # Most specific markers first.
+        return [
+            ("database ID of every track of src", self._bulk_tracks),
+            ("set removedCount to 0", self._remove_entries),
+            ("set addedCount to 0", self._add_entries),
+            ("set completed to 0", self._steps),
+            ("every track of targetPlaylist whose name contains", self._search_in),
+            ("every track whose name contains query", self._search_songs),
+            ("every track whose album contains query", self._search_albums),
+            ("every playlist whose name contains query", self._search_playlists),
+            ("every track whose album is albumName", self._play_album),
+            ("play playlist playlistName", self._play_playlist),
+            ("first track whose id is trackId", self._track_by_id),
+            ("first track whose database ID is trackId", self._track_by_database_id),
+            ("every track of targetPlaylist whose id is", self._remove_song),
+            ("make new playlist", self._create_playlist),
+            ("every user playlist", self._all_playlists),
+            ("every AirPlay device", self._airplay_devices),
+            ("first AirPlay device whose name", self._select_airplay),
+            ("set settings to playerState", self._player_status),
+            ("not_playing", self._now_playing),
+            ("return player state as string", self._player_state),
+            ("set favorited of current track", self._set_flag("favorited")),
+            ("set disliked of current track", self._set_flag("disliked")),
+            ("set isFavorited to favorited", self._love_state),
+            ("return (sound volume as string)", self._get_volume),
+            ("set sound volume to", self._set_volume),
+            ("shuffle enabled as string", self._get_shuffle),
+            ("set shuffle enabled", self._set_shuffle),
+            ("song repeat as string", self._get_repeat),
+            ("set song repeat", self._set_repeat),
+            ("    pause\n", self._transport("paused")),
+            ("    play\n", self._transport("playing")),
+            ("next track", self._transport("playing")),
+            ("back track", self._transport("playing")),
+        ]
+
+    # Helpers
+
+    def _limit(self, items: list[Any], value: str) -> list[Any]:
+        limit = int(value)
+        return items[:limit] if limit > 0 else items
+
+    def _started_track(self, track: Track) -> str:
+        self.state["current"] = track
+        self.state["position"] = 0.0
+        self.state["player_state"] = "playing"
+        return FS.join([track.name, track.artist, track.album, str(track.duration)])
+
+    def _find_track(self, track_id: str) -> Track | None:
+        return next((t for t in self.library if t.track_id == int(track_id)), None)
+
+    @staticmethod
+    def _track_line(track: Track) -> str:
+        return f"{track.track_id}|{track.name}|{track.artist}|{track.album}"
+
+    # Library
+
+    def _bulk_tracks(self, script: str, argv: list[str]) -> Answer:
+        name = argv[0]
+        if name and name not in self.playlists:
+            return Answer("playlist_not_found", events=1)
+        tracks = self.playlists[name] if name else self.library
+        columns = [
+            RS.join(str(t.database_id) for t in tracks),
+            RS.join(t.name for t in tracks),
+            RS.join(t.artist for t in tracks),
+            RS.join(t.album for t in tracks),
+            RS.join(str(t.duration) for t in tracks),
+        ]
+        return Answer(GS.join(columns), events=6 if name else 5)
+
+    def _add_entries(self, script: str, argv: list[str]) -> Answer:
+        events = 2
+        if argv[0] not in self.playlists:
+            self.playlists[argv[0]] = []
+            events += 1
+        by_database_id = {str(t.database_id): t for t in self.library}
+        added = [by_database_id[i] for i in argv[1:] if i in by_database_id]
+        self.playlists[argv[0]].extend(added)
+        return Answer(str(len(added)), events=events + 2 * len(argv[1:]))
+
+    def _remove_entries(self, script: str, argv: list[str]) -> Answer:
+        entries = self.playlists.get(argv[0])
+        if entries is None:
+            return Answer("playlist_not_found", events=1)
+        removed = 0
+        pairs = list(zip(argv[1::2], argv[2::2]))
+        for index, database_id in pairs:
+            i = int(index) - 1
+            if i < len(entries) and entries[i].database_id == int(database_id):
+                del entries[i]
+                removed += 1
+        return Answer(str(removed), events=3 + 2 * len(pairs))
+
+    def _steps(self, script: str, argv: list[str]) -> Answer:
+        steps = script.count("set completed to") - 1
+        for line in script.splitlines():
+            line = line.strip()
+            if line.startswith("set sound volume to "):
+                self.state["volume"] = int(line.rsplit(" ", 1)[1])
+            elif line.startswith("set shuffle enabled to "):
+                self.state["shuffle"] = line.endswith("true")
+            elif line.startswith("set song repeat to "):
+                self.state["repeat"] = line.rsplit(" ", 1)[1]
+        return Answer(str(steps), events=steps)
+
+    @staticmethod
+    def _columns(*columns: Sequence[object]) -> str:
+        return GS.join(RS.join(str(value) for value in column) for column in columns)
+
+    def _search_songs(self, script: str, argv: list[str]) -> Answer:
+        matches = [t for t in self.library if argv[0] in t.name]
+        count: list[object] = []
+        events = 8
+        if len(argv) > 1:
+            # Only a range, after counting the matches.
+            count = [len(matches)]
+            events += 1
+            first, last = int(argv[1]), min(int(argv[2]), len(matches))
+            if first > last:
+                return Answer(str(len(matches)), events=events - 7)
+            matches = matches[first - 1 : last]
+        columns = self._columns(
+            [t.track_id for t in matches],
+            [t.rating for t in matches],
+            [t.play_count for t in matches],
+            ["" for t in matches],
+            [t.artist for t in matches],
+            [t.album for t in matches],
+            [t.name for t in matches],
+            count,
+        )
+        # The reference, then one event per property.
+        return Answer(columns, events=events)
+
+    def _search_in(self, script: str, argv: list[str]) -> Answer:
+        tracks = self.playlists.get(argv[0])
+        if tracks is None:
+            return Answer("", events=1)
+        found = [t for t in tracks if argv[1] in t.name]
+        matches = self._limit(found, argv[2])
+        lines = [self._track_line(t) for t in matches]
+        if len(argv) > 3:
+            # From a first index on, after the number of matches.
+            lines = [str(len(found)), *lines[int(argv[3]) - 1 :]]
+            matches = matches[int(argv[3]) - 1 :]
+        return Answer("\n".join(lines), events=2 + 4 * len(matches))
+
+    def _search_albums(self, script: str, argv: list[str]) -> Answer:
+        matches = [t for t in self.library if argv[0] in t.album]
+        columns = self._columns(
+            [t.album for t in matches],
+            [t.rating for t in matches],
+            [t.play_count for t in matches],
+            ["" for t in matches],
+            [t.artist for t in matches],
+        )
+        return Answer(columns, events=6)
+
+    def _search_playlists(self, script: str, argv: list[str]) -> Answer:
+        names = [n for n in self.playlists if argv[0] in n]
+        columns = self._columns(names, [len(self.playlists[n]) for n in names])
+        # The reference, the names, then one count per playlist.
+        return Answer(columns, events=2 + len(names))
+
+    def _all_playlists(self, script: str, argv: list[str]) -> Answer:
+        first, last = int(argv[0]), int(argv[1])
+        listed = list(self.playlists.items())[first - 1 : last]
+        lines = [str(len(self.playlists))]
+        lines += [f"{n}|{len(t)}" for n, t in listed]
+        return Answer("\n".join(lines), events=1 + 2 * len(listed))
+
+    # Playing
+
+    def _track_by_id(self, script: str, argv: list[str]) -> Answer:
+        track = self._find_track(argv[-1])
+        if track is None:
+            return Answer(stderr="Can't get track", returncode=1, events=1)
+        if "duplicate targetTrack" in script:
+            playlist = self.playlists.get(argv[0])
+            if playlist is None:
+                return Answer("playlist_not_found", events=1)
+            playlist.append(track)
+            return Answer("ok", events=4)
+        return Answer(self._started_track(track), events=7)
+
+    def _track_by_database_id(self, script: str, argv: list[str]) -> Answer:
+        track = next((t for t in self.library if t.database_id == int(argv[0])), None)
+        if track is None:
+            return Answer(stderr="Can't get track", returncode=1, events=1)
+        return Answer(self._started_track(track), events=7)
+
+    def _play_album(self, script: str, argv: list[str]) -> Answer:
+        tracks = [t for t in self.library if t.album == argv[0]]
+        if not tracks:
+            return Answer("not_found", events=1)
+        self.playlists["Clawtunes Queue"] = list(tracks)
+        started = self._started_track(tracks[0])
+        return Answer("ok" + FS + started, events=9 + len(tracks))
+
+    def _play_playlist(self, script: str, argv: list[str]) -> Answer:
+        tracks = self.playlists.get(argv[0])
+        if not tracks:
+            return Answer(stderr="Can't get playlist", returncode=1, events=1)
+        return Answer(self._started_track(tracks[0]), events=6)
+
+    def _transport(self, player_state: str) -> Callable[[str, list[str]], Answer]:
+        def handler(script: str, argv: list[str]) -> Answer:
+            self.state["player_state"] = player_state
+            return Answer("", events=1)
+
+        return handler
+
+    # Playlists
+
+    def _create_playlist(self, script: str, argv: list[str]) -> Answer:
+        if argv[0] in self.playlists:
+            return Answer("exists", events=1)
+        self.playlists[argv[0]] = []
+        return Answer("ok", events=2)
+
+    def _remove_song(self, script: str, argv: list[str]) -> Answer:
+        tracks = self.playlists.get(argv[0])
+        if tracks is None:
+            return Answer("playlist_not_found", events=1)
+        matches = [t for t in tracks if t.track_id == int(argv[1])]
+        if not matches:
+            return Answer("track_not_found", events=3)
+        tracks.remove(matches[0])
+        return Answer("ok", events=4)
+
+    # Status
+
+    def _current_fields(self) -> list[str]:
+        track = self.state["current"]
+        return [
+            track.name,
+            track.artist,
+            track.album,
+            str(track.duration),
+            str(self.state["position"]),
+        ]
+
+    def _player_status(self, script: str, argv: list[str]) -> Answer:
+        state = self.state
+        fields = [
+            state["player_state"],
+            str(state["volume"]),
+            str(state["muted"]).lower(),
+            str(state["shuffle"]).lower(),
+            state["repeat"],
+            "true",
+            *self._current_fields(),
+            str(state["favorited"]).lower(),
+            str(state["disliked"]).lower(),
+        ]
+        return Answer(FS.join(fields), events=13)
+
+    def _now_playing(self, script: str, argv: list[str]) -> Answer:
+        return Answer(FS.join(self._current_fields()), events=6)
+
+    def _player_state(self, script: str, argv: list[str]) -> Answer:
+        return Answer(self.state["player_state"], events=1)
+
+    def _set_flag(self, name: str) -> Callable[[str, list[str]], Answer]:
+        def handler(script: str, argv: list[str]) -> Answer:
+            self.state[name] = True
+            return Answer("", events=2)
+
+        return handler
+
+    def _love_state(self, script: str, argv: list[str]) -> Answer:
+        favorited = str(self.state["favorited"]).lower()
+        disliked = str(self.state["disliked"]).lower()
+        return Answer(f"{favorited}|{disliked}", events=4)
+
+    # Settings
+
+    def _get_volume(self, script: str, argv: list[str]) -> Answer:
+        volume, muted = self.state["volume"], str(self.state["muted"]).lower()
+        return Answer(f"{volume}|{muted}", events=2)
+
+    def _set_volume(self, script: str, argv: list[str]) -> Answer:
+        line = next(
+            line for line in script.splitlines() if "set sound volume to" in line
+        )
+        self.state["volume"] = int(line.rsplit(" ", 1)[1])
+        return Answer("", events=1)
+
+    def _get_shuffle(self, script: str, argv: list[str]) -> Answer:
+        return Answer(str(self.state["shuffle"]).lower(), events=1)
+
+    def _set_shuffle(self, script: str, argv: list[str]) -> Answer:
+        self.state["shuffle"] = argv[0] == "on"
+        return Answer("", events=1)
+
+    def _get_repeat(self, script: str, argv: list[str]) -> Answer:
+        return Answer(self.state["repeat"], events=1)
+
+    def _set_repeat(self, script: str, argv: list[str]) -> Answer:
+        self.state["repeat"] = argv[0]
+        return Answer("", events=1)
+
+    # AirPlay
+
+    def _airplay_devices(self, script: str, argv: list[str]) -> Answer:
+        lines = "\n".join(
+            f"{n}|{k}|{str(a).lower()}|{str(s).lower()}" for n, k, a, s in self.devices
+        )
+        return Answer(lines, events=1 + 4 * len(self.devices))
+
+    def _select_airplay(self, script: str, argv: list[str]) -> Answer:
+        selected = argv[1] == "true"
+        self.devices = [
+            (n, k, a, selected if n == argv[0] else s) for n, k, a, s in self.devices
+        ]
+        return Answer("", events=2)
+
+
+class _CatalogHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_CatalogServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.music.catalog_connected()
+
+    def do_GET(self) -> None:
+        body = json.dumps(self.server.music.catalog_response(self.path)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _CatalogServer(ThreadingHTTPServer):
+    def __init__(self, music: SimulatedMusic) -> None:
+        super().__init__(("127.0.0.1", 0), _CatalogHandler)
+        self.music = music
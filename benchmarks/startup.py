@@ -0,0 +1,84 @@
+"""Measure clawtunes startup time and check it against a budget.
+
+Usage: python benchmarks/startup.py [--runs N] [--json]
+
+Each measurement runs in a fresh interpreter. Times are reported as the
+median over all runs, minus the startup time of a bare interpreter, so the
+budget is about clawtunes rather than the interpreter. Exits with 1 if any
+measurement exceeds its budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Milliseconds above bare interpreter startup.
+BUDGET_MS = {
+    "import clawtunes.fast": 40.0,
+    "import clawtunes.cli": 100.0,
+    "clawtunes --help": 150.0,
+    "clawtunes pause --help": 200.0,
+}
+
+COMMANDS = {
+    # What `clawtunes pause/next/volume N` loads before running osascript.
+    "import clawtunes.fast": ["-c", "import clawtunes.fast"],
+    "import clawtunes.cli": ["-c", "import clawtunes.cli"],
+    "clawtunes --help": ["-m", "clawtunes.cli", "--help"],
+    # Loads a real command and its helpers without talking to Music.
+    "clawtunes pause --help": ["-m", "clawtunes.cli", "pause", "--help"],
+}
+
+
+def _wall_time(args: list[str], env: dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(runs: int) -> dict[str, float]:
+    """Return the median overhead in milliseconds of each measurement."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(SRC),
+        "CLAWTUNES_NO_DAEMON": "1",
+    }
+    baseline = statistics.median(_wall_time(["-c", "pass"], env) for _ in range(runs))
+    return {
+        name: statistics.median(_wall_time(args, env) for _ in range(runs)) - baseline
+        for name, args in COMMANDS.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    over_budget = [name for name, ms in results.items() if ms > BUDGET_MS[name]]
+    if args.json:
+        print(json.dumps({"results_ms": results, "budget_ms": BUDGET_MS}, indent=2))
+    else:
+        for name, ms in results.items():
+            flag = "  OVER BUDGET" if name in over_budget else ""
+            print(f"{name:<24} {ms:7.1f} ms  (budget {BUDGET_MS[name]:.0f} ms){flag}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Run many clawtunes commands from one input stream (clawtunes batch).
+
+Input is one command per line, either shell-style (`volume 30`,
+`-1 play playlist "Road Trip"`), a JSON array of arguments or a JSON object
+with an "argv" array. Blank lines and lines starting with # are skipped.
+
+Each command produces one JSON result line. Runs of simple player commands
+(see playback.STEP_COMMANDS) are sent to Music in one AppleScript call.
+"""
+
+import json
+import shlex
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import click
+
+from clawtunes.runner import run_captured
+from clawtunes_helpers import playback, status
+
+# Commands that cannot run inside a batch.
+UNBATCHABLE_COMMANDS = {"batch", "serve", "shell"}
+
+# Output of the merged commands on success, as printed by the CLI.
+_STEP_MESSAGES = {
+    "pause": "Paused",
+    "resume": "Resumed",
+    "next": "Skipped to next track",
+    "prev": "Went to previous track",
+}
+
+
+@dataclass
+class BatchCommand:
+    """One input line and the arguments parsed from it."""
+
+    line: int
+    text: str
+    argv: list[str] | None
+    error: str = ""
+
+    def step(self) -> tuple[str, str | None] | None:
+        """Return the (command, value) step if this can be merged, else None."""
+        argv = self.argv
+        if not argv or argv[0] not in playback.STEP_COMMANDS:
+            return None
+        if len(argv) == 1 and argv[0] in _STEP_MESSAGES:
+            return argv[0], None
+        if len(argv) != 2:
+            return None
+        command, value = argv[0], argv[1].lower()
+        if command == "volume" and value.isdigit():
+            return command, value
+        if command == "shuffle" and value in ("on", "off"):
+            return command, value
+        if command == "repeat" and value in ("off", "all", "one"):
+            return command, value
+        return None
+
+    def result(self, stdout: str, stderr: str, exit_code: int) -> dict[str, Any]:
+        return {
+            "line": self.line,
+            "command": self.text,
+            "exit_code": exit_code,
+            "stdout": stdout,
+            "stderr": stderr,
+        }
+
+
+def _parse_argv(text: str) -> list[str]:
+    if text.startswith(("[", "{")):
+        value = json.loads(text)
+        if isinstance(value, dict):
+            value = value.get("argv")
+        if not isinstance(value, list) or not all(isinstance(a, str) for a in value):
+            raise ValueError('expected a JSON array of strings or {"argv": [...]}')
+        argv = value
+    else:
+        argv = shlex.split(text)
+    if argv and argv[0] == "clawtunes":
+        argv = argv[1:]
+    if not argv:
+        raise ValueError("empty command")
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command in UNBATCHABLE_COMMANDS:
+        raise ValueError(f"'{command}' cannot run inside a batch")
+    if command == "status" and ("--watch" in argv or "-w" in argv):
+        raise ValueError("'status --watch' cannot run inside a batch")
+    return argv
+
+
+def parse_commands(lines: Iterable[str]) -> list[BatchCommand]:
+    """Parse batch input, skipping blank lines and comments."""
+    commands = []
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            commands.append(BatchCommand(number, text, _parse_argv(text)))
+        except ValueError as e:
+            commands.append(BatchCommand(number, text, None, f"Invalid command: {e}"))
+    return commands
+
+
+def _step_output(command: str, value: str | None) -> str:
+    if command == "volume" and value is not None:
+        return f"Volume: {max(0, min(100, int(value)))}%\n"
+    if command == "shuffle":
+        return f"Shuffle: {value}\n"
+    if command == "repeat":
+        return f"Repeat: {value}\n"
+    return f"{_STEP_MESSAGES[command]}\n"
+
+
+def run_batch(
+    cli: click.Command,
+    commands: list[BatchCommand],
+    emit: Callable[[dict[str, Any]], None],
+    stop_on_error: bool = False,
+) -> bool:
+    """Run commands in order, passing each result to `emit`.
+
+    Returns True if every command succeeded.
+    """
+    all_ok = True
+    i = 0
+    merge = True
+    while i < len(commands):
+        run = []
+        if merge:
+            for command in commands[i:]:
+                step = command.step()
+                if step is None:
+                    break
+                run.append((command, step))
+        if len(run) > 1:
+            completed, error = playback.run_steps([step for _, step in run])
+            status.invalidate_status_cache()
+            for command, step in run[:completed]:
+                emit(command.result(_step_output(*step), "", 0))
+            i += completed
+            if error is None:
+                continue
+            # Run the failed command on its own so that it reports its error
+            # exactly as the CLI would.
+            merge = False
+            continue
+
+        merge = True
+        command = commands[i]
+        i += 1
+        if command.argv is None:
+            stdout, stderr, exit_code = "", f"{command.error}\n", 2
+        else:
+            stdout, stderr, exit_code = run_captured(cli, command.argv)
+        emit(command.result(stdout, stderr, exit_code))
+        if exit_code != 0:
+            all_ok = False
+            if stop_on_error:
+                break
+    return all_ok
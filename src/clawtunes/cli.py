@@ -1,22 +1,108 @@
-"""Clawtunes CLI - Control Apple Music from the command line."""
-
-import click
-
-from clawtunes_helpers import catalog, playback, status
+"""Clawtunes CLI - Control Apple Music from the command line.
 
+Subcommands live in clawtunes.commands and are imported only when invoked,
+so a command doesn't pay for the helpers of every other command.
+"""
 
-def format_error(error: str) -> str:
-    """Format error message, adding hints for common issues."""
-    if "Not authorized" in error or "-1743" in error:
-        return (
-            f"{error}\n"
-            "Hint: Grant automation access in System Settings → "
-            "Privacy & Security → Automation → enable your terminal to control Music"
-        )
-    return error
+import importlib
+import sys
 
+import click
 
-@click.group()
+from clawtunes import client
+
+# Command name -> ("module:attribute", short help). The short help is listed
+# by --help without importing the command; test_cli checks it stays in sync.
+COMMANDS = {
+    "airplay": ("airplay:airplay", "List or select AirPlay devices."),
+    "batch": ("batch:run_batch", "Run commands from a file or stdin, one per line."),
+    "catalog": ("catalog:catalog_cmd", "Search Apple Music catalog."),
+    "choices": (
+        "choices:choices_cmd",
+        "Manage the matches remembered for play queries.",
+    ),
+    "dedupe": (
+        "dedupe:dedupe",
+        "Find duplicate tracks in the library or a playlist.",
+    ),
+    "dislike": ("rating:dislike", "Dislike the current track."),
+    "history": ("history:show_history", "Show recently played tracks."),
+    "love": ("rating:love", "Love the current track."),
+    "mute": ("volume:mute", "Mute volume."),
+    "next": ("transport:next_track", "Skip to the next track."),
+    "pause": ("transport:pause", "Pause playback."),
+    "play": ("play:play", "Play songs, albums, or playlists."),
+    "playlist": (
+        "playlists:playlist",
+        "Manage playlists (create, add songs, remove songs).",
+    ),
+    "playlists": ("playlists:list_playlists", "List all playlists."),
+    "prev": ("transport:prev_track", "Go to the previous track."),
+    "repeat": ("modes:repeat", "Set repeat mode."),
+    "resume": ("transport:resume", "Resume playback."),
+    "search": ("search:search", "Search for songs, albums, or playlists."),
+    "serve": ("serve:serve", "Serve a local HTTP/JSON control API."),
+    "shell": ("shell:run_shell", "Run commands interactively, keeping searches warm."),
+    "shuffle": ("modes:shuffle", "Set shuffle mode."),
+    "status": ("status:show_status", "Show the currently playing track."),
+    "unmute": ("volume:unmute", "Unmute volume."),
+    "volume": ("volume:volume", "Get or set volume."),
+}
+
+# Commands after which a status snapshot shared between processes is outdated.
+STATUS_CHANGING_COMMANDS = {
+    "play",
+    "pause",
+    "resume",
+    "next",
+    "prev",
+    "volume",
+    "mute",
+    "unmute",
+    "shuffle",
+    "repeat",
+    "love",
+    "dislike",
+}
+
+
+class LazyGroup(click.Group):
+    """Group that imports its subcommands from COMMANDS on first use."""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *COMMANDS})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in COMMANDS:
+            module_name, attribute = COMMANDS[cmd_name][0].split(":")
+            module = importlib.import_module(f"clawtunes.commands.{module_name}")
+            command = getattr(module, attribute)
+            self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in COMMANDS:
+                rows.append((name, COMMANDS[name][1]))
+                continue
+            command = self.get_command(ctx, name)
+            if command is not None and not command.hidden:
+                rows.append((name, command.get_short_help_str()))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+def _invalidate_status_cache() -> None:
+    from clawtunes_helpers import status
+
+    status.invalidate_status_cache()
+
+
+@click.group(cls=LazyGroup)
 @click.version_option()
 @click.option(
     "--non-interactive", "-N", is_flag=True, help="Don't prompt; list matches and exit"
@@ -28,402 +114,17 @@ def cli(ctx, non_interactive, first):
     ctx.ensure_object(dict)
     ctx.obj["non_interactive"] = non_interactive
     ctx.obj["first"] = first
+    if ctx.invoked_subcommand in STATUS_CHANGING_COMMANDS:
+        ctx.call_on_close(_invalidate_status_cache)
 
 
-@cli.group()
-def play():
-    """Play songs, albums, or playlists."""
-    pass
-
-
-@play.command("song")
-@click.argument("name")
-def play_song(name: str):
-    """Play a song by name."""
-    if not playback.play_song(name):
-        raise SystemExit(1)
-
-
-@play.command("album")
-@click.argument("name")
-def play_album(name: str):
-    """Play an album by name."""
-    if not playback.play_album(name):
-        raise SystemExit(1)
-
-
-@play.command("playlist")
-@click.argument("name")
-def play_playlist(name: str):
-    """Play a playlist by name."""
-    if not playback.play_playlist(name):
-        raise SystemExit(1)
-
-
-@cli.command()
-def pause():
-    """Pause playback."""
-    error = playback.pause()
-    if error is None:
-        click.echo("Paused")
-    else:
-        click.echo(f"Failed to pause: {format_error(error)}", err=True)
-        raise SystemExit(1)
-
-
-@cli.command()
-def resume():
-    """Resume playback."""
-    error = playback.resume()
-    if error is None:
-        click.echo("Resumed")
-    else:
-        click.echo(f"Failed to resume: {format_error(error)}", err=True)
-        raise SystemExit(1)
-
-
-@cli.command("next")
-def next_track():
-    """Skip to the next track."""
-    error = playback.next_track()
-    if error is None:
-        click.echo("Skipped to next track")
-    else:
-        click.echo(f"Failed to skip: {format_error(error)}", err=True)
-        raise SystemExit(1)
-
-
-@cli.command("prev")
-def prev_track():
-    """Go to the previous track."""
-    error = playback.previous_track()
-    if error is None:
-        click.echo("Went to previous track")
-    else:
-        click.echo(f"Failed to go back: {format_error(error)}", err=True)
-        raise SystemExit(1)
-
-
-@cli.command("status")
-@click.option("--debug", is_flag=True, help="Show AppleScript output for debugging")
-def show_status(debug: bool):
-    """Show the currently playing track."""
-    if debug:
-        stdout, stderr, returncode = status.get_now_playing_raw()
-        click.echo(f"AppleScript stdout: {stdout!r}")
-        if stderr:
-            click.echo(f"AppleScript stderr: {stderr!r}", err=True)
-        click.echo(f"AppleScript exit code: {returncode}")
-        now_playing = status.parse_now_playing(stdout, returncode)
-    else:
-        now_playing = status.get_now_playing()
-    player_state = status.get_player_state()
-
-    if now_playing is None:
-        click.echo("Nothing is playing")
-        return
-
-    state_indicator = (
-        "▶" if player_state == "playing" else "⏸" if player_state == "paused" else "⏹"
-    )
-
-    click.echo(f"{state_indicator} {now_playing.name}")
-    click.echo(f"  Artist: {now_playing.artist}")
-    click.echo(f"  Album:  {now_playing.album}")
-    click.echo(
-        f"  {now_playing.progress_bar} {now_playing.position_formatted} / {now_playing.duration_formatted}"
-    )
-
-
-# Volume control
-
-
-@cli.command("volume")
-@click.argument("level", required=False)
-def volume(level: str | None):
-    """Get or set volume. Use +/- prefix for relative adjustment."""
-    if level is None:
-        result = playback.get_volume()
-        if result is None:
-            click.echo("Failed to get volume", err=True)
-            raise SystemExit(1)
-        vol, muted = result
-        mute_indicator = " (muted)" if muted else ""
-        click.echo(f"Volume: {vol}%{mute_indicator}")
-        return
-
-    # Parse level: could be absolute (50) or relative (+10, -10)
-    try:
-        if level.startswith("+"):
-            result = playback.get_volume()
-            if result is None:
-                click.echo("Failed to get current volume", err=True)
-                raise SystemExit(1)
-            current, _ = result
-            new_level = current + int(level[1:])
-        elif level.startswith("-"):
-            result = playback.get_volume()
-            if result is None:
-                click.echo("Failed to get current volume", err=True)
-                raise SystemExit(1)
-            current, _ = result
-            new_level = current - int(level[1:])
-        else:
-            new_level = int(level)
-    except ValueError:
-        click.echo(f"Invalid volume level: {level}", err=True)
-        raise SystemExit(1)
-
-    error = playback.set_volume(new_level)
-    if error:
-        click.echo(f"Failed to set volume: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    click.echo(f"Volume: {max(0, min(100, new_level))}%")
-
-
-@cli.command("mute")
-def mute():
-    """Mute volume."""
-    error = playback.mute()
-    if error:
-        click.echo(f"Failed to mute: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    click.echo("Muted")
-
-
-@cli.command("unmute")
-def unmute():
-    """Unmute volume."""
-    error = playback.unmute()
-    if error:
-        click.echo(f"Failed to unmute: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    click.echo("Unmuted")
-
-
-# Shuffle and repeat
-
-
-@cli.command("shuffle")
-@click.argument("state", type=click.Choice(["on", "off"], case_sensitive=False))
-def shuffle(state: str):
-    """Set shuffle mode."""
-    error = playback.set_shuffle(state.lower() == "on")
-    if error:
-        click.echo(f"Failed to set shuffle: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    click.echo(f"Shuffle: {state.lower()}")
-
-
-@cli.command("repeat")
-@click.argument("mode", type=click.Choice(["off", "all", "one"], case_sensitive=False))
-def repeat(mode: str):
-    """Set repeat mode."""
-    mode_value = mode.lower()
-    error = playback.set_repeat(mode_value)
-    if error:
-        click.echo(f"Failed to change repeat mode: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    click.echo(f"Repeat: {mode_value}")
-
-
-# Search
-
-
-@cli.command("search")
-@click.argument("query")
-@click.option("--songs/--no-songs", "-s", default=True, help="Search songs")
-@click.option("--albums/--no-albums", "-a", default=True, help="Search albums")
-@click.option(
-    "--playlists/--no-playlists", "-p", default=False, help="Search playlists"
-)
-@click.option("--limit", "-n", default=10, help="Max results per category")
-def search(query: str, songs: bool, albums: bool, playlists: bool, limit: int):
-    """Search for songs, albums, or playlists."""
-    found_any = False
-
-    if songs:
-        results = playback.search_songs(query, limit)
-        if results:
-            found_any = True
-            click.echo(f"Songs ({len(results)}):")
-            for _, display in results:
-                click.echo(f"  {display}")
-            click.echo()
-
-    if albums:
-        results = playback.search_albums(query, limit)
-        if results:
-            found_any = True
-            click.echo(f"Albums ({len(results)}):")
-            for _, display in results:
-                click.echo(f"  {display}")
-            click.echo()
-
-    if playlists:
-        results = playback.search_playlists(query, limit)
-        if results:
-            found_any = True
-            click.echo(f"Playlists ({len(results)}):")
-            for _, display in results:
-                click.echo(f"  {display}")
-            click.echo()
-
-    if not found_any:
-        click.echo(f"No results found for '{query}'")
-
-
-# Love/dislike
-
-
-@cli.command("love")
-def love():
-    """Love the current track."""
-    error = playback.love_current_track()
-    if error:
-        click.echo(f"Failed to love track: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    now_playing = status.get_now_playing()
-    if now_playing:
-        click.echo(f"Loved: {now_playing.name}")
-    else:
-        click.echo("Loved current track")
-
-
-@cli.command("dislike")
-def dislike():
-    """Dislike the current track."""
-    error = playback.dislike_current_track()
-    if error:
-        click.echo(f"Failed to dislike track: {format_error(error)}", err=True)
-        raise SystemExit(1)
-    now_playing = status.get_now_playing()
-    if now_playing:
-        click.echo(f"Disliked: {now_playing.name}")
-    else:
-        click.echo("Disliked current track")
-
-
-# Playlists
-
-
-@cli.command("playlists")
-def list_playlists():
-    """List all playlists."""
-    playlists = playback.get_all_playlists()
-    if not playlists:
-        click.echo("No playlists found")
-        return
-
-    click.echo(f"Playlists ({len(playlists)}):")
-    for name, count in playlists:
-        click.echo(f"  {name} ({count} tracks)")
-
-
-@cli.group()
-def playlist():
-    """Manage playlists (create, add songs, remove songs)."""
-    pass
-
-
-@playlist.command("create")
-@click.argument("name")
-def playlist_create(name: str):
-    """Create a new playlist."""
-    success, message = playback.create_playlist(name)
-    click.echo(message, err=not success)
-    if not success:
-        raise SystemExit(1)
-
-
-@playlist.command("add")
-@click.argument("playlist_name")
-@click.argument("song")
-def playlist_add(playlist_name: str, song: str):
-    """Add a song to a playlist."""
-    if not playback.add_song_to_playlist_interactive(playlist_name, song):
-        raise SystemExit(1)
-
-
-@playlist.command("remove")
-@click.argument("playlist_name")
-@click.argument("song")
-def playlist_remove(playlist_name: str, song: str):
-    """Remove a song from a playlist."""
-    if not playback.remove_song_from_playlist_interactive(playlist_name, song):
-        raise SystemExit(1)
-
-
-# AirPlay
-
-
-@cli.command("airplay")
-@click.argument("device", required=False)
-@click.option("--off", is_flag=True, help="Deselect the device")
-def airplay(device: str | None, off: bool):
-    """List or select AirPlay devices."""
-    devices = playback.get_airplay_devices()
-
-    if device is None:
-        if not devices:
-            click.echo("No AirPlay devices found")
-            return
-
-        click.echo("AirPlay devices:")
-        for name, kind, available, selected in devices:
-            status_str = ""
-            if selected:
-                status_str = " [selected]"
-            elif not available:
-                status_str = " [unavailable]"
-            click.echo(f"  {name} ({kind}){status_str}")
-        return
-
-    # Find matching device
-    matching = [d for d in devices if device.lower() in d[0].lower()]
-    if not matching:
-        click.echo(f"No device found matching '{device}'", err=True)
-        raise SystemExit(1)
-
-    if len(matching) > 1:
-        click.echo(f"Multiple devices match '{device}':")
-        for name, kind, _, _ in matching:
-            click.echo(f"  {name} ({kind})")
-        raise SystemExit(1)
-
-    target_name = matching[0][0]
-    error = playback.set_airplay_device(target_name, not off)
-    if error:
-        click.echo(f"Failed to set AirPlay device: {format_error(error)}", err=True)
-        raise SystemExit(1)
-
-    if off:
-        click.echo(f"Deselected: {target_name}")
-    else:
-        click.echo(f"Selected: {target_name}")
-
-
-# Catalog (Apple Music streaming)
-
-
-@cli.group()
-def catalog_cmd():
-    """Search Apple Music catalog."""
-    pass
-
-
-# Register the group with the name "catalog" (avoiding conflict with the imported module)
-cli.add_command(catalog_cmd, name="catalog")
-
-
-@catalog_cmd.command("search")
-@click.argument("query")
-@click.option("--limit", "-n", default=10, help="Max results")
-def catalog_search(query: str, limit: int):
-    """Search Apple Music catalog and open the song in Music."""
-    if not catalog.search_and_open(query, limit):
-        raise SystemExit(1)
+def main() -> None:
+    """Entry point: forward to clawtunesd when it is running."""
+    exit_code = client.run_via_daemon(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    cli()
 
 
 if __name__ == "__main__":
-    cli()
+    main()
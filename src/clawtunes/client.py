@@ -0,0 +1,98 @@
+"""Thin client that forwards clawtunes commands to a running clawtunesd.
+
+Kept free of click and the helper modules so that forwarding a command costs
+little more than starting the interpreter.
+"""
+
+import json
+import os
+import socket
+import sys
+
+from clawtunes_helpers.cache import cache_dir
+
+CONNECT_TIMEOUT = 0.2
+
+# Commands that may ask the user to pick a match. The daemon cannot read the
+# caller's stdin, so they only go through it with -N or -1.
+SELECTING_COMMANDS = {"play", "playlist", "catalog"}
+
+# Commands that are long-running or read the caller's stdin, so they must run
+# in the calling process. `catalog lookup` and `catalog import` read stdin
+# only without IDs or with FILE "-"; see _reads_stdin.
+IN_PROCESS_COMMANDS = {"serve", "batch", "shell"}
+
+# Options of the stdin-reading catalog subcommands that take a value.
+VALUE_OPTIONS = {"--country", "--playlist", "--report"}
+
+
+def socket_path() -> str:
+    """Return the path of the clawtunesd socket ($CLAWTUNES_SOCKET overrides)."""
+    return os.environ.get("CLAWTUNES_SOCKET") or str(cache_dir() / "clawtunesd.sock")
+
+
+def _reads_stdin(argv: list[str]) -> bool:
+    """Return whether argv is a catalog lookup or import that reads stdin."""
+    words = []
+    for previous, arg in zip([""] + argv, argv):
+        if previous not in VALUE_OPTIONS and (arg == "-" or not arg.startswith("-")):
+            words.append(arg)
+    if words[:2] == ["catalog", "lookup"]:
+        return len(words) == 2
+    if words[:2] == ["catalog", "import"]:
+        return words[2:3] == ["-"]
+    return False
+
+
+def _can_delegate(argv: list[str]) -> bool:
+    if os.environ.get("CLAWTUNES_NO_DAEMON"):
+        return False
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command in IN_PROCESS_COMMANDS or _reads_stdin(argv):
+        return False
+    if command == "status" and ("--watch" in argv or "-w" in argv):
+        return False
+    if command in SELECTING_COMMANDS:
+        return bool({"-N", "--non-interactive", "-1", "--first"} & set(argv))
+    if command == "dedupe" and "--remove" in argv:
+        return "--yes" in argv or "-y" in argv
+    return True
+
+
+def run_via_daemon(argv: list[str]) -> int | None:
+    """Run a command in clawtunesd and print its output.
+
+    Returns the exit code, or None if the daemon is not running (or the command
+    must run in-process) and the caller should execute the command itself.
+    """
+    if not _can_delegate(argv):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    # From here on the command may already be running, so a failure must not
+    # fall back to running it a second time.
+    with sock:
+        try:
+            sock.settimeout(None)
+            request = {"argv": argv, "cwd": os.getcwd()}
+            sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as reader:
+                response = json.loads(reader.readline())
+        except (OSError, ValueError):
+            sys.stderr.write("Lost connection to clawtunesd\n")
+            return 1
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("exit_code", 1))
@@ -0,0 +1,20 @@
+"""CLI subcommands, imported on demand by clawtunes.cli."""
+
+from clawtunes_helpers import session
+
+
+def format_error(error: str) -> str:
+    """Format error message, adding hints for common issues."""
+    if "Not authorized" in error or "-1743" in error:
+        return (
+            f"{error}\n"
+            "Hint: Grant automation access in System Settings → "
+            "Privacy & Security → Automation → enable your terminal to control Music"
+        )
+    return error
+
+
+def numbered(kind: str, item_id: str, display: str) -> str:
+    """Prefix a listed item with its number when running in the shell."""
+    number = session.remember(kind, item_id, display)
+    return display if number is None else f"{number}. {display}"
@@ -0,0 +1,52 @@
+"""List and select AirPlay devices."""
+
+import click
+
+from clawtunes.commands import format_error
+from clawtunes_helpers import playback
+
+
+@click.command("airplay")
+@click.argument("device", required=False)
+@click.option("--off", is_flag=True, help="Deselect the device")
+def airplay(device: str | None, off: bool):
+    """List or select AirPlay devices."""
+    devices = playback.get_airplay_devices()
+
+    if device is None:
+        if not devices:
+            click.echo("No AirPlay devices found")
+            return
+
+        click.echo("AirPlay devices:")
+        for name, kind, available, selected in devices:
+            status_str = ""
+            if selected:
+                status_str = " [selected]"
+            elif not available:
+                status_str = " [unavailable]"
+            click.echo(f"  {name} ({kind}){status_str}")
+        return
+
+    # Find matching device
+    matching = [d for d in devices if device.lower() in d[0].lower()]
+    if not matching:
+        click.echo(f"No device found matching '{device}'", err=True)
+        raise SystemExit(1)
+
+    if len(matching) > 1:
+        click.echo(f"Multiple devices match '{device}':")
+        for name, kind, _, _ in matching:
+            click.echo(f"  {name} ({kind})")
+        raise SystemExit(1)
+
+    target_name = matching[0][0]
+    error = playback.set_airplay_device(target_name, not off)
+    if error:
+        click.echo(f"Failed to set AirPlay device: {format_error(error)}", err=True)
+        raise SystemExit(1)
+
+    if off:
+        click.echo(f"Deselected: {target_name}")
+    else:
+        click.echo(f"Selected: {target_name}")
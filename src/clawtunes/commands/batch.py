@@ -0,0 +1,31 @@
+"""Run commands from a file or stdin."""
+
+import json
+
+import click
+
+from clawtunes import batch
+
+
+@click.command("batch")
+@click.argument("input_file", type=click.File("r"), default="-")
+@click.option(
+    "--stop-on-error", is_flag=True, help="Stop at the first command that fails"
+)
+@click.pass_context
+def run_batch(ctx, input_file, stop_on_error: bool):
+    """Run commands from a file or stdin, one per line.
+
+    Lines are shell-style commands ("volume 30", "-1 play playlist Focus") or
+    JSON arrays of arguments. Prints one JSON result per command. Commands
+    run without a terminal, so use -1 or -N for commands that pick a match.
+    """
+    commands = batch.parse_commands(input_file)
+    ok = batch.run_batch(
+        ctx.find_root().command,
+        commands,
+        lambda result: click.echo(json.dumps(result, ensure_ascii=False)),
+        stop_on_error,
+    )
+    if not ok:
+        raise SystemExit(1)
@@ -0,0 +1,131 @@
+"""Search the Apple Music catalog."""
+
+import json
+import sys
+import time
+from collections.abc import Iterator
+from typing import TextIO
+
+import click
+
+from clawtunes_helpers import catalog, catalog_cache, catalog_import
+
+
+@click.group("catalog")
+def catalog_cmd():
+    """Search Apple Music catalog."""
+    pass
+
+
+# --type choices -> iTunes Search API entities
+ENTITY_TYPES = {"song": "song", "album": "album", "artist": "musicArtist"}
+
+
+@catalog_cmd.command("search")
+@click.argument("query")
+@click.option("--limit", "-n", default=10, help="Results per type and page")
+@click.option(
+    "--offset", default=0, type=click.IntRange(min=0), help="Results to skip per type"
+)
+@click.option(
+    "--type",
+    "-t",
+    "types",
+    multiple=True,
+    type=click.Choice(list(ENTITY_TYPES)),
+    help="Search only these types (repeatable; default: all)",
+)
+def catalog_search(query: str, limit: int, offset: int, types: tuple[str, ...]):
+    """Search Apple Music catalog and open a song, album or artist in Music."""
+    entities = [ENTITY_TYPES[t] for t in types or ENTITY_TYPES]
+    if not catalog.search_and_open(query, limit, entities, offset):
+        raise SystemExit(1)
+
+
+def _ids_from_stdin() -> Iterator[str]:
+    for line in sys.stdin:
+        yield from line.replace(",", " ").split()
+
+
+@catalog_cmd.command("lookup")
+@click.argument("ids", nargs=-1)
+@click.option("--country", help="Store country code, e.g. US")
+def catalog_lookup(ids: tuple[str, ...], country: str | None):
+    """Look up catalog IDs (from arguments or stdin) and print JSON lines.
+
+    Prints one line per ID, in input order, with its `id` and the catalog
+    `result` (null if not found). IDs whose lookup failed also get an
+    `error`, and the command exits with 1.
+    """
+    failed = False
+    for found in catalog.lookup_catalog(ids or _ids_from_stdin(), country):
+        line = {"id": found.id, "result": found.result}
+        if found.error:
+            line["error"] = found.error
+            failed = True
+        click.echo(json.dumps(line, ensure_ascii=False))
+    if failed:
+        raise SystemExit(1)
+
+
+@catalog_cmd.command("import")
+@click.argument("file", type=click.File("r", encoding="utf-8"))
+@click.option("--playlist", "playlist_name", help="Add confident matches here")
+@click.option(
+    "--report",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="Write the JSON lines report here (default: stdout)",
+)
+@click.option(
+    "--open",
+    "open_missing",
+    is_flag=True,
+    help="Open confident matches that aren't in the library in Music",
+)
+@click.option("--country", help="Store country code, e.g. US")
+def catalog_import_cmd(
+    file: TextIO,
+    playlist_name: str | None,
+    report: TextIO,
+    open_missing: bool,
+    country: str | None,
+):
+    """Match "artist - title" lines (FILE, or - for stdin) in the catalog.
+
+    Prints one JSON line per line with its `status`: confident, ambiguous,
+    missing or failed, and the best `match`. Confident matches already in
+    the library are added to --playlist, which is created if needed.
+    """
+    if not catalog_import.import_lines(
+        file, report, playlist_name, open_missing, country
+    ):
+        raise SystemExit(1)
+
+
+@catalog_cmd.group("cache")
+def catalog_cache_cmd():
+    """Inspect or clear the cache of catalog responses."""
+    pass
+
+
+@catalog_cache_cmd.command("stats")
+def cache_stats():
+    """Show the size and hit rate of the cache."""
+    stats = catalog_cache.stats()
+    click.echo(f"Entries: {stats.entries}")
+    click.echo(f"Size: {stats.size / 1024:.1f} KiB of {stats.max_size / 1024:.0f} KiB")
+    click.echo(
+        f"Hits: {stats.hits} fresh, {stats.stale_hits} stale; misses: {stats.misses}"
+    )
+    if stats.oldest is not None:
+        oldest = time.strftime("%Y-%m-%d %H:%M", time.localtime(stats.oldest))
+        click.echo(f"Oldest entry: {oldest}")
+    click.echo(f"Path: {catalog_cache.cache_path()}")
+
+
+@catalog_cache_cmd.command("clear")
+def cache_clear():
+    """Remove every cached response."""
+    removed = catalog_cache.clear()
+    click.echo(f"Removed {removed} cached responses")
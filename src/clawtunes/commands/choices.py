@@ -0,0 +1,17 @@
+"""Manage remembered choices."""
+
+import click
+
+from clawtunes_helpers import choices
+
+
+@click.group("choices")
+def choices_cmd():
+    """Manage the matches remembered for play queries."""
+
+
+@choices_cmd.command("clear")
+def choices_clear():
+    """Forget every remembered match."""
+    count = choices.clear()
+    click.echo(f"Forgot {count} remembered matches")
@@ -0,0 +1,15 @@
+"""Find and remove duplicate tracks."""
+
+import click
+
+from clawtunes_helpers import library
+
+
+@click.command("dedupe")
+@click.option("--playlist", "playlist_name", help="Check a playlist instead")
+@click.option("--remove", is_flag=True, help="Remove the extra copies")
+@click.option("--yes", "-y", is_flag=True, help="Don't ask before removing")
+def dedupe(playlist_name: str | None, remove: bool, yes: bool):
+    """Find duplicate tracks in the library or a playlist."""
+    if not library.dedupe(playlist_name, remove, yes):
+        raise SystemExit(1)
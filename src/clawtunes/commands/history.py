@@ -0,0 +1,48 @@
+"""Show the play history."""
+
+import time
+
+import click
+
+from clawtunes_helpers import history
+
+
+@click.command("history")
+@click.option("--limit", "-n", default=20, help="Number of plays or artists to show")
+@click.option("--top-artists", is_flag=True, help="Show the most played artists")
+@click.option("--per-day", is_flag=True, help="Show the number of plays per day")
+@click.option("--days", default=7, help="Period for --top-artists and --per-day")
+def show_history(limit: int, top_artists: bool, per_day: bool, days: int):
+    """Show recently played tracks.
+
+    Plays are recorded whenever clawtunes sees a new track: when playing
+    music with clawtunes and on status and status --watch.
+    """
+    if top_artists:
+        artists = history.top_artists(days, limit)
+        if not artists:
+            click.echo(f"No plays in the last {days} days")
+            return
+        click.echo(f"Top artists, last {days} days:")
+        for i, (artist, count) in enumerate(artists, 1):
+            click.echo(f"  {i}. {artist or 'Unknown'} ({count} plays)")
+        return
+
+    if per_day:
+        days_with_plays = history.plays_per_day(days)
+        if not days_with_plays:
+            click.echo(f"No plays in the last {days} days")
+            return
+        click.echo(f"Plays per day, last {days} days:")
+        for day, count in days_with_plays:
+            click.echo(f"  {day}  {count}")
+        return
+
+    plays = history.recent_plays(limit)
+    if not plays:
+        click.echo("No plays recorded yet")
+        return
+    click.echo(f"Recent plays ({len(plays)}):")
+    for play in plays:
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(play.timestamp))
+        click.echo(f"  {started}  {play.name} - {play.artist} ({play.album})")
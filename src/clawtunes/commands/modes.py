@@ -0,0 +1,29 @@
+"""Shuffle and repeat."""
+
+import click
+
+from clawtunes.commands import format_error
+from clawtunes_helpers import playback
+
+
+@click.command("shuffle")
+@click.argument("state", type=click.Choice(["on", "off"], case_sensitive=False))
+def shuffle(state: str):
+    """Set shuffle mode."""
+    error = playback.set_shuffle(state.lower() == "on")
+    if error:
+        click.echo(f"Failed to set shuffle: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    click.echo(f"Shuffle: {state.lower()}")
+
+
+@click.command("repeat")
+@click.argument("mode", type=click.Choice(["off", "all", "one"], case_sensitive=False))
+def repeat(mode: str):
+    """Set repeat mode."""
+    mode_value = mode.lower()
+    error = playback.set_repeat(mode_value)
+    if error:
+        click.echo(f"Failed to change repeat mode: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    click.echo(f"Repeat: {mode_value}")
@@ -0,0 +1,48 @@
+"""Play songs, albums and playlists."""
+
+import click
+
+from clawtunes_helpers import playback
+
+
+@click.group()
+def play():
+    """Play songs, albums, or playlists."""
+    pass
+
+
+@play.command("song")
+@click.argument("name")
+@click.option(
+    "--fresh", is_flag=True, help="Forget the remembered match and search again"
+)
+def play_song(name: str, fresh: bool):
+    """Play a song by name.
+
+    A song picked from several matches is played directly the next time the
+    same NAME is given.
+    """
+    if not playback.play_song(name, fresh):
+        raise SystemExit(1)
+
+
+@play.command("album")
+@click.argument("name")
+@click.option(
+    "--fresh", is_flag=True, help="Forget the remembered match and search again"
+)
+def play_album(name: str, fresh: bool):
+    """Play an album by name."""
+    if not playback.play_album(name, fresh):
+        raise SystemExit(1)
+
+
+@play.command("playlist")
+@click.argument("name")
+@click.option(
+    "--fresh", is_flag=True, help="Forget the remembered match and search again"
+)
+def play_playlist(name: str, fresh: bool):
+    """Play a playlist by name."""
+    if not playback.play_playlist(name, fresh):
+        raise SystemExit(1)
@@ -0,0 +1,54 @@
+"""List and edit playlists."""
+
+import click
+
+from clawtunes.commands import numbered
+from clawtunes_helpers import playback
+
+
+@click.command("playlists")
+def list_playlists():
+    """List all playlists."""
+    total, chunks = playback.stream_playlists()
+    if not total:
+        click.echo("No playlists found")
+        return
+
+    click.echo(f"Playlists ({total}):")
+    for chunk in chunks:
+        for name, count in chunk:
+            click.echo(f"  {numbered('playlist', name, f'{name} ({count} tracks)')}")
+
+
+@click.group()
+def playlist():
+    """Manage playlists (create, add songs, remove songs)."""
+    pass
+
+
+@playlist.command("create")
+@click.argument("name")
+def playlist_create(name: str):
+    """Create a new playlist."""
+    success, message = playback.create_playlist(name)
+    click.echo(message, err=not success)
+    if not success:
+        raise SystemExit(1)
+
+
+@playlist.command("add")
+@click.argument("playlist_name")
+@click.argument("song")
+def playlist_add(playlist_name: str, song: str):
+    """Add a song to a playlist."""
+    if not playback.add_song_to_playlist_interactive(playlist_name, song):
+        raise SystemExit(1)
+
+
+@playlist.command("remove")
+@click.argument("playlist_name")
+@click.argument("song")
+def playlist_remove(playlist_name: str, song: str):
+    """Remove a song from a playlist."""
+    if not playback.remove_song_from_playlist_interactive(playlist_name, song):
+        raise SystemExit(1)
@@ -0,0 +1,34 @@
+"""Love and dislike the current track."""
+
+import click
+
+from clawtunes.commands import format_error
+from clawtunes_helpers import playback, status
+
+
+@click.command("love")
+def love():
+    """Love the current track."""
+    error = playback.love_current_track()
+    if error:
+        click.echo(f"Failed to love track: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    now_playing = status.get_now_playing()
+    if now_playing:
+        click.echo(f"Loved: {now_playing.name}")
+    else:
+        click.echo("Loved current track")
+
+
+@click.command("dislike")
+def dislike():
+    """Dislike the current track."""
+    error = playback.dislike_current_track()
+    if error:
+        click.echo(f"Failed to dislike track: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    now_playing = status.get_now_playing()
+    if now_playing:
+        click.echo(f"Disliked: {now_playing.name}")
+    else:
+        click.echo("Disliked current track")
@@ -0,0 +1,37 @@
+"""Search the library."""
+
+import click
+
+from clawtunes.commands import numbered
+from clawtunes_helpers import playback
+
+
+@click.command("search")
+@click.argument("query")
+@click.option("--songs/--no-songs", "-s", default=True, help="Search songs")
+@click.option("--albums/--no-albums", "-a", default=True, help="Search albums")
+@click.option(
+    "--playlists/--no-playlists", "-p", default=False, help="Search playlists"
+)
+@click.option("--limit", "-n", default=10, help="Max results per category")
+def search(query: str, songs: bool, albums: bool, playlists: bool, limit: int):
+    """Search for songs, albums, or playlists."""
+    found_any = False
+    categories = [
+        (songs, "Songs", "song", playback.search_songs),
+        (albums, "Albums", "album", playback.search_albums),
+        (playlists, "Playlists", "playlist", playback.search_playlists),
+    ]
+    for enabled, title, kind, search_items in categories:
+        if not enabled:
+            continue
+        results = search_items(query, limit)
+        if results:
+            found_any = True
+            click.echo(f"{title} ({len(results)}):")
+            for item_id, display in results:
+                click.echo(f"  {numbered(kind, item_id, display)}")
+            click.echo()
+
+    if not found_any:
+        click.echo(f"No results found for '{query}'")
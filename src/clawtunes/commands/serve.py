@@ -0,0 +1,25 @@
+"""Local HTTP/JSON control API."""
+
+import click
+
+from clawtunes import server
+
+
+@click.command("serve")
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option("--port", "-p", default=8765, help="Port to listen on")
+@click.option(
+    "--token",
+    envvar="CLAWTUNES_API_TOKEN",
+    help="Require 'Authorization: Bearer TOKEN' (default: $CLAWTUNES_API_TOKEN)",
+)
+def serve(host: str, port: int, token: str | None):
+    """Serve a local HTTP/JSON control API."""
+    api_server = server.create_server(host, port, token)
+    click.echo(f"Serving the clawtunes API on http://{host}:{port}")
+    try:
+        api_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api_server.server_close()
@@ -0,0 +1,16 @@
+"""Interactive shell."""
+
+import click
+
+from clawtunes import shell
+
+
+@click.command("shell")
+@click.pass_context
+def run_shell(ctx):
+    """Run commands interactively, keeping searches warm.
+
+    Items listed by search and playlists are numbered; "play N" plays one.
+    Type "refresh" to forget cached results and "exit" to leave.
+    """
+    shell.run_shell(ctx.find_root().command)
@@ -0,0 +1,92 @@
+"""Show the player status."""
+
+import json
+
+import click
+
+from clawtunes_helpers import history, status
+
+
+def _state_indicator(player_state: str) -> str:
+    return (
+        "▶" if player_state == "playing" else "⏸" if player_state == "paused" else "⏹"
+    )
+
+
+def _status_line(player_status: status.PlayerStatus | None) -> str:
+    if player_status is None or player_status.now_playing is None:
+        return "Nothing is playing"
+    now_playing = player_status.now_playing
+    return (
+        f"{_state_indicator(player_status.player_state)} {now_playing.name} - "
+        f"{now_playing.artist} "
+        f"{now_playing.position_formatted} / {now_playing.duration_formatted}"
+    )
+
+
+def _status_json(player_status: status.PlayerStatus | None) -> str:
+    if player_status is None:
+        return json.dumps({"state": "unknown", "track": None})
+    return json.dumps(player_status.to_dict())
+
+
+def _watch_status(json_output: bool) -> None:
+    previous = None
+    try:
+        for player_status in status.watch():
+            history.observe(player_status)
+            if json_output:
+                line = _status_json(player_status)
+            else:
+                line = _status_line(player_status)
+            if line != previous:
+                click.echo(line)
+                previous = line
+    except KeyboardInterrupt:
+        pass
+
+
+@click.command("status")
+@click.option("--debug", is_flag=True, help="Show AppleScript output for debugging")
+@click.option("--json", "json_output", is_flag=True, help="Output as JSON")
+@click.option(
+    "--watch", "-w", is_flag=True, help="Keep running and print a line per change"
+)
+@click.option(
+    "--cache-ttl",
+    type=float,
+    help="Reuse a status shared by other clawtunes processes if younger than "
+    "this many seconds (default: $CLAWTUNES_STATUS_TTL or 0.3, 0 disables)",
+)
+def show_status(debug: bool, json_output: bool, watch: bool, cache_ttl: float | None):
+    """Show the currently playing track."""
+    if watch:
+        _watch_status(json_output)
+        return
+
+    if debug:
+        stdout, stderr, returncode = status.get_player_status_raw()
+        click.echo(f"AppleScript stdout: {stdout!r}")
+        if stderr:
+            click.echo(f"AppleScript stderr: {stderr!r}", err=True)
+        click.echo(f"AppleScript exit code: {returncode}")
+        player_status = status.parse_player_status(stdout, returncode)
+    else:
+        player_status = status.get_player_status_cached(cache_ttl)
+        history.observe(player_status)
+
+    if json_output:
+        click.echo(_status_json(player_status))
+        return
+
+    if player_status is None or player_status.now_playing is None:
+        click.echo("Nothing is playing")
+        return
+
+    now_playing = player_status.now_playing
+    click.echo(f"{_state_indicator(player_status.player_state)} {now_playing.name}")
+    click.echo(f"  Artist: {now_playing.artist}")
+    click.echo(f"  Album:  {now_playing.album}")
+    click.echo(
+        f"  {now_playing.progress_bar} {now_playing.position_formatted} / {now_playing.duration_formatted}"
+    )
@@ -0,0 +1,50 @@
+"""Playback controls: pause, resume, next and prev."""
+
+import click
+
+from clawtunes.commands import format_error
+from clawtunes_helpers import playback
+
+
+@click.command()
+def pause():
+    """Pause playback."""
+    error = playback.pause()
+    if error is None:
+        click.echo("Paused")
+    else:
+        click.echo(f"Failed to pause: {format_error(error)}", err=True)
+        raise SystemExit(1)
+
+
+@click.command()
+def resume():
+    """Resume playback."""
+    error = playback.resume()
+    if error is None:
+        click.echo("Resumed")
+    else:
+        click.echo(f"Failed to resume: {format_error(error)}", err=True)
+        raise SystemExit(1)
+
+
+@click.command("next")
+def next_track():
+    """Skip to the next track."""
+    error = playback.next_track()
+    if error is None:
+        click.echo("Skipped to next track")
+    else:
+        click.echo(f"Failed to skip: {format_error(error)}", err=True)
+        raise SystemExit(1)
+
+
+@click.command("prev")
+def prev_track():
+    """Go to the previous track."""
+    error = playback.previous_track()
+    if error is None:
+        click.echo("Went to previous track")
+    else:
+        click.echo(f"Failed to go back: {format_error(error)}", err=True)
+        raise SystemExit(1)
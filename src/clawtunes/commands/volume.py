@@ -0,0 +1,69 @@
+"""Volume control."""
+
+import click
+
+from clawtunes.commands import format_error
+from clawtunes_helpers import playback
+
+
+@click.command("volume")
+@click.argument("level", required=False)
+def volume(level: str | None):
+    """Get or set volume. Use +/- prefix for relative adjustment."""
+    if level is None:
+        result = playback.get_volume()
+        if result is None:
+            click.echo("Failed to get volume", err=True)
+            raise SystemExit(1)
+        vol, muted = result
+        mute_indicator = " (muted)" if muted else ""
+        click.echo(f"Volume: {vol}%{mute_indicator}")
+        return
+
+    # Parse level: could be absolute (50) or relative (+10, -10)
+    try:
+        if level.startswith("+"):
+            result = playback.get_volume()
+            if result is None:
+                click.echo("Failed to get current volume", err=True)
+                raise SystemExit(1)
+            current, _ = result
+            new_level = current + int(level[1:])
+        elif level.startswith("-"):
+            result = playback.get_volume()
+            if result is None:
+                click.echo("Failed to get current volume", err=True)
+                raise SystemExit(1)
+            current, _ = result
+            new_level = current - int(level[1:])
+        else:
+            new_level = int(level)
+    except ValueError:
+        click.echo(f"Invalid volume level: {level}", err=True)
+        raise SystemExit(1)
+
+    error = playback.set_volume(new_level)
+    if error:
+        click.echo(f"Failed to set volume: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    click.echo(f"Volume: {max(0, min(100, new_level))}%")
+
+
+@click.command("mute")
+def mute():
+    """Mute volume."""
+    error = playback.mute()
+    if error:
+        click.echo(f"Failed to mute: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    click.echo("Muted")
+
+
+@click.command("unmute")
+def unmute():
+    """Unmute volume."""
+    error = playback.unmute()
+    if error:
+        click.echo(f"Failed to unmute: {format_error(error)}", err=True)
+        raise SystemExit(1)
+    click.echo("Unmuted")
@@ -0,0 +1,128 @@
+"""clawtunesd - serve clawtunes commands from a warm process over a Unix socket.
+
+Protocol: the client sends one JSON line {"argv": [...], "cwd": "..."} and
+receives one JSON line {"stdout": "...", "stderr": "...", "exit_code": N}.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+from pathlib import Path
+
+import click
+
+from clawtunes.cli import cli
+from clawtunes.client import socket_path
+from clawtunes.runner import run_captured
+from clawtunes_helpers import applescript
+
+# Commands share the process-wide stdout/stderr/stdin and working directory,
+# so they run one at a time.
+_command_lock = threading.Lock()
+
+
+def run_command(argv: list[str], cwd: str | None = None) -> tuple[str, str, int]:
+    """Run a clawtunes command in this process and capture its output.
+
+    Returns (stdout, stderr, exit_code). Prompts see an empty stdin, so they
+    are cancelled instead of blocking the daemon.
+    """
+    with _command_lock:
+        previous_cwd = os.getcwd()
+        try:
+            if cwd:
+                os.chdir(cwd)
+        except OSError as e:
+            return "", f"{e}\n", 1
+        try:
+            return run_captured(cli, argv)
+        finally:
+            os.chdir(previous_cwd)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # A liveness probe connects and disconnects without a request.
+            return
+        try:
+            request = json.loads(line)
+            argv = request["argv"]
+            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                raise ValueError("argv must be a list of strings")
+            cwd = request.get("cwd")
+        except (ValueError, KeyError, TypeError) as e:
+            response = {
+                "stdout": "",
+                "stderr": f"Invalid request: {e}\n",
+                "exit_code": 2,
+            }
+        else:
+            stdout, stderr, exit_code = run_command(argv, cwd)
+            response = {"stdout": stdout, "stderr": stderr, "exit_code": exit_code}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _is_running(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def create_server(path: str) -> DaemonServer:
+    """Bind the daemon socket, replacing a stale socket file."""
+    if os.path.exists(path):
+        if _is_running(path):
+            raise click.ClickException(f"clawtunesd is already running on {path}")
+        os.unlink(path)
+    server = DaemonServer(path, _RequestHandler)
+    os.chmod(path, 0o600)
+    return server
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_file",
+    type=click.Path(dir_okay=False),
+    help="Socket path (default: $CLAWTUNES_SOCKET or the cache directory)",
+)
+def main(socket_file: str | None):
+    """Keep clawtunes warm and serve commands over a Unix socket.
+
+    While it runs, the clawtunes command forwards to it automatically.
+    """
+    path = socket_file or socket_path()
+    server = create_server(path)
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    with tempfile.TemporaryDirectory(prefix="clawtunesd-") as scripts_dir:
+        applescript.enable_compiled_scripts(Path(scripts_dir))
+        click.echo(f"clawtunesd listening on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            Path(path).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Console entry point with a fast path for transport and volume commands.
+
+`clawtunes pause`, `resume`, `next`, `prev` and `volume [N|+N]` are often
+bound to hotkeys. They are recognised here from argv and run without
+importing click or the CLI; output and exit codes match the full commands.
+Anything else goes to clawtunes.cli.
+"""
+
+import re
+import sys
+
+from clawtunes_helpers import transport
+from clawtunes_helpers.applescript import run_applescript
+from clawtunes_helpers.cache import status_cache_path
+
+# Command -> (script, success message, failure prefix)
+_TRANSPORT = {
+    "pause": (transport.PAUSE_SCRIPT, "Paused", "Failed to pause"),
+    "resume": (transport.RESUME_SCRIPT, "Resumed", "Failed to resume"),
+    "next": (transport.NEXT_TRACK_SCRIPT, "Skipped to next track", "Failed to skip"),
+    "prev": (
+        transport.PREVIOUS_TRACK_SCRIPT,
+        "Went to previous track",
+        "Failed to go back",
+    ),
+}
+
+# Levels the fast path handles; others (like "-10", which click rejects as
+# an unknown option) go through the CLI so they fail exactly as before.
+_LEVEL = re.compile(r"\+?[0-9]+")
+
+
+def _fail(message: str) -> int:
+    sys.stderr.write(f"{message}\n")
+    return 1
+
+
+def _format_error(error: str) -> str:
+    from clawtunes.commands import format_error
+
+    return format_error(error)
+
+
+def _get_volume() -> tuple[int, bool] | None:
+    stdout, _, returncode = run_applescript(transport.GET_VOLUME_SCRIPT)
+    return transport.parse_volume(stdout) if returncode == 0 else None
+
+
+def _volume(level: str | None) -> int:
+    if level is None:
+        result = _get_volume()
+        if result is None:
+            return _fail("Failed to get volume")
+        volume, muted = result
+        print(f"Volume: {volume}%{' (muted)' if muted else ''}")
+        return 0
+
+    if level.startswith("+"):
+        result = _get_volume()
+        if result is None:
+            return _fail("Failed to get current volume")
+        new_level = result[0] + int(level[1:])
+    else:
+        new_level = int(level)
+    _, stderr, returncode = run_applescript(transport.set_volume_script(new_level))
+    if returncode != 0:
+        return _fail(f"Failed to set volume: {_format_error(stderr)}")
+    print(f"Volume: {max(0, min(100, new_level))}%")
+    return 0
+
+
+def run(argv: list[str]) -> int | None:
+    """Run a transport or volume command; returns None for any other argv."""
+    if len(argv) == 1 and argv[0] in _TRANSPORT:
+        script, done, failed = _TRANSPORT[argv[0]]
+        _, stderr, returncode = run_applescript(script)
+        exit_code = 0
+        if returncode == 0:
+            print(done)
+        else:
+            exit_code = _fail(f"{failed}: {_format_error(stderr)}")
+    elif argv == ["volume"]:
+        exit_code = _volume(None)
+    elif len(argv) == 2 and argv[0] == "volume" and _LEVEL.fullmatch(argv[1]):
+        exit_code = _volume(argv[1])
+    else:
+        return None
+    # Like the CLI, drop the status snapshot shared by other processes.
+    status_cache_path().unlink(missing_ok=True)
+    return exit_code
+
+
+def main() -> None:
+    exit_code = run(sys.argv[1:])
+    if exit_code is None:
+        from clawtunes.cli import main as cli_main
+
+        cli_main()
+        return
+    sys.exit(exit_code)
@@ -0,0 +1,34 @@
+"""Run clawtunes commands inside an already running process."""
+
+import contextlib
+import io
+import sys
+
+import click
+
+
+def run_captured(command: click.Command, argv: list[str]) -> tuple[str, str, int]:
+    """Run a click command with `argv` and capture its output.
+
+    Returns (stdout, stderr, exit_code). Prompts see an empty stdin, so they
+    are cancelled instead of blocking or consuming the caller's input.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_stdin = sys.stdin
+    sys.stdin = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            command.main(args=argv, prog_name="clawtunes", standalone_mode=True)
+        exit_code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or 0
+        else:
+            stderr.write(f"{e.code}\n")
+            exit_code = 1
+    except OSError as e:
+        stderr.write(f"{e}\n")
+        exit_code = 1
+    finally:
+        sys.stdin = previous_stdin
+    return stdout.getvalue(), stderr.getvalue(), exit_code
@@ -0,0 +1,342 @@
+"""Local HTTP/JSON control API (clawtunes serve).
+
+Every endpoint is a thin wrapper around the helper functions used by the CLI.
+Connections are kept alive (HTTP/1.1) and each one is served by its own
+thread. Concurrent requests are scheduled by clawtunes_helpers.scheduler:
+identical reads share one AppleScript call and writes run one at a time.
+"""
+
+import hmac
+import json
+import sys
+import threading
+import urllib.parse
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from clawtunes_helpers import playback, status
+
+JSON = dict[str, Any]
+Handler = Callable[[dict[str, str], JSON], tuple[int, JSON]]
+
+# Relative volume changes read and then write the volume, so they must not
+# interleave with each other. Other writes are ordered by the scheduler.
+_volume_delta_lock = threading.Lock()
+
+
+class APIError(Exception):
+    """Error returned to the client as a JSON body with an HTTP status."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@contextmanager
+def _writing() -> Iterator[None]:
+    """Drop the shared status snapshot after a player change."""
+    try:
+        yield
+    finally:
+        status.invalidate_status_cache()
+
+
+def _write(action: Callable[[], str | None]) -> tuple[int, JSON]:
+    with _writing():
+        error = action()
+    if error:
+        raise APIError(HTTPStatus.BAD_GATEWAY, error)
+    return HTTPStatus.OK, {"ok": True}
+
+
+def _status_payload() -> JSON:
+    player_status = status.get_player_status_cached()
+    if player_status is None:
+        raise APIError(HTTPStatus.BAD_GATEWAY, "Failed to query Music")
+    return player_status.to_dict()
+
+
+def _get_status(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    return HTTPStatus.OK, _status_payload()
+
+
+def _get_volume(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    result = playback.get_volume()
+    if result is None:
+        raise APIError(HTTPStatus.BAD_GATEWAY, "Failed to get volume")
+    volume, muted = result
+    return HTTPStatus.OK, {"volume": volume, "muted": muted}
+
+
+def _set_volume(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    level = body.get("level")
+    delta = body.get("delta")
+    if isinstance(delta, int) and not isinstance(delta, bool):
+        with _volume_delta_lock, _writing():
+            result = playback.get_volume()
+            if result is None:
+                raise APIError(HTTPStatus.BAD_GATEWAY, "Failed to get current volume")
+            level = max(0, min(100, result[0] + delta))
+            error = playback.set_volume(level)
+    elif isinstance(level, int) and not isinstance(level, bool):
+        level = max(0, min(100, level))
+        with _writing():
+            error = playback.set_volume(level)
+    else:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Expected integer 'level' or 'delta'")
+    if error:
+        raise APIError(HTTPStatus.BAD_GATEWAY, error)
+    return HTTPStatus.OK, {"volume": level}
+
+
+def _search(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    term = query.get("q", "")
+    if not term:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Missing query parameter 'q'")
+    try:
+        limit = int(query.get("limit", "10"))
+    except ValueError:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid 'limit'")
+    searches = {
+        "songs": playback.search_songs,
+        "albums": playback.search_albums,
+        "playlists": playback.search_playlists,
+    }
+    kinds = query.get("type", "songs,albums").split(",")
+    if not set(kinds) <= set(searches):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid 'type'")
+    return HTTPStatus.OK, {
+        kind: [
+            {"id": item_id, "display": display}
+            for item_id, display in searches[kind](term, limit)
+        ]
+        for kind in kinds
+    }
+
+
+def _play(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    """Play by ID or the first match of a song, album or playlist name."""
+    if "track_id" in body:
+        with _writing():
+            started = playback.play_track_by_id(str(body["track_id"]))
+        if not started:
+            raise APIError(HTTPStatus.NOT_FOUND, "Track not found")
+        return HTTPStatus.OK, {"ok": True}
+
+    kinds: dict[str, tuple[Callable[..., Any], Callable[[str], bool]]] = {
+        "song": (playback.search_songs, playback.play_track_by_id),
+        "album": (playback.search_albums, playback.play_album_by_name),
+        "playlist": (playback.search_playlists, playback.play_playlist_by_name),
+    }
+    for kind, (search, play) in kinds.items():
+        name = body.get(kind)
+        if not isinstance(name, str):
+            continue
+        matches = search(name, 1)
+        if not matches:
+            raise APIError(HTTPStatus.NOT_FOUND, f"No {kind} found matching '{name}'")
+        item_id, display = matches[0]
+        with _writing():
+            started = play(item_id)
+        if not started:
+            raise APIError(HTTPStatus.BAD_GATEWAY, f"Failed to play {display}")
+        return HTTPStatus.OK, {"ok": True, "playing": display}
+    raise APIError(
+        HTTPStatus.BAD_REQUEST, "Expected 'song', 'album', 'playlist' or 'track_id'"
+    )
+
+
+def _get_airplay(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    devices = [
+        {"name": name, "kind": kind, "available": available, "selected": selected}
+        for name, kind, available, selected in playback.get_airplay_devices()
+    ]
+    return HTTPStatus.OK, {"devices": devices}
+
+
+def _set_airplay(query: dict[str, str], body: JSON) -> tuple[int, JSON]:
+    device = body.get("device")
+    if not isinstance(device, str):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Expected string 'device'")
+    selected = bool(body.get("selected", True))
+    return _write(lambda: playback.set_airplay_device(device, selected))
+
+
+ROUTES: dict[tuple[str, str], Handler] = {
+    ("GET", "/status"): _get_status,
+    ("POST", "/pause"): lambda q, b: _write(playback.pause),
+    ("POST", "/resume"): lambda q, b: _write(playback.resume),
+    ("POST", "/next"): lambda q, b: _write(playback.next_track),
+    ("POST", "/prev"): lambda q, b: _write(playback.previous_track),
+    ("GET", "/volume"): _get_volume,
+    ("POST", "/volume"): _set_volume,
+    ("GET", "/search"): _search,
+    ("POST", "/play"): _play,
+    ("GET", "/airplay"): _get_airplay,
+    ("POST", "/airplay"): _set_airplay,
+}
+
+
+class StatusBroadcaster:
+    """Run one status watcher and fan its changes out to event stream clients."""
+
+    # Seconds to wait before restarting a watcher that failed.
+    RESTART_DELAY = 5.0
+
+    def __init__(self) -> None:
+        self._changed = threading.Condition()
+        self._payload: str | None = None
+        self._version = 0
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+
+    def _publish(self, payload: str) -> None:
+        with self._changed:
+            if payload != self._payload:
+                self._payload = payload
+                self._version += 1
+                self._changed.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                for player_status in status.watch(wake=self._wake):
+                    unknown = {"state": "unknown"}
+                    payload = player_status.to_dict() if player_status else unknown
+                    self._publish(json.dumps(payload))
+            except Exception as e:
+                # Keep serving subscribers: tell them the state is unknown
+                # and start over, e.g. once Music is running again.
+                sys.stderr.write(f"Status watcher failed: {e}\n")
+                self._publish(json.dumps({"state": "unknown"}))
+                self._wake.wait(self.RESTART_DELAY)
+
+    def poke(self) -> None:
+        """Query Music now instead of on the next poll, after a change."""
+        self._wake.set()
+
+    def wait(self, seen_version: int, timeout: float) -> tuple[int, str | None]:
+        """Wait for a payload newer than `seen_version`; returns (version, payload).
+
+        The payload is None if nothing changed within `timeout` seconds.
+        """
+        with self._changed:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._changed.wait_for(lambda: self._version > seen_version, timeout)
+            if self._version > seen_version:
+                return self._version, self._payload
+            return seen_version, None
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "clawtunes"
+
+    # Set by create_server().
+    token: str | None = None
+    broadcaster: StatusBroadcaster
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, code: int, payload: JSON) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        expected = f"Bearer {self.token}"
+        return hmac.compare_digest(self.headers.get("Authorization", ""), expected)
+
+    def _read_body(self) -> JSON:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Where the body ends is unknown, so the connection can't be reused.
+            self.close_connection = True
+            raise APIError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return body
+
+    def _dispatch(self, method: str) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            if not self._authorized():
+                # The body is left unread, so the connection can't be reused.
+                self.close_connection = True
+                raise APIError(HTTPStatus.UNAUTHORIZED, "Missing or invalid token")
+            body = self._read_body()
+            if method == "GET" and url.path == "/events":
+                self._stream_events()
+                return
+            handler = ROUTES.get((method, url.path))
+            if handler is None:
+                raise APIError(HTTPStatus.NOT_FOUND, f"No endpoint {method} {url.path}")
+            code, payload = handler(query, body)
+            if method == "POST":
+                self.broadcaster.poke()
+        except APIError as e:
+            code, payload = e.code, {"error": e.message}
+        self._send_json(code, payload)
+
+    def _stream_events(self) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        version = 0
+        try:
+            while True:
+                version, payload = self.broadcaster.wait(version, timeout=15.0)
+                if payload is None:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(f"event: status\ndata: {payload}\n\n".encode())
+                self.wfile.flush()
+        except OSError:
+            pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+
+def create_server(
+    host: str, port: int, token: str | None = None
+) -> ThreadingHTTPServer:
+    """Create the API server; call serve_forever() on the result to run it."""
+    handler = type(
+        "BoundAPIRequestHandler",
+        (APIRequestHandler,),
+        {"token": token, "broadcaster": StatusBroadcaster()},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
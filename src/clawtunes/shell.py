@@ -0,0 +1,94 @@
+"""Interactive shell (clawtunes shell).
+
+Accepts the usual command grammar without the `clawtunes` prefix and keeps
+library searches, playlists and AirPlay devices cached between commands.
+Items listed by search and playlists are numbered; `play N` plays one.
+"""
+
+import shlex
+from collections.abc import Callable
+
+import click
+
+from clawtunes_helpers import playback, session, status
+
+PROMPT = "clawtunes> "
+
+# Commands after which cached searches, playlists or devices may be outdated.
+LIBRARY_CHANGING_COMMANDS = {"playlist", "dedupe", "airplay"}
+
+_PLAYERS: dict[str, Callable[[str], bool]] = {
+    "song": lambda track_id: playback.play_track_by_id(track_id),
+    "album": lambda name: playback.play_album_by_name(name),
+    "playlist": lambda name: playback.play_playlist_by_name(name),
+}
+
+
+def _play_number(number: int) -> None:
+    item = session.lookup(number)
+    if item is None:
+        click.echo(f"No result {number}; search or list playlists first", err=True)
+        return
+    kind, item_id, display = item
+    click.echo(f"Playing: {display}")
+    played = _PLAYERS[kind](item_id)
+    status.invalidate_status_cache()
+    if not played:
+        click.echo(f"Failed to play {display}", err=True)
+
+
+def _run_line(cli: click.Command, argv: list[str]) -> None:
+    if len(argv) == 2 and argv[0] == "play" and argv[1].isdigit():
+        _play_number(int(argv[1]))
+        return
+    if argv == ["help"]:
+        argv = ["--help"]
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command == "shell":
+        click.echo("Already in the shell", err=True)
+        return
+
+    session.begin_command()
+    try:
+        cli.main(args=argv, prog_name="clawtunes", standalone_mode=True)
+    except SystemExit:
+        pass
+    finally:
+        session.end_command()
+    if command in LIBRARY_CHANGING_COMMANDS:
+        session.invalidate()
+
+
+def run_shell(cli: click.Command) -> None:
+    """Read and run commands until EOF or `exit`."""
+    try:
+        import readline  # noqa: F401 - enables line editing for input()
+    except ImportError:
+        pass
+
+    session.enable()
+    while True:
+        try:
+            line = input(PROMPT)
+        except EOFError:
+            click.echo()
+            return
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            click.echo(f"Invalid command: {e}", err=True)
+            continue
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            return
+        if argv == ["refresh"]:
+            session.invalidate()
+            continue
+        try:
+            _run_line(cli, argv)
+        except KeyboardInterrupt:
+            click.echo()
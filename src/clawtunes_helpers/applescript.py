@@ -1,14 +1,72 @@
 """AppleScript execution wrapper."""
 
+import hashlib
 import subprocess
+import threading
+from collections import OrderedDict
 from collections.abc import Sequence
+from pathlib import Path
+
+# ASCII separator characters (character id 29-31 in AppleScript). They never
+# appear in track metadata, so scripts can join fields and records with them
+# without escaping. Note that str.strip() treats them as whitespace.
+GROUP_SEP = "\x1d"
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+
+
+# Long-running processes (clawtunesd) compile each script the second time it
+# runs and run the compiled file afterwards; see enable_compiled_scripts().
+# Scripts with values built into their text (merged steps, a given volume
+# level) usually run once, so they never pay for compiling. Only the
+# MAX_COMPILED_SCRIPTS most recently run scripts are kept track of.
+MAX_COMPILED_SCRIPTS = 64
+_compiled_dir: Path | None = None
+# Script hash -> compiled path; None if the script has run once so far, ""
+# if it failed to compile. Least recently run first.
+_compiled_paths: OrderedDict[str, str | None] = OrderedDict()
+_compile_lock = threading.Lock()
+
+
+def enable_compiled_scripts(directory: Path) -> None:
+    """Keep compiled copies of repeatedly executed scripts in `directory`."""
+    global _compiled_dir
+    directory.mkdir(parents=True, exist_ok=True)
+    _compiled_dir = directory
+
+
+def _compiled_script(script: str) -> str | None:
+    if _compiled_dir is None:
+        return None
+    key = hashlib.sha256(script.encode("utf-8")).hexdigest()
+    with _compile_lock:
+        if key not in _compiled_paths:
+            _compiled_paths[key] = None
+            while len(_compiled_paths) > MAX_COMPILED_SCRIPTS:
+                _, evicted = _compiled_paths.popitem(last=False)
+                if evicted:
+                    Path(evicted).unlink(missing_ok=True)
+            return None
+        _compiled_paths.move_to_end(key)
+        path = _compiled_paths[key]
+        if path is None:
+            target = str(_compiled_dir / f"{key}.scpt")
+            result = subprocess.run(
+                ["osacompile", "-o", target, "-e", script],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            path = _compiled_paths[key] = target if result.returncode == 0 else ""
+    return path or None
 
 
 def run_applescript(
     script: str, args: Sequence[str] | None = None
 ) -> tuple[str, str, int]:
     """Execute AppleScript and return (stdout, stderr, returncode)."""
-    command = ["osascript", "-e", script]
+    compiled = _compiled_script(script)
+    command = ["osascript", compiled] if compiled else ["osascript", "-e", script]
     if args:
         command.extend(args)
     result = subprocess.run(
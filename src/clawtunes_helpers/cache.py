@@ -0,0 +1,61 @@
+"""Cache directory and file helpers shared by clawtunes processes."""
+
+import fcntl
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, creating it if needed.
+
+    Defaults to ~/Library/Caches/clawtunes; CLAWTUNES_CACHE_DIR overrides it.
+    """
+    override = os.environ.get("CLAWTUNES_CACHE_DIR")
+    if override:
+        path = Path(override)
+    else:
+        path = Path.home() / "Library" / "Caches" / "clawtunes"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a number from the environment, falling back to `default`."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def status_cache_path() -> Path:
+    """Return the path of the player status snapshot shared by processes."""
+    return cache_dir() / "status.json"
+
+
+@contextmanager
+def file_lock(name: str, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on <cache_dir>/<name>.lock across processes.
+
+    Yields True if the lock is held; with blocking=False, yields False
+    instead of waiting when another process holds it.
+    """
+    with open(cache_dir() / f"{name}.lock", "a") as lock_file:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write a file so that concurrent readers never see partial content."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
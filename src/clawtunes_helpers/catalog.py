@@ -1,95 +1,567 @@
 """Search and open from Apple Music catalog using iTunes Search API."""
 
+import email.utils
+import http.client
 import json
+import os
+import random
+import sqlite3
 import subprocess
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Any
 
 import click
 
-from clawtunes_helpers.selection import is_non_interactive, select_item
+from clawtunes_helpers import (
+    catalog_cache,
+    httpclient,
+    library,
+    playback,
+    ranking,
+    ratelimit,
+)
+from clawtunes_helpers.scheduler import coalesce
+from clawtunes_helpers.selection import is_non_interactive, select_from_pages
 
 
-ITUNES_SEARCH_URL = "https://itunes.apple.com/search"
+ITUNES_BASE_URL = "https://itunes.apple.com"
 
 
-def search_catalog(query: str, limit: int = 10) -> list[dict[str, Any]]:
+def base_url() -> str:
+    """Return the iTunes API base URL; CLAWTUNES_ITUNES_URL overrides it."""
+    return os.environ.get("CLAWTUNES_ITUNES_URL", ITUNES_BASE_URL).rstrip("/")
+
+
+class CatalogError(Exception):
+    """The catalog API could not be reached or kept refusing a request."""
+
+
+# Statuses retried with backoff. The iTunes API answers 403 or 429 when
+# clients exceed its rate limit.
+RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+RATE_LIMIT_STATUSES = {403, 429}
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+# Longest wait between attempts; a longer Retry-After fails the request.
+BACKOFF_CAP = 30.0
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter, so processes don't retry in step."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def _retry_after(headers: dict[str, str]) -> float | None:
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - time.time())
+
+
+@coalesce
+def _fetch_results(url: str, retry: bool = True) -> list[dict[str, Any]]:
+    """GET an API URL and return its results.
+
+    Each attempt takes a token from the rate limiter shared by all processes;
+    identical requests in flight at the same time share one call. Raises
+    CatalogError if the API can't be reached or keeps refusing. With
+    retry=False there is a single attempt, which fails instead of waiting
+    for a token.
+    """
+    bucket = ratelimit.catalog_bucket()
+    error = "Catalog request failed"
+    delay = 0.0
+    for attempt in range(MAX_ATTEMPTS if retry else 1):
+        if attempt:
+            time.sleep(delay)
+        if retry:
+            bucket.acquire()
+        elif bucket.try_acquire() > 0:
+            raise CatalogError("Rate limited by the Apple Music catalog")
+        try:
+            response = httpclient.get(url, timeout=10)
+        except (OSError, http.client.HTTPException) as e:
+            error = f"Could not reach the Apple Music catalog: {e}"
+            delay = _backoff(attempt)
+            continue
+
+        if response.status == 200:
+            try:
+                data = json.loads(response.body.decode("utf-8"))
+            except ValueError:
+                raise CatalogError("Unexpected response from the Apple Music catalog")
+            results: list[dict[str, Any]] = data.get("results", [])
+            return results
+
+        error = f"Apple Music catalog returned HTTP {response.status}"
+        if response.status not in RETRY_STATUSES:
+            break
+        retry_after = _retry_after(response.headers)
+        delay = _backoff(attempt) if retry_after is None else retry_after
+        if response.status in RATE_LIMIT_STATUSES:
+            # Slow down every process, not just this request.
+            bucket.pause(delay)
+            error = "Rate limited by the Apple Music catalog"
+        if delay > BACKOFF_CAP:
+            error = f"{error}; try again in {delay:.0f} seconds"
+            break
+    raise CatalogError(error)
+
+
+# Background refreshes of stale cache entries started by this process. They
+# are not daemon threads, so a CLI process finishes them before exiting; a
+# refresh makes a single attempt, so that never takes long. A failed one is
+# retried by the next search that gets the stale entry.
+_refreshes: list[threading.Thread] = []
+
+
+def _refresh(key: str, url: str) -> None:
+    try:
+        try:
+            results = _fetch_results(url, retry=False)
+        except CatalogError:
+            catalog_cache.release_refresh(key)
+        else:
+            catalog_cache.put(key, results)
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def _refresh_in_background(key: str, url: str) -> None:
+    try:
+        if not catalog_cache.claim_refresh(key):
+            return
+    except (OSError, sqlite3.Error):
+        return
+    thread = threading.Thread(target=_refresh, args=(key, url))
+    thread.start()
+    _refreshes.append(thread)
+
+
+def wait_for_refreshes() -> None:
+    """Wait until the background refreshes started by this process are done."""
+    while _refreshes:
+        _refreshes.pop().join()
+
+
+# Coalesced as a whole, not just the request, so the response is cached
+# before another thread with the same search can miss it.
+@coalesce
+def search_catalog(
+    query: str,
+    limit: int = 10,
+    entity: str = "song",
+    country: str | None = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
     """Search Apple Music catalog using iTunes Search API.
 
     Returns list of song dicts with trackId, trackName, artistName, collectionName, trackViewUrl.
+    `offset` skips that many results, for fetching further pages.
+    Responses are cached on disk (see catalog_cache); a stale entry is
+    returned at once and refreshed in the background. Raises CatalogError
+    when the API fails and nothing is cached.
     """
-    params = urllib.parse.urlencode(
-        {
-            "term": query,
-            "media": "music",
-            "entity": "song",
-            "limit": limit,
-        }
-    )
-    url = f"{ITUNES_SEARCH_URL}?{params}"
+    params = {
+        "term": query,
+        "media": "music",
+        "entity": entity,
+        "limit": limit,
+    }
+    if country:
+        params["country"] = country
+    if offset:
+        params["offset"] = offset
+    url = f"{base_url()}/search?{urllib.parse.urlencode(params)}"
+    key = catalog_cache.cache_key(query, entity, limit, country, offset)
 
+    now = time.time()
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
-            results: list[dict[str, Any]] = data.get("results", [])
-            return results
-    except (urllib.error.URLError, json.JSONDecodeError, TimeoutError):
-        return []
+        cached = catalog_cache.get(key, now)
+    except (OSError, sqlite3.Error):
+        cached = None
+    if cached is not None and cached.is_fresh(now):
+        return cached.results
+    if cached is not None and cached.is_servable(now):
+        _refresh_in_background(key, url)
+        return cached.results
 
+    try:
+        results = _fetch_results(url)
+    except CatalogError:
+        # An expired answer is better than none while the API is unreachable.
+        if cached is not None:
+            return cached.results
+        raise
+    try:
+        catalog_cache.put(key, results)
+    except (OSError, sqlite3.Error):
+        pass
+    return results
 
-def format_catalog_results(results: list[dict[str, Any]]) -> list[tuple[str, str]]:
-    """Convert API results to (trackViewUrl, display_text) tuples for select_item()."""
-    formatted = []
-    for item in results:
-        track_url = item.get("trackViewUrl", "")
-        track_name = item.get("trackName", "Unknown")
-        artist = item.get("artistName", "Unknown")
+
+def _describe(item: dict[str, Any]) -> tuple[str, str]:
+    """Return (URL, display text) of a song, album or artist result."""
+    artist = item.get("artistName", "Unknown")
+    wrapper_type = item.get("wrapperType", "track")
+    if wrapper_type == "collection":
         album = item.get("collectionName", "Unknown")
-        display = f"{track_name} - {artist} ({album})"
-        formatted.append((track_url, display))
-    return formatted
+        return item.get("collectionViewUrl", ""), f"{album} - {artist}"
+    if wrapper_type == "artist":
+        genre = item.get("primaryGenreName")
+        display = f"{artist} ({genre})" if genre else artist
+        return item.get("artistLinkUrl", ""), display
+    track_name = item.get("trackName", "Unknown")
+    album = item.get("collectionName", "Unknown")
+    return item.get("trackViewUrl", ""), f"{track_name} - {artist} ({album})"
+
+
+def format_catalog_results(results: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    """Convert API results to (URL, display_text) tuples for select_item()."""
+    return [_describe(item) for item in results]
+
+
+# Entities searched by `catalog search`, with their group titles. The API has
+# no playlist entity.
+CATALOG_ENTITIES = {"song": "Song", "album": "Album", "musicArtist": "Artist"}
+
+# Upper bound on concurrent requests of one multi-entity search.
+MAX_PARALLEL_REQUESTS = 4
+
+
+def search_catalog_entities(
+    query: str, entities: list[str], limit: int = 10, offset: int = 0
+) -> tuple[dict[str, list[dict[str, Any]]], dict[str, CatalogError]]:
+    """Search several entities concurrently.
+
+    Returns (results per entity, error per entity whose search failed).
+    Takes about as long as the slowest single request.
+    """
+    results: dict[str, list[dict[str, Any]]] = {}
+    errors: dict[str, CatalogError] = {}
+    if not entities:
+        return results, errors
+    workers = min(len(entities), MAX_PARALLEL_REQUESTS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            entity: pool.submit(search_catalog, query, limit, entity, offset=offset)
+            for entity in entities
+        }
+        for entity, future in futures.items():
+            try:
+                results[entity] = future.result()
+            except CatalogError as e:
+                errors[entity] = e
+    return results, errors
+
+
+def _name_of(item: dict[str, Any]) -> str:
+    wrapper_type = item.get("wrapperType", "track")
+    if wrapper_type == "collection":
+        return str(item.get("collectionName", ""))
+    if wrapper_type == "artist":
+        return str(item.get("artistName", ""))
+    return str(item.get("trackName", ""))
+
+
+def _match_score(query: str, item: dict[str, Any]) -> int:
+    """Score how well a result matches the query: 0 (weakest) to 4 (exact).
+
+    Names are scored like library matches (see ranking.name_score), one
+    above results whose name, album and artist only contain every word of
+    the query between them, such as "bowie heroes".
+    """
+    score = ranking.name_score(query, _name_of(item))
+    if score:
+        return score + 1
+    fields = [item.get(k, "") for k in ("trackName", "collectionName", "artistName")]
+    text = library.normalize(" ".join(str(f) for f in fields))
+    words = library.normalize(query).split()
+    if words and all(word in text for word in words):
+        return 1
+    return 0
+
+
+# Prefix of the IDs rank_catalog_results() gives songs found in the library,
+# followed by the database ID of the library track.
+LIBRARY_ID_PREFIX = "library:"
+
+
+def find_in_library(
+    index: library.LibraryIndex, item: dict[str, Any]
+) -> library.TrackInfo | None:
+    """Return the library track matching a catalog song, or None."""
+    if item.get("wrapperType", "track") != "track":
+        return None
+    millis = item.get("trackTimeMillis")
+    return index.find(
+        str(item.get("trackName", "")),
+        str(item.get("artistName", "")),
+        str(item.get("collectionName", "")),
+        millis / 1000 if isinstance(millis, (int, float)) else None,
+    )
+
+
+def rank_catalog_results(
+    query: str,
+    results_by_entity: dict[str, list[dict[str, Any]]],
+    index: library.LibraryIndex | None = None,
+) -> list[tuple[str, str]]:
+    """Merge per-entity results into one list for select_item().
+
+    Results stay grouped by entity. Groups are ordered by their best match
+    and results within a group by match score; ties keep the API's order.
+    With a library index, songs in the library are marked and get a
+    LIBRARY_ID_PREFIX ID instead of their URL.
+    """
+    groups = []
+    for entity, results in results_by_entity.items():
+        if not results:
+            continue
+        scored = sorted(
+            ((_match_score(query, item), item) for item in results),
+            key=lambda scored_item: -scored_item[0],
+        )
+        groups.append((scored[0][0], CATALOG_ENTITIES.get(entity, entity), scored))
+    groups.sort(key=lambda group: -group[0])
+
+    ranked = []
+    for _, title, scored in groups:
+        for _, item in scored:
+            url, display = _describe(item)
+            owned = find_in_library(index, item) if index is not None else None
+            if owned is not None:
+                url = f"{LIBRARY_ID_PREFIX}{owned.database_id}"
+                display = f"{display} [in library]"
+            ranked.append((url, f"{title}: {display}"))
+    return ranked
+
+
+_SearchPage = tuple[dict[str, list[dict[str, Any]]], dict[str, CatalogError]]
+
+
+class CatalogPager:
+    """Pages of a multi-entity search, each `limit` results per entity.
+
+    Pages are fetched on demand and kept; prefetch() fetches one in the
+    background, so it is ready by the time the user asks for it.
+    """
+
+    def __init__(
+        self, query: str, entities: list[str], limit: int = 10, offset: int = 0
+    ) -> None:
+        self.query = query
+        self.entities = entities
+        self.limit = limit
+        self.offset = offset
+        self.displays: dict[str, str] = {}
+        self.failed = False
+        self._pages: dict[int, Future[_SearchPage]] = {}
+        self._ranked: dict[int, tuple[list[tuple[str, str]], bool]] = {}
+        self._index: library.LibraryIndex | None = None
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    def _fetch(self, number: int) -> Future[_SearchPage]:
+        if number not in self._pages:
+            self._pages[number] = self._pool.submit(
+                search_catalog_entities,
+                self.query,
+                self.entities,
+                self.limit,
+                self.offset + number * self.limit,
+            )
+        return self._pages[number]
+
+    def prefetch(self, number: int) -> None:
+        """Start fetching a page in the background."""
+        self._fetch(number)
+
+    def page(self, number: int) -> tuple[list[tuple[str, str]], bool]:
+        """Return the ranked items of a page and whether more may follow.
+
+        Errors of entities that failed are printed once per page, and set
+        `failed`.
+        """
+        if number not in self._ranked:
+            results, errors = self._fetch(number).result()
+            for entity, error in errors.items():
+                title = CATALOG_ENTITIES.get(entity, entity).lower()
+                click.echo(f"Failed to search {title}s: {error}", err=True)
+                self.failed = True
+            # Songs are matched against the library to play owned ones
+            # locally; if the library can't be read they are only opened in
+            # the catalog. The index is cached on disk between processes.
+            if results.get("song") and self._index is None:
+                self._index = library.library_index()[0]
+            items = rank_catalog_results(self.query, results, self._index)
+            self.displays.update(items)
+            has_next = any(len(found) >= self.limit for found in results.values())
+            self._ranked[number] = (items, has_next)
+        return self._ranked[number]
+
+    def close(self) -> None:
+        """Drop prefetches that haven't started."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Most IDs the lookup endpoint accepts in one request.
+LOOKUP_CHUNK_SIZE = 200
+
+# Most URLs passed to one `open` call, to stay well under the argument limit.
+OPEN_CHUNK_SIZE = 100
+
+_ID_FIELDS = {"track": "trackId", "collection": "collectionId", "artist": "artistId"}
+
+
+@dataclass
+class LookupResult:
+    """Result of looking up one catalog ID; `result` is None if not found."""
+
+    id: str
+    result: dict[str, Any] | None
+    error: str | None = None
+
+
+def _chunks(ids: Iterable[str], size: int) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    for item_id in ids:
+        chunk.append(item_id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _lookup_chunk(ids: list[str], country: str | None) -> list[LookupResult]:
+    valid = [item_id for item_id in ids if item_id.isdigit()]
+    found: dict[str, dict[str, Any]] = {}
+    error = None
+    if valid:
+        params = {"id": ",".join(dict.fromkeys(valid))}
+        if country:
+            params["country"] = country
+        url = f"{base_url()}/lookup?{urllib.parse.urlencode(params, safe=',')}"
+        try:
+            items = _fetch_results(url)
+        except CatalogError as e:
+            items, error = [], str(e)
+        for item in items:
+            field = _ID_FIELDS.get(item.get("wrapperType", "track"), "trackId")
+            found.setdefault(str(item.get(field)), item)
+    results = []
+    for item_id in ids:
+        if item_id.isdigit():
+            results.append(LookupResult(item_id, found.get(item_id), error))
+        else:
+            results.append(LookupResult(item_id, None, "Invalid ID"))
+    return results
+
+
+def lookup_catalog(
+    ids: Iterable[str], country: str | None = None
+) -> Iterator[LookupResult]:
+    """Look up catalog IDs, yielding one result per ID in input order.
+
+    IDs are sent LOOKUP_CHUNK_SIZE at a time and chunks are fetched
+    concurrently; each result is yielded as soon as it and every result
+    before it are available. `ids` may be a lazy iterable such as stdin.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as pool:
+        pending: deque[Future[list[LookupResult]]] = deque()
+        for chunk in _chunks(ids, LOOKUP_CHUNK_SIZE):
+            pending.append(pool.submit(_lookup_chunk, chunk, country))
+            if len(pending) >= MAX_PARALLEL_REQUESTS:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 def open_catalog_track(track_url: str) -> bool:
     """Open a track URL in the Music app."""
-    try:
-        # Convert https:// URL to music:// scheme
-        music_url = track_url.replace("https://", "music://")
+    return open_catalog_tracks([track_url]) == 1
 
-        result = subprocess.run(
-            ["open", music_url],
-            capture_output=True,
-            text=True,
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
 
+def open_catalog_tracks(track_urls: Iterable[str]) -> int:
+    """Open track URLs in the Music app, many per `open` call.
 
-def search_and_open(query: str, limit: int = 10) -> bool:
-    """Search catalog, let user select, and open the selected track."""
-    results = search_catalog(query, limit)
+    Returns how many were opened; a failed call counts its whole batch.
+    """
+    opened = 0
+    for chunk in _chunks(track_urls, OPEN_CHUNK_SIZE):
+        try:
+            # Convert https:// URLs to the music:// scheme
+            music_urls = [url.replace("https://", "music://") for url in chunk]
+
+            result = subprocess.run(
+                ["open", *music_urls],
+                capture_output=True,
+                text=True,
+            )
+        except Exception:
+            continue
+        if result.returncode == 0:
+            opened += len(chunk)
+    return opened
 
-    if not results:
-        click.echo(f"No results found for '{query}' in Apple Music catalog")
-        return False
 
-    formatted = format_catalog_results(results)
+def search_and_open(
+    query: str,
+    limit: int = 10,
+    entities: list[str] | None = None,
+    offset: int = 0,
+) -> bool:
+    """Search catalog, let user select, and open the selected item.
 
-    if len(formatted) == 1:
-        track_url = formatted[0][0]
-        display = formatted[0][1]
-    else:
-        click.echo(f"Found {len(formatted)} results in Apple Music:")
-        result = select_item(formatted, "Select a song")
-        if result is None:
+    Results are shown `limit` per entity and page; while the user chooses,
+    the next page is prefetched. Songs already in the library are played
+    there instead.
+    """
+    if entities is None:
+        entities = list(CATALOG_ENTITIES)
+    pager = CatalogPager(query, entities, limit, offset)
+    try:
+        formatted, has_next = pager.page(0)
+
+        if not formatted:
+            if not pager.failed:
+                click.echo(f"No results found for '{query}' in Apple Music catalog")
+            return False
+
+        if len(formatted) > 1 or has_next:
+            more = ", more on the next pages" if has_next else ""
+            click.echo(f"Found {len(formatted)} results in Apple Music{more}:")
+        item_url = select_from_pages(pager.page, "Select a result", pager.prefetch)
+        if item_url is None:
             if not is_non_interactive():
                 click.echo("Cancelled")
             return False
-        track_url = result
-        display = next(d for u, d in formatted if u == track_url)
+        display = pager.displays[item_url]
+    finally:
+        pager.close()
+
+    if item_url.startswith(LIBRARY_ID_PREFIX):
+        click.echo(f"Playing from library: {display}")
+        if playback.play_track_by_database_id(item_url.removeprefix(LIBRARY_ID_PREFIX)):
+            return True
+        # Most likely removed from the library since the index was cached.
+        library.invalidate_index()
+        click.echo("The track is no longer in the library", err=True)
+        return False
 
     click.echo(f"Opening in Apple Music: {display}")
-    return open_catalog_track(track_url)
+    return open_catalog_track(item_url)
@@ -0,0 +1,213 @@
+"""On-disk cache of catalog responses, shared by clawtunes processes.
+
+Responses are kept in SQLite under the cache directory, keyed by the
+normalized request. An entry is fresh for CATALOG_TTL seconds; for
+CATALOG_STALE_TTL seconds after that it is still served, while one process
+refreshes it in the background. The least recently used entries are evicted
+when the cache grows past its size limit.
+"""
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from clawtunes_helpers.cache import cache_dir, env_float
+
+# Overridden by CLAWTUNES_CATALOG_TTL, CLAWTUNES_CATALOG_STALE_TTL (seconds)
+# and CLAWTUNES_CATALOG_CACHE_MB.
+DEFAULT_CATALOG_TTL = 24 * 3600.0
+DEFAULT_CATALOG_STALE_TTL = 7 * 24 * 3600.0
+DEFAULT_CATALOG_CACHE_MB = 16.0
+
+# A refresh claimed by a process that hasn't finished it after this long is
+# assumed to have died, and another process may claim it.
+REFRESH_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    refreshing_at REAL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def catalog_ttl() -> float:
+    return env_float("CLAWTUNES_CATALOG_TTL", DEFAULT_CATALOG_TTL)
+
+
+def catalog_stale_ttl() -> float:
+    return env_float("CLAWTUNES_CATALOG_STALE_TTL", DEFAULT_CATALOG_STALE_TTL)
+
+
+def max_cache_bytes() -> int:
+    megabytes = env_float("CLAWTUNES_CATALOG_CACHE_MB", DEFAULT_CATALOG_CACHE_MB)
+    return int(megabytes * 1024 * 1024)
+
+
+def cache_path() -> Path:
+    return cache_dir() / "catalog.sqlite3"
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    # WAL lets readers in other processes continue while one writes; the
+    # timeout makes writers wait for each other instead of failing.
+    with closing(sqlite3.connect(cache_path(), timeout=10)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+
+
+def cache_key(
+    term: str, entity: str, limit: int, country: str | None, offset: int = 0
+) -> str:
+    """Return the key of a request; case and extra whitespace don't matter."""
+    normalized = " ".join(term.casefold().split())
+    key: list[str | int] = [normalized, entity, limit, (country or "US").upper()]
+    if offset:
+        key.append(offset)
+    return json.dumps(key)
+
+
+@dataclass
+class CachedResponse:
+    results: list[dict[str, Any]]
+    fetched_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.fetched_at < catalog_ttl()
+
+    def is_servable(self, now: float) -> bool:
+        """Whether the entry may be served while it is refreshed."""
+        return now - self.fetched_at < catalog_ttl() + catalog_stale_ttl()
+
+
+def _count(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES (?, 1) "
+        "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+        (name,),
+    )
+
+
+def get(key: str, now: float | None = None) -> CachedResponse | None:
+    """Return the cached response for `key`, however old, and mark it used."""
+    if now is None:
+        now = time.time()
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT body, fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            _count(conn, "misses")
+            return None
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        response = CachedResponse(json.loads(row[0]), row[1])
+        if response.is_fresh(now):
+            _count(conn, "hits")
+        elif response.is_servable(now):
+            _count(conn, "stale_hits")
+        else:
+            _count(conn, "misses")
+    return response
+
+
+def put(key: str, results: list[dict[str, Any]], now: float | None = None) -> None:
+    """Store a response, then evict least recently used entries over the limit."""
+    if now is None:
+        now = time.time()
+    body = json.dumps(results, ensure_ascii=False)
+    size = len(body.encode("utf-8"))
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, body, size, fetched_at, accessed_at, refreshing_at) "
+            "VALUES (?, ?, ?, ?, ?, NULL)",
+            (key, body, size, now, now),
+        )
+        _evict(conn, max_cache_bytes())
+
+
+def _evict(conn: sqlite3.Connection, max_bytes: int) -> None:
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+    evicted = []
+    for key, size in conn.execute(
+        "SELECT key, size FROM responses ORDER BY accessed_at"
+    ).fetchall():
+        if total <= max_bytes:
+            break
+        evicted.append((key,))
+        total -= size
+    conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+def claim_refresh(key: str, now: float | None = None) -> bool:
+    """Claim the background refresh of `key`; False if another process has it."""
+    if now is None:
+        now = time.time()
+    with _connect() as conn:
+        cursor = conn.execute(
+            "UPDATE responses SET refreshing_at = ? WHERE key = ? "
+            "AND (refreshing_at IS NULL OR refreshing_at < ?)",
+            (now, key, now - REFRESH_TIMEOUT),
+        )
+        return cursor.rowcount == 1
+
+
+def release_refresh(key: str) -> None:
+    """Give up a claimed refresh that failed, so it can be tried again."""
+    with _connect() as conn:
+        conn.execute("UPDATE responses SET refreshing_at = NULL WHERE key = ?", (key,))
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    size: int
+    max_size: int
+    hits: int
+    stale_hits: int
+    misses: int
+    oldest: float | None
+
+
+def stats() -> CacheStats:
+    with _connect() as conn:
+        entries, size, oldest = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(fetched_at) FROM responses"
+        ).fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+    return CacheStats(
+        entries=entries,
+        size=size,
+        max_size=max_cache_bytes(),
+        hits=counters.get("hits", 0),
+        stale_hits=counters.get("stale_hits", 0),
+        misses=counters.get("misses", 0),
+        oldest=oldest,
+    )
+
+
+def clear() -> int:
+    """Remove every cached response and reset the counters; returns the count."""
+    with _connect() as conn:
+        removed = conn.execute("DELETE FROM responses").rowcount
+        conn.execute("DELETE FROM counters")
+    return removed
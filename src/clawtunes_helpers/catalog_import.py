@@ -0,0 +1,233 @@
+"""Resolve lists of "artist - title" lines against the catalog.
+
+Each line is searched in the catalog on a small worker pool; requests go
+through the catalog module, so they share its connections, cache, rate limit
+and retries. The best-scoring candidate decides whether a line is a
+confident match, an ambiguous one or missing. Confident matches already in
+the library can be added to a playlist in one AppleScript call; others can
+only be opened in Music, from where they can be added to the library.
+"""
+
+import json
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, TextIO
+
+import click
+
+from clawtunes_helpers import catalog, library, ranking
+
+CONFIDENT = "confident"
+AMBIGUOUS = "ambiguous"
+MISSING = "missing"
+FAILED = "failed"
+
+# Catalog songs considered for each line.
+CANDIDATES_PER_LINE = 5
+
+# Lines resolved ahead of the one being reported; the rate limit, not this,
+# bounds the request rate.
+MAX_PENDING_LINES = 32
+
+# Version notes such as "(Remastered 2011)", "[Live]" or "- Single Version".
+_VERSION_NOTE = re.compile(r"\s*(\([^)]*\)|\[[^\]]*\]|\s-\s.*)$")
+
+
+@dataclass
+class ImportMatch:
+    """Outcome of resolving one line."""
+
+    line: int
+    query: str
+    status: str
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+def parse_line(text: str) -> tuple[str, str]:
+    """Split "artist - title" into (artist, title); artist may be empty."""
+    artist, separator, title = text.partition(" - ")
+    if not separator:
+        return "", text.strip()
+    return artist.strip(), title.strip()
+
+
+def _strip_notes(text: str) -> str:
+    while (stripped := _VERSION_NOTE.sub("", text)) != text:
+        text = stripped
+    return text
+
+
+def _similarity(wanted: str, found: str) -> int:
+    """0 (unrelated) to 3 (same text), ignoring case and version notes.
+
+    Texts are compared like library matches (see ranking.name_score); one
+    that starts with the other or has it at a word boundary scores 1.
+    """
+    if ranking.name_score(wanted, found) == 3:
+        return 3
+    if ranking.name_score(_strip_notes(wanted), _strip_notes(found)) == 3:
+        return 2
+    if ranking.name_score(wanted, found) or ranking.name_score(found, wanted):
+        return 1
+    return 0
+
+
+def score(artist: str, title: str, item: dict[str, Any]) -> tuple[int, int]:
+    """Score a catalog song against a line as (title, artist) similarity.
+
+    The artist score is 0 when the line names no artist.
+    """
+    title_score = _similarity(title, str(item.get("trackName", "")))
+    artist_score = _similarity(artist, str(item.get("artistName", ""))) if artist else 0
+    return title_score, artist_score
+
+
+def _rank(scores: tuple[int, int]) -> tuple[int, int]:
+    title_score, artist_score = scores
+    return title_score + artist_score, title_score
+
+
+def _identity(item: dict[str, Any]) -> tuple[str, str]:
+    name = _strip_notes(library.normalize(str(item.get("trackName", ""))))
+    return name, library.normalize(str(item.get("artistName", "")))
+
+
+def classify(line: int, text: str, results: list[dict[str, Any]]) -> ImportMatch:
+    """Pick the best candidate for a line and decide how sure the match is.
+
+    A match is confident when the title matches up to version notes, the
+    artist (if given) at least partly, and no different song scores as well.
+    """
+    artist, title = parse_line(text)
+    scored = [(score(artist, title, item), item) for item in results]
+    if not scored:
+        return ImportMatch(line, text, MISSING)
+    # Candidates are ranked by the sum of both scores, then by title.
+    best_score, best = max(scored, key=lambda scored_item: _rank(scored_item[0]))
+    title_score, artist_score = best_score
+    if title_score == 0:
+        return ImportMatch(line, text, MISSING)
+    rivals = {_identity(item) for s, item in scored if _rank(s) == _rank(best_score)}
+    if title_score >= 2 and (artist_score >= 1 or not artist) and len(rivals) == 1:
+        return ImportMatch(line, text, CONFIDENT, best)
+    return ImportMatch(line, text, AMBIGUOUS, best)
+
+
+def resolve_line(line: int, text: str, country: str | None = None) -> ImportMatch:
+    """Search the catalog for one line and classify the candidates."""
+    artist, title = parse_line(text)
+    query = f"{artist} {title}".strip()
+    try:
+        results = catalog.search_catalog(query, CANDIDATES_PER_LINE, "song", country)
+    except catalog.CatalogError as e:
+        return ImportMatch(line, text, FAILED, error=str(e))
+    return classify(line, text, results)
+
+
+def resolve_lines(
+    lines: Iterable[str], country: str | None = None
+) -> Iterator[ImportMatch]:
+    """Resolve lines concurrently, yielding matches in input order.
+
+    Blank lines and `#` comments are skipped; `lines` may be a lazy iterable
+    such as a file.
+    """
+    with ThreadPoolExecutor(max_workers=catalog.MAX_PARALLEL_REQUESTS) as pool:
+        pending: deque[Future[ImportMatch]] = deque()
+        for number, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text or text.startswith("#"):
+                continue
+            pending.append(pool.submit(resolve_line, number, text, country))
+            if len(pending) >= MAX_PENDING_LINES:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Catalog fields kept in the report.
+_REPORT_FIELDS = (
+    "trackId",
+    "trackName",
+    "artistName",
+    "collectionName",
+    "trackViewUrl",
+)
+
+
+def import_lines(
+    lines: Iterable[str],
+    report: TextIO,
+    playlist_name: str | None = None,
+    open_missing: bool = False,
+    country: str | None = None,
+) -> bool:
+    """Resolve lines, write a JSON line per line to `report`, add matches.
+
+    Confident matches in the library are added to `playlist_name`; with
+    `open_missing`, confident matches not in the library are opened in
+    Music. A summary goes to stderr. Returns False if a line
+    could not be searched or the playlist could not be updated.
+    """
+    index: library.LibraryIndex | None = None
+    if playlist_name is not None or open_missing:
+        index, error = library.library_index()
+        if error:
+            click.echo(f"Could not read the library: {error}", err=True)
+            return False
+
+    counts = dict.fromkeys((CONFIDENT, AMBIGUOUS, MISSING, FAILED), 0)
+    owned: list[str] = []
+    not_owned: list[str] = []
+    for match in resolve_lines(lines, country):
+        counts[match.status] += 1
+        entry: dict[str, Any] = {
+            "line": match.line,
+            "query": match.query,
+            "status": match.status,
+            "match": None,
+        }
+        if match.result is not None:
+            entry["match"] = {
+                k: match.result[k] for k in _REPORT_FIELDS if k in match.result
+            }
+        if match.error is not None:
+            entry["error"] = match.error
+        if index is not None and match.result is not None:
+            track = catalog.find_in_library(index, match.result)
+            entry["library_id"] = track.database_id if track else None
+            if match.status == CONFIDENT:
+                if track is not None:
+                    owned.append(track.database_id)
+                elif match.result.get("trackViewUrl"):
+                    not_owned.append(match.result["trackViewUrl"])
+        report.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        report.flush()
+
+    total = sum(counts.values())
+    click.echo(
+        f"Resolved {total} lines: {counts[CONFIDENT]} confident, "
+        f"{counts[AMBIGUOUS]} ambiguous, {counts[MISSING]} missing, "
+        f"{counts[FAILED]} failed",
+        err=True,
+    )
+    success = counts[FAILED] == 0
+
+    if playlist_name is not None and owned:
+        added, message = library.add_playlist_entries(playlist_name, owned)
+        click.echo(message, err=True)
+        success = success and added
+    if not_owned and not open_missing:
+        click.echo(
+            f"{len(not_owned)} confident matches are not in the library; "
+            "open them with --open to add them in Music",
+            err=True,
+        )
+    if open_missing:
+        opened = catalog.open_catalog_tracks(not_owned)
+        click.echo(f"Opened {opened} tracks in Apple Music", err=True)
+    return success
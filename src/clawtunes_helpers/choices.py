@@ -0,0 +1,84 @@
+"""Remembered choices: the match picked for a query, played directly next time.
+
+Picking the same one of a dozen "Bohemian Rhapsody" versions costs a search
+and a prompt every time. The pick made at the prompt is remembered per
+command and normalized query, so the next time it is played without
+searching; playing it doubles as the check that it still exists. Only the
+MAX_CHOICES most recently used queries are kept.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from clawtunes_helpers.cache import cache_dir, file_lock, write_atomic
+from clawtunes_helpers.library import normalize
+
+MAX_CHOICES = 200
+
+
+@dataclass(frozen=True)
+class Choice:
+    """A remembered pick: the ID to play it by and how it was listed."""
+
+    item_id: str
+    display: str
+
+
+def _path() -> Path:
+    return cache_dir() / "choices.json"
+
+
+def _key(command: str, query: str) -> str:
+    return f"{command}:{normalize(query)}"
+
+
+def _load() -> dict[str, list[str]]:
+    """Return the remembered choices, least recently used first."""
+    try:
+        entries = json.loads(_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _save(entries: dict[str, list[str]]) -> None:
+    write_atomic(_path(), json.dumps(entries, ensure_ascii=False))
+
+
+def recall(command: str, query: str) -> Choice | None:
+    """Return the choice remembered for a query, if any."""
+    entry = _load().get(_key(command, query))
+    if not isinstance(entry, list) or len(entry) != 2:
+        return None
+    return Choice(str(entry[0]), str(entry[1]))
+
+
+def remember(command: str, query: str, choice: Choice) -> None:
+    """Remember a choice as the most recently used one, evicting the oldest."""
+    key = _key(command, query)
+    with file_lock("choices"):
+        entries = _load()
+        entries.pop(key, None)
+        entries[key] = [choice.item_id, choice.display]
+        for old_key in list(entries)[: max(0, len(entries) - MAX_CHOICES)]:
+            del entries[old_key]
+        _save(entries)
+
+
+def forget(command: str, query: str) -> None:
+    """Forget the choice remembered for a query."""
+    key = _key(command, query)
+    with file_lock("choices"):
+        entries = _load()
+        if entries.pop(key, None) is not None:
+            _save(entries)
+
+
+def clear() -> int:
+    """Forget every remembered choice; returns how many there were."""
+    with file_lock("choices"):
+        entries = _load()
+        if entries:
+            _save({})
+    return len(entries)
@@ -0,0 +1,216 @@
+"""Play history: an append-only log plus an index for fast queries."""
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from clawtunes_helpers.cache import cache_dir, file_lock
+from clawtunes_helpers.status import NowPlaying, PlayerStatus
+
+# The raw log is rotated when it grows past MAX_LOG_BYTES; only KEEP_LOGS old
+# files are kept. Queries never read the log: every play also goes into the
+# index, whose per-day summary keeps aggregates cheap after years of history.
+MAX_LOG_BYTES = 1_000_000
+KEEP_LOGS = 5
+
+# The same track seen again after its duration plus this margin is a replay.
+REPLAY_MARGIN = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    ts REAL NOT NULL,
+    name TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plays_ts ON plays (ts);
+CREATE TABLE IF NOT EXISTS daily_artist_plays (
+    day TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    plays INTEGER NOT NULL,
+    PRIMARY KEY (day, artist)
+);
+CREATE TABLE IF NOT EXISTS last_play (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    ts REAL NOT NULL,
+    track_key TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+"""
+
+# Last play seen by this process as (track key, start, duration), so repeated
+# polls of the same play don't have to open the index.
+_last_observed: tuple[tuple[str, str, str], float, float] | None = None
+
+
+@dataclass
+class Play:
+    """A single recorded play."""
+
+    timestamp: float
+    name: str
+    artist: str
+    album: str
+
+
+def _history_dir() -> Path:
+    path = cache_dir() / "history"
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _log_path() -> Path:
+    return _history_dir() / "plays.log"
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    with closing(sqlite3.connect(_history_dir() / "index.sqlite3")) as conn:
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def _rotate_log(log_path: Path) -> None:
+    if not log_path.exists() or log_path.stat().st_size < MAX_LOG_BYTES:
+        return
+    oldest = log_path.with_name(f"{log_path.name}.{KEEP_LOGS}")
+    oldest.unlink(missing_ok=True)
+    for i in range(KEEP_LOGS - 1, 0, -1):
+        rotated = log_path.with_name(f"{log_path.name}.{i}")
+        if rotated.exists():
+            rotated.rename(log_path.with_name(f"{log_path.name}.{i + 1}"))
+    log_path.rename(log_path.with_name(f"{log_path.name}.1"))
+
+
+def record_play(play: Play, duration: float = 0.0) -> None:
+    """Append a play to the log and the index."""
+    log_path = _log_path()
+    _rotate_log(log_path)
+    entry = {
+        "ts": play.timestamp,
+        "name": play.name,
+        "artist": play.artist,
+        "album": play.album,
+    }
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO plays (ts, name, artist, album) VALUES (?, ?, ?, ?)",
+            (play.timestamp, play.name, play.artist, play.album),
+        )
+        conn.execute(
+            "INSERT INTO daily_artist_plays (day, artist, plays) VALUES (?, ?, 1) "
+            "ON CONFLICT (day, artist) DO UPDATE SET plays = plays + 1",
+            (_day(play.timestamp), play.artist),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO last_play (id, ts, track_key, duration) "
+            "VALUES (1, ?, ?, ?)",
+            (
+                play.timestamp,
+                json.dumps([play.name, play.artist, play.album]),
+                duration,
+            ),
+        )
+
+
+def _is_same_play(
+    last: tuple[tuple[str, str, str], float, float] | None,
+    key: tuple[str, str, str],
+    started_at: float,
+) -> bool:
+    if last is None:
+        return False
+    last_key, last_started_at, last_duration = last
+    if last_key != key:
+        return False
+    return started_at < last_started_at + last_duration + REPLAY_MARGIN
+
+
+def observe(player_status: PlayerStatus | None, now: float | None = None) -> bool:
+    """Record the current track if it started playing since the last record.
+
+    Called with every status sample; returns True if a play was recorded.
+    """
+    if player_status is None or player_status.player_state != "playing":
+        return False
+    if player_status.now_playing is None:
+        return False
+    return observe_track(player_status.now_playing, now)
+
+
+def observe_track(track: NowPlaying, now: float | None = None) -> bool:
+    """Record a playing track unless it is the play recorded last.
+
+    History is best effort: failing to write it is not an error.
+    """
+    global _last_observed
+
+    if now is None:
+        now = time.time()
+    key = (track.name, track.artist, track.album)
+    started_at = now - track.position
+    if _is_same_play(_last_observed, key, started_at):
+        return False
+
+    try:
+        with file_lock("history"):
+            with _connect() as conn:
+                row = conn.execute(
+                    "SELECT track_key, ts, duration FROM last_play WHERE id = 1"
+                ).fetchone()
+            if row is not None:
+                last = (tuple(json.loads(row[0])), row[1], row[2])
+                if _is_same_play(last, key, started_at):
+                    _last_observed = last
+                    return False
+            record_play(Play(started_at, *key), track.duration)
+    except (OSError, sqlite3.Error):
+        return False
+    _last_observed = (key, started_at, track.duration)
+    return True
+
+
+def recent_plays(limit: int = 20) -> list[Play]:
+    """Return the most recent plays, newest first."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT ts, name, artist, album FROM plays ORDER BY ts DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return [Play(*row) for row in rows]
+
+
+def top_artists(days: int = 7, limit: int = 10) -> list[tuple[str, int]]:
+    """Return (artist, plays) for the last `days` days, most played first."""
+    since = _day(time.time() - (days - 1) * 86400)
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT artist, SUM(plays) AS total FROM daily_artist_plays "
+            "WHERE day >= ? GROUP BY artist ORDER BY total DESC, artist LIMIT ?",
+            (since, limit),
+        ).fetchall()
+    return [(artist, total) for artist, total in rows]
+
+
+def plays_per_day(days: int = 7) -> list[tuple[str, int]]:
+    """Return (day, plays) for the last `days` days that had plays, newest first."""
+    since = _day(time.time() - (days - 1) * 86400)
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT day, SUM(plays) FROM daily_artist_plays "
+            "WHERE day >= ? GROUP BY day ORDER BY day DESC",
+            (since,),
+        ).fetchall()
+    return [(day, total) for day, total in rows]
@@ -0,0 +1,130 @@
+"""Pooled HTTP client for catalog requests.
+
+Connections are kept alive and reused by every catalog call in the process,
+so only the first request to a host pays for the TCP and TLS handshakes.
+Responses are requested gzip-compressed and decompressed here.
+"""
+
+import gzip
+import http.client
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+
+DEFAULT_TIMEOUT = 10.0
+
+# Idle connections kept per host; extra ones are closed when returned.
+MAX_IDLE_PER_HOST = 4
+
+# Errors that mean a kept-alive connection was closed by the server while
+# idle. A request that fails this way on a reused connection is retried on
+# another one.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_Key = tuple[str, str, int | None]
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes = field(repr=False)
+
+
+class ConnectionPool:
+    """Keep-alive connections per (scheme, host, port), safe to share."""
+
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST) -> None:
+        self._max_idle = max_idle_per_host
+        self._idle: dict[_Key, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _checkout(
+        self, key: _Key, timeout: float
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _checkin(self, key: _Key, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def get(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> Response:
+        """GET `url` on a pooled connection.
+
+        Returns the response whatever its status; raises OSError or
+        http.client.HTTPException when no response could be read.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+
+        while True:
+            connection, reused = self._checkout(key, timeout)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+
+        response_headers = {
+            name.lower(): value for name, value in response.getheaders()
+        }
+        if response_headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return Response(response.status, response_headers, body)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+_pool = ConnectionPool()
+
+
+def get(url: str, timeout: float = DEFAULT_TIMEOUT) -> Response:
+    """GET `url` using the connection pool shared by the process."""
+    return _pool.get(url, timeout)
+
+
+def close() -> None:
+    """Close the idle connections of the shared pool."""
+    _pool.close()
@@ -0,0 +1,362 @@
+"""Bulk library metadata and duplicate detection."""
+
+import dataclasses
+import json
+import time
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+import click
+
+from clawtunes_helpers import session
+from clawtunes_helpers.applescript import GROUP_SEP, RECORD_SEP, run_applescript
+from clawtunes_helpers.cache import cache_dir, env_float, write_atomic
+from clawtunes_helpers.scheduler import coalesce, serialized
+from clawtunes_helpers.selection import is_non_interactive
+
+
+@dataclass(frozen=True)
+class TrackInfo:
+    """Metadata of a single track in the library or a playlist."""
+
+    index: int
+    database_id: str
+    name: str
+    artist: str
+    album: str
+    duration: float
+
+    @property
+    def display(self) -> str:
+        """Format as name - artist (album) [m:ss]."""
+        minutes = int(self.duration) // 60
+        seconds = int(self.duration) % 60
+        return f"{self.name} - {self.artist} ({self.album}) [{minutes}:{seconds:02d}]"
+
+
+def _bulk_tracks_script() -> str:
+    # Each property is fetched for every track with a single Apple Event and
+    # joined into one column, so the cost does not grow with per-track calls.
+    return """
+on run argv
+    set playlistName to item 1 of argv
+    tell application "Music"
+        if playlistName is "" then
+            set src to library playlist 1
+        else
+            if not (exists playlist playlistName) then
+                return "playlist_not_found"
+            end if
+            set src to playlist playlistName
+        end if
+        set trackIds to database ID of every track of src
+        set trackNames to name of every track of src
+        set trackArtists to artist of every track of src
+        set trackAlbums to album of every track of src
+        set trackDurations to duration of every track of src
+    end tell
+    set groupSep to character id 29
+    set AppleScript's text item delimiters to character id 30
+    set output to (trackIds as text) & groupSep & (trackNames as text) & groupSep
+    set output to output & (trackArtists as text) & groupSep & (trackAlbums as text)
+    set output to output & groupSep & (trackDurations as text)
+    set AppleScript's text item delimiters to ""
+    return output
+end run
+"""
+
+
+def _split_column(column: str) -> list[str]:
+    return column.split(RECORD_SEP) if column else []
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return 0.0
+
+
+def _clean(value: str) -> str:
+    return "" if value == "missing value" else value
+
+
+def parse_bulk_tracks(stdout: str) -> list[TrackInfo]:
+    """Parse the column-oriented output of the bulk tracks script."""
+    columns = stdout.split(GROUP_SEP)
+    if len(columns) < 5:
+        return []
+
+    ids, names, artists, albums, durations = (_split_column(c) for c in columns[:5])
+    return [
+        TrackInfo(
+            index=i,
+            database_id=track_id,
+            name=_clean(name),
+            artist=_clean(artist),
+            album=_clean(album),
+            duration=_parse_float(duration),
+        )
+        for i, (track_id, name, artist, album, duration) in enumerate(
+            zip(ids, names, artists, albums, durations), 1
+        )
+    ]
+
+
+@coalesce
+def fetch_tracks(playlist_name: str | None = None) -> tuple[list[TrackInfo], str]:
+    """Fetch metadata of every track in the library or a playlist in one call.
+
+    Returns (tracks, error) tuple; error is empty on success.
+    """
+    stdout, stderr, returncode = run_applescript(
+        _bulk_tracks_script(), [playlist_name or ""]
+    )
+    if returncode != 0:
+        return [], stderr or "Failed to read tracks from Music"
+    if stdout == "playlist_not_found":
+        return [], f"Playlist '{playlist_name}' not found"
+    return parse_bulk_tracks(stdout), ""
+
+
+def normalize(text: str) -> str:
+    """Normalize text for matching: unicode form, case and whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def track_key(track: TrackInfo) -> tuple[str, str, str, int]:
+    """Identity of a track for duplicate detection."""
+    return (
+        normalize(track.name),
+        normalize(track.artist),
+        normalize(track.album),
+        round(track.duration),
+    )
+
+
+# Library and catalog durations of the same recording may differ slightly.
+DURATION_TOLERANCE = 2.0
+
+
+class LibraryIndex:
+    """Library tracks by normalized name, artist and album, for lookups."""
+
+    def __init__(self, tracks: list[TrackInfo]) -> None:
+        self._tracks: dict[tuple[str, str, str], list[TrackInfo]] = {}
+        for track in tracks:
+            key = (
+                normalize(track.name),
+                normalize(track.artist),
+                normalize(track.album),
+            )
+            self._tracks.setdefault(key, []).append(track)
+
+    def find(
+        self, name: str, artist: str, album: str, duration: float | None = None
+    ) -> TrackInfo | None:
+        """Return a library track matching the metadata, or None.
+
+        The duration, when known, must match within DURATION_TOLERANCE.
+        """
+        key = (normalize(name), normalize(artist), normalize(album))
+        for track in self._tracks.get(key, []):
+            if duration is None or abs(track.duration - duration) <= DURATION_TOLERANCE:
+                return track
+        return None
+
+
+# The tracks behind the library index are kept on disk for this long
+# (CLAWTUNES_LIBRARY_TTL overrides it), so every catalog search doesn't read
+# the whole library. Tracks added or removed in Music meanwhile are missed
+# until it expires.
+DEFAULT_LIBRARY_TTL = 600.0
+
+
+def _index_path() -> Path:
+    return cache_dir() / "library_index.json"
+
+
+def _cached_tracks(now: float) -> list[TrackInfo] | None:
+    try:
+        data = json.loads(_index_path().read_text(encoding="utf-8"))
+        if now - data["fetched_at"] > env_float(
+            "CLAWTUNES_LIBRARY_TTL", DEFAULT_LIBRARY_TTL
+        ):
+            return None
+        return [TrackInfo(*row) for row in data["tracks"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def invalidate_index() -> None:
+    """Make the next library_index() read the library again."""
+    session.invalidate()
+    _index_path().unlink(missing_ok=True)
+
+
+@session.cached
+def library_index() -> tuple[LibraryIndex, str]:
+    """Index the whole library, read in one call or from the cache directory.
+
+    Returns (index, error) tuple; the index is empty if the library could
+    not be read.
+    """
+    now = time.time()
+    tracks = _cached_tracks(now)
+    if tracks is not None:
+        return LibraryIndex(tracks), ""
+    tracks, error = fetch_tracks()
+    if not error:
+        data = {
+            "fetched_at": now,
+            "tracks": [dataclasses.astuple(track) for track in tracks],
+        }
+        try:
+            write_atomic(_index_path(), json.dumps(data, ensure_ascii=False))
+        except OSError:
+            pass
+    return LibraryIndex(tracks), error
+
+
+def find_duplicates(tracks: list[TrackInfo]) -> list[list[TrackInfo]]:
+    """Group tracks sharing the same normalized identity in a single pass.
+
+    Returns only groups with more than one track, each in playlist order; the
+    first track of a group is the one to keep.
+    """
+    groups: dict[tuple[str, str, str, int], list[TrackInfo]] = {}
+    for track in tracks:
+        groups.setdefault(track_key(track), []).append(track)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+@serialized
+def remove_playlist_entries(
+    playlist_name: str, tracks: list[TrackInfo]
+) -> tuple[bool, str]:
+    """Remove the given entries from a playlist in a single AppleScript call.
+
+    Entries are deleted by position, last first, so earlier positions stay
+    valid; an entry is skipped if its position no longer holds the same track.
+    Returns (success, message) tuple.
+    """
+    script = """
+on run argv
+    set playlistName to item 1 of argv
+    set removedCount to 0
+    tell application "Music"
+        if not (exists playlist playlistName) then
+            return "playlist_not_found"
+        end if
+        set targetPlaylist to playlist playlistName
+        set trackCount to count of tracks of targetPlaylist
+        repeat with i from 2 to (count of argv) by 2
+            set trackIndex to (item i of argv) as integer
+            set expectedId to (item (i + 1) of argv) as integer
+            if trackIndex <= trackCount then
+                set t to track trackIndex of targetPlaylist
+                if database ID of t is expectedId then
+                    delete t
+                    set removedCount to removedCount + 1
+                end if
+            end if
+        end repeat
+        return removedCount as string
+    end tell
+end run
+"""
+    args = [playlist_name]
+    for track in sorted(tracks, key=lambda t: t.index, reverse=True):
+        args.extend([str(track.index), track.database_id])
+
+    stdout, stderr, returncode = run_applescript(script, args)
+    if returncode != 0:
+        return False, stderr
+    result = stdout.strip()
+    if result == "playlist_not_found":
+        return False, f"Playlist '{playlist_name}' not found"
+    return True, f"Removed {result} duplicate tracks from '{playlist_name}'"
+
+
+@serialized
+def add_playlist_entries(
+    playlist_name: str, database_ids: list[str]
+) -> tuple[bool, str]:
+    """Add library tracks to a playlist in a single AppleScript call.
+
+    The playlist is created if it doesn't exist; IDs no longer in the
+    library are skipped. Returns (success, message) tuple.
+    """
+    script = """
+on run argv
+    set playlistName to item 1 of argv
+    set addedCount to 0
+    tell application "Music"
+        if not (exists playlist playlistName) then
+            make new playlist with properties {name:playlistName}
+        end if
+        set targetPlaylist to playlist playlistName
+        repeat with i from 2 to (count of argv)
+            set dbId to (item i of argv) as integer
+            try
+                set t to (first track of library playlist 1 whose database ID is dbId)
+                duplicate t to targetPlaylist
+                set addedCount to addedCount + 1
+            end try
+        end repeat
+        return addedCount as string
+    end tell
+end run
+"""
+    stdout, stderr, returncode = run_applescript(script, [playlist_name, *database_ids])
+    if returncode != 0:
+        return False, stderr
+    return True, f"Added {stdout.strip()} tracks to '{playlist_name}'"
+
+
+def dedupe(playlist_name: str | None, remove: bool, assume_yes: bool) -> bool:
+    """Report duplicate tracks and optionally remove the extras from a playlist."""
+    tracks, error = fetch_tracks(playlist_name)
+    if error:
+        click.echo(error, err=True)
+        return False
+
+    source = f"'{playlist_name}'" if playlist_name else "the library"
+    groups = find_duplicates(tracks)
+    if not groups:
+        click.echo(f"No duplicates found in {source} ({len(tracks)} tracks)")
+        return True
+
+    extras = [track for group in groups for track in group[1:]]
+    click.echo(
+        f"Found {len(groups)} duplicate groups in {source} "
+        f"({len(extras)} extra tracks out of {len(tracks)}):"
+    )
+    for group in groups:
+        click.echo(f"  {group[0].display} x{len(group)}")
+    click.echo()
+
+    if not remove:
+        click.echo(f"Would remove {len(extras)} tracks (use --remove to delete them)")
+        return True
+
+    if playlist_name is None:
+        click.echo(
+            "Removing duplicates from the whole library is not supported; "
+            "use --playlist",
+            err=True,
+        )
+        return False
+
+    if not assume_yes:
+        if is_non_interactive():
+            click.echo("--yes is required to remove tracks with -N", err=True)
+            return False
+        if not click.confirm(f"Remove {len(extras)} tracks from {source}?"):
+            click.echo("Cancelled")
+            return False
+
+    success, message = remove_playlist_entries(playlist_name, extras)
+    click.echo(message, err=not success)
+    return success
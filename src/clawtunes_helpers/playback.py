@@ -1,46 +1,234 @@
 """Play songs/albums/playlists and control playback."""
 
-import click
+import itertools
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import TypeVar
 
-from clawtunes_helpers.applescript import run_applescript
-from clawtunes_helpers.selection import is_non_interactive, select_item
+import click
 
+from clawtunes_helpers import choices, history, ranking, session, transport
+from clawtunes_helpers.applescript import (
+    FIELD_SEP,
+    GROUP_SEP,
+    RECORD_SEP,
+    run_applescript,
+)
+from clawtunes_helpers.cache import cache_dir
+from clawtunes_helpers.scheduler import coalesce, serialized, supersedable
+from clawtunes_helpers.selection import (
+    is_first,
+    is_non_interactive,
+    select_from_chunks,
+    select_item,
+)
+from clawtunes_helpers.status import NowPlaying
+
+# Collects the properties matches are ranked by, for every match at once:
+# each `property of matches` is a single Apple Event however many tracks
+# match. The played dates are turned into seconds ago in the script, since
+# their text form depends on the locale.
+_RANKING_COLUMNS = """
+        set matchRatings to rating of matches
+        set matchPlayCounts to played count of matches
+        set matchPlayedDates to played date of matches
+    end tell
+    set now to current date
+    set matchPlayedAgo to {}
+    repeat with playedDate in matchPlayedDates
+        set playedDate to contents of playedDate
+        if class of playedDate is date then
+            set end of matchPlayedAgo to (now - playedDate) as integer
+        else
+            set end of matchPlayedAgo to ""
+        end if
+    end repeat
+"""
 
-def search_songs(name: str, limit: int | None = None) -> list[tuple[str, str]]:
-    """Search for songs by name.
 
-    Returns list of (id, display_text) tuples.
+def _join_columns(names: list[str]) -> str:
+    """AppleScript returning the given list variables as separated columns."""
+    joined = " & groupSep & ".join(f"({name} as text)" for name in names)
+    return f"""
+    set groupSep to character id 29
+    set AppleScript's text item delimiters to character id 30
+    set output to {joined}
+    set AppleScript's text item delimiters to ""
+    return output
+"""
+
+
+def _parse_columns(stdout: str, count: int) -> list[tuple[str, ...]]:
+    """Split columns joined by _join_columns() into one tuple per match.
+
+    run_applescript() strips trailing separators, so missing trailing values
+    are read as empty.
+    """
+    columns = [column.split(RECORD_SEP) for column in stdout.split(GROUP_SEP)]
+    if not columns[0] or columns[0] == [""]:
+        return []
+    columns += [[]] * (count - len(columns))
+    return list(itertools.zip_longest(*columns[:count], fillvalue=""))
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _seconds(value: str) -> float | None:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _limited(ranked: list[ranking.Match], limit: int | None) -> list[tuple[str, str]]:
+    if limit:
+        ranked = ranked[:limit]
+    return [(match.item_id, match.display) for match in ranked]
+
+
+# Song search by name. With a first and last index as well, it only reads
+# those matches and adds the number of matches as the last column, so the
+# first few can be shown before the rest are read (see _streamed).
+_SEARCH_SONGS = (
     """
-    script = """
 on run argv
     set query to item 1 of argv
-    set limitValue to item 2 of argv as integer
+    set ranged to (count of argv) > 1
+    if ranged then
+        set firstIndex to item 2 of argv as integer
+        set lastIndex to item 3 of argv as integer
+    end if
+    set matchCount to ""
     tell application "Music"
-        set matchingTracks to (every track whose name contains query)
-        if limitValue > 0 then
-            if (count of matchingTracks) > limitValue then
-                set matchingTracks to items 1 thru limitValue of matchingTracks
-            end if
+        set matches to a reference to (every track whose name contains query)
+        if ranged then
+            set matchCount to count of matches
+            if lastIndex > matchCount then set lastIndex to matchCount
+            if firstIndex > lastIndex then return matchCount as text
+            set matches to a reference to (items firstIndex thru lastIndex of matches)
         end if
-        set output to ""
-        repeat with t in matchingTracks
-            set trackId to id of t
-            set trackName to name of t
-            set trackArtist to artist of t
-            set trackAlbum to album of t
-            set output to output & trackId & "|" & trackName & "|" & trackArtist & "|" & trackAlbum & linefeed
-        end repeat
-        return output
-    end tell
-end run
+        set matchIds to id of matches
+        set matchNames to name of matches
+        set matchArtists to artist of matches
+        set matchAlbums to album of matches
 """
-    limit_value = limit if limit is not None else 0
-    stdout, _, returncode = run_applescript(script, [name, str(limit_value)])
+    + _RANKING_COLUMNS
+    + _join_columns(
+        [
+            "matchIds",
+            "matchRatings",
+            "matchPlayCounts",
+            "matchPlayedAgo",
+            "matchArtists",
+            "matchAlbums",
+            "matchNames",
+            "matchCount",
+        ]
+    )
+    + "end run\n"
+)
+
+# Matches read by the first call of a streamed search. The rest are read by
+# one more call: every call launches osascript and makes Music filter the
+# library again, so smaller chunks would only add to the total time.
+STREAM_CHUNK_SIZE = 25
+
+T = TypeVar("T")
+
+
+def _streamed(
+    fetch: Callable[[int, int], tuple[list[T], int]],
+) -> tuple[int, Iterator[list[T]]]:
+    """Read the first STREAM_CHUNK_SIZE items now and the rest when needed.
+
+    `fetch(first, last)` returns the items numbered first to last (from 1)
+    and how many there are. Returns how many there are and an iterator over
+    the chunks: the first one, then the rest.
+    """
+    items, total = fetch(1, STREAM_CHUNK_SIZE)
+
+    def chunks() -> Iterator[list[T]]:
+        yield items
+        if total > len(items):
+            yield fetch(len(items) + 1, total)[0]
+
+    return total, chunks()
+
+
+def _parse_songs(stdout: str) -> list[ranking.Match]:
+    return [
+        ranking.Match(
+            item_id=track_id,
+            display=f"{track_name} - {artist} ({album})",
+            name=track_name,
+            rating=_int(rating),
+            play_count=_int(play_count),
+            played_ago=_seconds(played_ago),
+        )
+        for track_id, rating, play_count, played_ago, artist, album, track_name in (
+            _parse_columns(stdout, 7)
+        )
+    ]
+
+
+@session.cached
+@coalesce
+def search_songs(name: str, limit: int | None = None) -> list[tuple[str, str]]:
+    """Search for songs by name, best matches first (see ranking).
+
+    Returns list of (id, display_text) tuples.
+    """
+    stdout, _, returncode = run_applescript(_SEARCH_SONGS, [name])
 
     if returncode != 0 or not stdout:
         return []
 
+    return _limited(ranking.rank(name, _parse_songs(stdout)), limit)
+
+
+def _song_range(name: str, first: int, last: int) -> tuple[list[ranking.Match], int]:
+    stdout, _, returncode = run_applescript(
+        _SEARCH_SONGS, [name, str(first), str(last)]
+    )
+    if returncode != 0:
+        return [], 0
+    if GROUP_SEP not in stdout:
+        # No matches in the range; just their number.
+        return [], _int(stdout)
+    return _parse_songs(stdout), _int(stdout.rsplit(GROUP_SEP, 1)[1])
+
+
+def stream_songs(name: str) -> tuple[int, Iterator[list[ranking.Match]]]:
+    """Search for songs by name, in library order and chunks (see _streamed)."""
+    return _streamed(lambda first, last: _song_range(name, first, last))
+
+
+def _songs_to_pick(name: str) -> list[tuple[str, str]]:
+    """Return the songs to pick from, like search_songs().
+
+    With -1, only the song it picks: the best match, except that an exact
+    match is picked as soon as a chunk has one, without reading the rest;
+    the best one of that chunk.
+    """
+    if not is_first():
+        return search_songs(name)
+    _, chunks = stream_songs(name)
+    seen: list[ranking.Match] = []
+    for chunk in chunks:
+        exact = [match for match in chunk if ranking.name_score(name, match.name) == 3]
+        if exact:
+            seen = exact
+            break
+        seen += chunk
+    return _limited(ranking.rank(name, seen), 1)
+
+
+def _parse_song_lines(stdout: str) -> list[tuple[str, str]]:
     results = []
     for line in stdout.strip().split("\n"):
         if not line.strip():
@@ -54,24 +242,98 @@ end run
     return results
 
 
-def play_track_by_id(track_id: str) -> bool:
-    """Play a track by its ID."""
-    script = """
+# Returns the track that started playing, so play commands can record it in
+# the history without another AppleScript call.
+_STARTED_TRACK = """
+        try
+            set fs to character id 31
+            set t to current track
+            set startedTrack to (name of t) & fs & (artist of t) & fs & (album of t) & fs & ((duration of t) as string)
+        on error
+            set startedTrack to ""
+        end try
+"""
+
+
+def _record_started_track(fields: list[str]) -> None:
+    if len(fields) != 4:
+        return
+    name, artist, album, duration = fields
+    try:
+        seconds = float(duration.replace(",", "."))
+    except ValueError:
+        return
+    history.observe_track(NowPlaying(name, artist, album, seconds, 0.0))
+
+
+def _play_track(id_property: str, track_id: str) -> bool:
+    script = (
+        f"""
 on run argv
     set trackId to item 1 of argv as integer
     tell application "Music"
-        set t to (first track whose id is trackId)
+        set t to (first track whose {id_property} is trackId)
         play t
+"""
+        + _STARTED_TRACK
+        + """
+        return startedTrack
     end tell
 end run
 """
-    _, _, returncode = run_applescript(script, [track_id])
-    return returncode == 0
+    )
+    stdout, _, returncode = run_applescript(script, [track_id])
+    if returncode != 0:
+        return False
+    _record_started_track(stdout.split(FIELD_SEP))
+    return True
+
+
+@serialized
+def play_track_by_id(track_id: str) -> bool:
+    """Play a track by its ID."""
+    return _play_track("id", track_id)
+
+
+@serialized
+def play_track_by_database_id(database_id: str) -> bool:
+    """Play a track by its database ID, as listed by library.fetch_tracks()."""
+    return _play_track("database ID", database_id)
+
+
+def _play_remembered(
+    command: str, name: str, fresh: bool, label: str, play: Callable[[str], bool]
+) -> bool:
+    """Play the choice remembered for `name`, if there is one.
+
+    Returns False, forgetting the choice, if it can no longer be played or
+    `fresh` is set; the caller then searches as usual. With -N nothing is
+    played, since it only lists the matches.
+    """
+    choice = None if fresh or is_non_interactive() else choices.recall(command, name)
+    if choice is None:
+        if fresh:
+            choices.forget(command, name)
+        return False
+    if not play(choice.item_id):
+        choices.forget(command, name)
+        return False
+    click.echo(f"{label}: {choice.display}")
+    choices.remember(command, name, choice)
+    return True
 
 
-def play_song(name: str) -> bool:
-    """Search for and play a song by name."""
-    songs = search_songs(name)
+def play_song(name: str, fresh: bool = False) -> bool:
+    """Search for and play a song by name.
+
+    The song picked at the prompt from several matches is played directly
+    next time (see choices); `fresh` forgets it and searches again. Picks
+    made by -1 are not remembered.
+    """
+    if _play_remembered("song", name, fresh, "Playing", play_track_by_id):
+        return True
+
+    songs = _songs_to_pick(name)
 
     if not songs:
         click.echo(f"No songs found matching '{name}'")
@@ -91,64 +353,76 @@ def play_song(name: str) -> bool:
 
     selected_display = next(d for i, d in songs if i == selected_id)
     click.echo(f"Playing: {selected_display}")
-    return play_track_by_id(selected_id)
+    if not play_track_by_id(selected_id):
+        return False
+    if not is_first():
+        choices.remember("song", name, choices.Choice(selected_id, selected_display))
+    return True
 
 
+@session.cached
+@coalesce
 def search_albums(name: str, limit: int | None = None) -> list[tuple[str, str]]:
-    """Search for albums by name.
+    """Search for albums by name, best matches first (see ranking).
 
     Returns list of (album_name, display_text) tuples.
     Note: Album names are used as identifiers since AppleScript doesn't have album IDs.
+    An album is ranked by its best rated, most played and last played track.
     """
-    script = """
+    script = (
+        """
 on run argv
     set query to item 1 of argv
-    set limitValue to item 2 of argv as integer
     tell application "Music"
-        set matchingTracks to (every track whose album contains query)
-        set albumList to {}
-        set albumArtists to {}
-        repeat with t in matchingTracks
-            set albumName to album of t
-            set artistName to artist of t
-            if albumName is not in albumList then
-                set end of albumList to albumName
-                set end of albumArtists to artistName
-                if limitValue > 0 and (count of albumList) >= limitValue then
-                    exit repeat
-                end if
-            end if
-        end repeat
-        set output to ""
-        repeat with i from 1 to count of albumList
-            set output to output & item i of albumList & "|" & item i of albumArtists & linefeed
-        end repeat
-        return output
-    end tell
-end run
+        set matches to a reference to (every track whose album contains query)
+        set matchAlbums to album of matches
+        set matchArtists to artist of matches
 """
-    limit_value = limit if limit is not None else 0
-    stdout, _, returncode = run_applescript(script, [name, str(limit_value)])
+        + _RANKING_COLUMNS
+        + _join_columns(
+            [
+                "matchAlbums",
+                "matchRatings",
+                "matchPlayCounts",
+                "matchPlayedAgo",
+                "matchArtists",
+            ]
+        )
+        + "end run\n"
+    )
+    stdout, _, returncode = run_applescript(script, [name])
 
     if returncode != 0 or not stdout:
         return []
 
-    results = []
-    for line in stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("|")
-        if len(parts) >= 2:
-            album_name, artist = parts[0], parts[1]
-            display = f"{album_name} - {artist}"
-            results.append((album_name, display))
-
-    return results
+    albums: dict[str, ranking.Match] = {}
+    for album_name, rating, play_count, played_ago, artist in _parse_columns(stdout, 5):
+        track = ranking.Match(
+            item_id=album_name,
+            display=f"{album_name} - {artist}",
+            name=album_name,
+            rating=_int(rating),
+            play_count=_int(play_count),
+            played_ago=_seconds(played_ago),
+        )
+        album = albums.setdefault(album_name, track)
+        ages = [a for a in (album.played_ago, track.played_ago) if a is not None]
+        albums[album_name] = ranking.Match(
+            item_id=album.item_id,
+            display=album.display,
+            name=album.name,
+            rating=max(album.rating, track.rating),
+            play_count=max(album.play_count, track.play_count),
+            played_ago=min(ages) if ages else None,
+        )
+    return _limited(ranking.rank(name, list(albums.values())), limit)
 
 
+@serialized
 def play_album_by_name(album_name: str) -> bool:
     """Play an album by its name."""
-    script = """
+    script = (
+        """
 on run argv
     set albumName to item 1 of argv
     tell application "Music"
@@ -165,19 +439,30 @@ on run argv
                 duplicate t to queuePlaylist
             end repeat
             play queuePlaylist
-            return "ok"
+"""
+        + _STARTED_TRACK
+        + """
+            return "ok" & (character id 31) & startedTrack
         else
             return "not_found"
         end if
     end tell
 end run
 """
+    )
     stdout, _, returncode = run_applescript(script, [album_name])
-    return returncode == 0 and stdout.strip() == "ok"
+    result = stdout.split(FIELD_SEP)
+    if returncode != 0 or result[0] != "ok":
+        return False
+    _record_started_track(result[1:])
+    return True
 
 
-def play_album(name: str) -> bool:
-    """Search for and play an album by name."""
+def play_album(name: str, fresh: bool = False) -> bool:
+    """Search for and play an album by name, like play_song()."""
+    if _play_remembered("album", name, fresh, "Playing album", play_album_by_name):
+        return True
+
     albums = search_albums(name)
 
     if not albums:
@@ -198,70 +483,78 @@ def play_album(name: str) -> bool:
 
     selected_display = next(d for n, d in albums if n == selected_name)
     click.echo(f"Playing album: {selected_display}")
-    return play_album_by_name(selected_name)
+    if not play_album_by_name(selected_name):
+        return False
+    if not is_first():
+        choices.remember("album", name, choices.Choice(selected_name, selected_display))
+    return True
 
 
+@session.cached
+@coalesce
 def search_playlists(name: str, limit: int | None = None) -> list[tuple[str, str]]:
-    """Search for playlists by name.
+    """Search for playlists by name, best matches first (see ranking).
 
+    Playlists have no rating or play count, so only their names are ranked.
     Returns list of (playlist_name, display_text) tuples.
     """
     script = """
 on run argv
     set query to item 1 of argv
-    set limitValue to item 2 of argv as integer
     tell application "Music"
-        set matchingPlaylists to (every playlist whose name contains query)
-        if limitValue > 0 then
-            if (count of matchingPlaylists) > limitValue then
-                set matchingPlaylists to items 1 thru limitValue of matchingPlaylists
-            end if
-        end if
-        set output to ""
-        repeat with p in matchingPlaylists
-            set pName to name of p
-            set trackCount to count of tracks of p
-            set output to output & pName & "|" & trackCount & linefeed
+        set matches to a reference to (every playlist whose name contains query)
+        set matchNames to name of matches
+        set matchCounts to {}
+        repeat with i from 1 to count of matchNames
+            set end of matchCounts to count of tracks of item i of matches
         end repeat
-        return output
     end tell
-end run
-"""
-    limit_value = limit if limit is not None else 0
-    stdout, _, returncode = run_applescript(script, [name, str(limit_value)])
+""" + _join_columns(["matchNames", "matchCounts"]) + "end run\n"
+    stdout, _, returncode = run_applescript(script, [name])
 
     if returncode != 0 or not stdout:
         return []
 
-    results = []
-    for line in stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("|")
-        if len(parts) >= 2:
-            playlist_name, track_count = parts[0], parts[1]
-            display = f"{playlist_name} ({track_count} tracks)"
-            results.append((playlist_name, display))
-
-    return results
+    matches = [
+        ranking.Match(
+            playlist_name, f"{playlist_name} ({track_count} tracks)", playlist_name
+        )
+        for playlist_name, track_count in _parse_columns(stdout, 2)
+    ]
+    return _limited(ranking.rank(name, matches), limit)
 
 
+@serialized
 def play_playlist_by_name(playlist_name: str) -> bool:
     """Play a playlist by its name."""
-    script = """
+    script = (
+        """
 on run argv
     set playlistName to item 1 of argv
     tell application "Music"
         play playlist playlistName
+"""
+        + _STARTED_TRACK
+        + """
+        return startedTrack
     end tell
 end run
 """
-    _, _, returncode = run_applescript(script, [playlist_name])
-    return returncode == 0
+    )
+    stdout, _, returncode = run_applescript(script, [playlist_name])
+    if returncode != 0:
+        return False
+    _record_started_track(stdout.split(FIELD_SEP))
+    return True
 
 
-def play_playlist(name: str) -> bool:
-    """Search for and play a playlist by name."""
+def play_playlist(name: str, fresh: bool = False) -> bool:
+    """Search for and play a playlist by name, like play_song()."""
+    if _play_remembered(
+        "playlist", name, fresh, "Playing playlist", play_playlist_by_name
+    ):
+        return True
+
     playlists = search_playlists(name)
 
     if not playlists:
@@ -282,95 +575,125 @@ def play_playlist(name: str) -> bool:
 
     selected_display = next(d for n, d in playlists if n == selected_name)
     click.echo(f"Playing playlist: {selected_display}")
-    return play_playlist_by_name(selected_name)
+    if not play_playlist_by_name(selected_name):
+        return False
+    if not is_first():
+        choices.remember(
+            "playlist", name, choices.Choice(selected_name, selected_display)
+        )
+    return True
 
 
+@serialized
 def pause() -> str | None:
     """Pause playback. Returns error message on failure, None on success."""
-    script = """
-tell application "Music"
-    pause
-end tell
-"""
-    _, stderr, returncode = run_applescript(script)
+    _, stderr, returncode = run_applescript(transport.PAUSE_SCRIPT)
     return stderr if returncode != 0 else None
 
 
+@serialized
 def resume() -> str | None:
     """Resume playback. Returns error message on failure, None on success."""
-    script = """
-tell application "Music"
-    play
-end tell
-"""
-    _, stderr, returncode = run_applescript(script)
+    _, stderr, returncode = run_applescript(transport.RESUME_SCRIPT)
     return stderr if returncode != 0 else None
 
 
+@serialized
 def next_track() -> str | None:
     """Skip to next track. Returns error message on failure, None on success."""
-    script = """
-tell application "Music"
-    next track
-end tell
-"""
-    _, stderr, returncode = run_applescript(script)
+    _, stderr, returncode = run_applescript(transport.NEXT_TRACK_SCRIPT)
     return stderr if returncode != 0 else None
 
 
+@serialized
 def previous_track() -> str | None:
     """Go to previous track. Returns error message on failure, None on success."""
-    script = """
-tell application "Music"
-    back track
-end tell
-"""
-    _, stderr, returncode = run_applescript(script)
+    _, stderr, returncode = run_applescript(transport.PREVIOUS_TRACK_SCRIPT)
     return stderr if returncode != 0 else None
 
 
-# Volume control
+# Simple player commands that can run together in one AppleScript call.
+STEP_COMMANDS = {"pause", "resume", "next", "prev", "volume", "shuffle", "repeat"}
 
 
-def get_volume() -> tuple[int, bool] | None:
-    """Get current volume and mute state. Returns (volume, is_muted) or None on error."""
-    script = """
+def _step_statement(command: str, value: str | None) -> str:
+    if command == "pause":
+        return "pause"
+    if command == "resume":
+        return "play"
+    if command == "next":
+        return "next track"
+    if command == "prev":
+        return "back track"
+    if command == "volume" and value is not None:
+        return f"set sound volume to {max(0, min(100, int(value)))}"
+    if command == "shuffle" and value in ("on", "off"):
+        return f"set shuffle enabled to {'true' if value == 'on' else 'false'}"
+    if command == "repeat" and value in ("off", "all", "one"):
+        return f"set song repeat to {value}"
+    raise ValueError(f"Invalid step: {command} {value}")
+
+
+@serialized
+def run_steps(steps: list[tuple[str, str | None]]) -> tuple[int, str | None]:
+    """Run simple player commands in order with a single AppleScript call.
+
+    Each step is a (command, value) pair with a command from STEP_COMMANDS.
+    Stops at the first failure; returns (number of steps completed, error
+    message or None).
+    """
+    statements = [_step_statement(command, value) for command, value in steps]
+    body = "".join(
+        f"        {statement}\n        set completed to {i}\n"
+        for i, statement in enumerate(statements, 1)
+    )
+    script = f"""
 tell application "Music"
-    return (sound volume as string) & "|" & (mute as string)
+    set completed to 0
+    try
+{body}    on error errMsg
+        return (completed as string) & (character id 31) & errMsg
+    end try
+    return completed as string
 end tell
 """
-    stdout, _, returncode = run_applescript(script)
+    stdout, stderr, returncode = run_applescript(script)
     if returncode != 0:
-        return None
-    parts = stdout.strip().split("|")
-    if len(parts) < 2:
-        return None
+        return 0, stderr or "Failed to run AppleScript"
+    parts = stdout.split(FIELD_SEP, 1)
     try:
-        volume = int(parts[0])
-        is_muted = parts[1].lower() == "true"
-        return (volume, is_muted)
+        completed = int(parts[0])
     except ValueError:
+        return 0, f"Unexpected AppleScript output: {stdout}"
+    if completed == len(steps):
+        return completed, None
+    return completed, parts[1] if len(parts) > 1 and parts[1] else "Unknown error"
+
+
+# Volume control
+
+
+@coalesce
+def get_volume() -> tuple[int, bool] | None:
+    """Get current volume and mute state. Returns (volume, is_muted) or None on error."""
+    stdout, _, returncode = run_applescript(transport.GET_VOLUME_SCRIPT)
+    if returncode != 0:
         return None
+    return transport.parse_volume(stdout)
 
 
+@supersedable("volume")
 def set_volume(volume: int) -> str | None:
     """Set volume (0-100). Returns error message on failure, None on success."""
-    volume = max(0, min(100, volume))
-    script = f"""
-tell application "Music"
-    set sound volume to {volume}
-end tell
-"""
-    _, stderr, returncode = run_applescript(script)
+    _, stderr, returncode = run_applescript(transport.set_volume_script(volume))
     return stderr if returncode != 0 else None
 
 
 def _mute_state_path() -> Path:
-    cache_dir = Path.home() / "Library" / "Caches" / "clawtunes"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir / "mute_volume"
+    return cache_dir() / "mute_volume"
 
 
+@serialized
 def mute() -> str | None:
     """Mute by setting volume to 0, caching previous volume."""
     result = get_volume()
@@ -390,6 +713,7 @@ def mute() -> str | None:
     return None
 
 
+@serialized
 def unmute() -> str | None:
     """Restore volume from the cached value if available."""
     state_path = _mute_state_path()
@@ -409,6 +733,7 @@ def unmute() -> str | None:
 # Shuffle and repeat
 
 
+@coalesce
 def get_shuffle() -> bool | None:
     """Get shuffle state. Returns True/False or None on error."""
     script = """
@@ -422,6 +747,7 @@ end tell
     return stdout.strip().lower() == "true"
 
 
+@supersedable("shuffle")
 def set_shuffle(enabled: bool) -> str | None:
     """Set shuffle state. Returns error or None."""
     script = """
@@ -443,6 +769,7 @@ end run
     return stderr if returncode != 0 else None
 
 
+@coalesce
 def get_repeat() -> str | None:
     """Get repeat mode. Returns 'off', 'one', 'all', or None on error."""
     script = """
@@ -456,6 +783,7 @@ end tell
     return stdout.strip()
 
 
+@supersedable("repeat")
 def set_repeat(mode: str) -> str | None:
     """Set repeat mode to off, all, or one. Returns error or None."""
     script = """
@@ -481,6 +809,7 @@ end run
 # Love/dislike
 
 
+@serialized
 def love_current_track() -> str | None:
     """Love the current track. Returns error message on failure, None on success."""
     script = """
@@ -492,6 +821,7 @@ end tell
     return stderr if returncode != 0 else None
 
 
+@serialized
 def dislike_current_track() -> str | None:
     """Dislike the current track. Returns error message on failure, None on success."""
     script = """
@@ -503,6 +833,7 @@ end tell
     return stderr if returncode != 0 else None
 
 
+@coalesce
 def get_current_track_love_state() -> tuple[bool, bool] | None:
     """Get favorite/dislike state of current track. Returns (favorited, disliked) or None."""
     script = """
@@ -524,6 +855,7 @@ end tell
 # Playlists
 
 
+@serialized
 def create_playlist(name: str) -> tuple[bool, str]:
     """Create a new playlist.
 
@@ -550,6 +882,7 @@ end run
     return True, f"Created playlist: {name}"
 
 
+@serialized
 def add_song_to_playlist(playlist_name: str, track_id: str) -> tuple[bool, str]:
     """Add a track to a playlist by track ID.
 
@@ -578,6 +911,7 @@ end run
     return True, ""
 
 
+@serialized
 def remove_song_from_playlist(playlist_name: str, track_id: str) -> tuple[bool, str]:
     """Remove a track from a playlist by track ID.
 
@@ -612,31 +946,30 @@ end run
     return True, ""
 
 
-def search_songs_in_playlist(
-    playlist_name: str, song_name: str, limit: int | None = None
-) -> list[tuple[str, str]]:
-    """Search for songs within a specific playlist.
-
-    Returns list of (id, display_text) tuples.
-    """
-    script = """
+# Song search within a playlist, returning the first `limit` matches. With a
+# first index as well, it returns the matches from there and starts with a
+# line holding the number of matches.
+_SEARCH_SONGS_IN_PLAYLIST = """
 on run argv
     set playlistName to item 1 of argv
     set query to item 2 of argv
     set limitValue to item 3 of argv as integer
+    set ranged to (count of argv) > 3
+    set firstIndex to 1
+    if ranged then set firstIndex to item 4 of argv as integer
     tell application "Music"
         if not (exists playlist playlistName) then
             return ""
         end if
         set targetPlaylist to playlist playlistName
         set matchingTracks to (every track of targetPlaylist whose name contains query)
-        if limitValue > 0 then
-            if (count of matchingTracks) > limitValue then
-                set matchingTracks to items 1 thru limitValue of matchingTracks
-            end if
-        end if
+        set matchCount to count of matchingTracks
+        set lastIndex to matchCount
+        if limitValue > 0 and limitValue < matchCount then set lastIndex to limitValue
         set output to ""
-        repeat with t in matchingTracks
+        if ranged then set output to (matchCount as text) & linefeed
+        if firstIndex > lastIndex then return output
+        repeat with t in items firstIndex thru lastIndex of matchingTracks
             set trackId to id of t
             set trackName to name of t
             set trackArtist to artist of t
@@ -647,30 +980,54 @@ on run argv
     end tell
 end run
 """
+
+
+@session.cached
+@coalesce
+def search_songs_in_playlist(
+    playlist_name: str, song_name: str, limit: int | None = None
+) -> list[tuple[str, str]]:
+    """Search for songs within a specific playlist.
+
+    Returns list of (id, display_text) tuples.
+    """
     limit_value = limit if limit is not None else 0
     stdout, _, returncode = run_applescript(
-        script, [playlist_name, song_name, str(limit_value)]
+        _SEARCH_SONGS_IN_PLAYLIST, [playlist_name, song_name, str(limit_value)]
     )
 
     if returncode != 0 or not stdout:
         return []
 
-    results = []
-    for line in stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("|")
-        if len(parts) >= 4:
-            track_id, track_name, artist, album = parts[0], parts[1], parts[2], parts[3]
-            display = f"{track_name} - {artist} ({album})"
-            results.append((track_id, display))
+    return _parse_song_lines(stdout)
 
-    return results
+
+def _split_count(stdout: str) -> tuple[int, str]:
+    """Split the number of matches off the lines of a ranged search."""
+    count, _, lines = stdout.partition("\n")
+    return _int(count), lines
+
+
+def stream_songs_in_playlist(
+    playlist_name: str, song_name: str
+) -> tuple[int, Iterator[list[tuple[str, str]]]]:
+    """Search for songs within a playlist, in chunks (see _streamed)."""
+
+    def fetch(first: int, last: int) -> tuple[list[tuple[str, str]], int]:
+        stdout, _, returncode = run_applescript(
+            _SEARCH_SONGS_IN_PLAYLIST, [playlist_name, song_name, str(last), str(first)]
+        )
+        if returncode != 0:
+            return [], 0
+        count, lines = _split_count(stdout)
+        return _parse_song_lines(lines), count
+
+    return _streamed(fetch)
 
 
 def add_song_to_playlist_interactive(playlist_name: str, song_query: str) -> bool:
     """Search for a song and add it to a playlist with user selection."""
-    songs = search_songs(song_query)
+    songs = _songs_to_pick(song_query)
 
     if not songs:
         click.echo(f"No songs found matching '{song_query}'")
@@ -699,27 +1056,26 @@ def add_song_to_playlist_interactive(playlist_name: str, song_query: str) -> boo
 
 
 def remove_song_from_playlist_interactive(playlist_name: str, song_query: str) -> bool:
-    """Search for a song in a playlist and remove it with user selection."""
-    songs = search_songs_in_playlist(playlist_name, song_query)
+    """Search for a song in a playlist and remove it with user selection.
 
-    if not songs:
+    Matches are listed, or picked by -1, as soon as the first ones arrive.
+    """
+    total, chunks = stream_songs_in_playlist(playlist_name, song_query)
+
+    if not total:
         click.echo(
             f"No songs found matching '{song_query}' in playlist '{playlist_name}'"
         )
         return False
 
-    if len(songs) == 1:
-        selected_id = songs[0][0]
-        selected_display = songs[0][1]
-    else:
-        click.echo(f"Found {len(songs)} matching songs in '{playlist_name}':")
-        result = select_item(songs, "Select a song")
-        if result is None:
-            if not is_non_interactive():
-                click.echo("Cancelled")
-            return False
-        selected_id = result
-        selected_display = next(d for i, d in songs if i == selected_id)
+    if total > 1:
+        click.echo(f"Found {total} matching songs in '{playlist_name}':")
+    result = select_from_chunks(chunks, "Select a song")
+    if result is None:
+        if not is_non_interactive():
+            click.echo("Cancelled")
+        return False
+    selected_id, selected_display = result
 
     success, message = remove_song_from_playlist(playlist_name, selected_id)
     if success:
@@ -730,23 +1086,30 @@ def remove_song_from_playlist_interactive(playlist_name: str, song_query: str) -
         return False
 
 
-def get_all_playlists() -> list[tuple[str, int]]:
-    """Get all playlists. Returns list of (name, track_count) tuples."""
-    script = """
-tell application "Music"
-    set output to ""
-    repeat with p in (every user playlist)
-        set pName to name of p
-        set trackCount to count of tracks of p
-        set output to output & pName & "|" & trackCount & linefeed
-    end repeat
-    return output
-end tell
+# Lists the user playlists numbered first to last with their track counts,
+# after a line holding the number of playlists.
+_PLAYLISTS = """
+on run argv
+    set firstIndex to item 1 of argv as integer
+    set lastIndex to item 2 of argv as integer
+    tell application "Music"
+        set allPlaylists to every user playlist
+        set playlistCount to count of allPlaylists
+        if lastIndex > playlistCount then set lastIndex to playlistCount
+        set output to (playlistCount as text) & linefeed
+        if firstIndex > lastIndex then return output
+        repeat with p in items firstIndex thru lastIndex of allPlaylists
+            set pName to name of p
+            set trackCount to count of tracks of p
+            set output to output & pName & "|" & trackCount & linefeed
+        end repeat
+        return output
+    end tell
+end run
 """
-    stdout, _, returncode = run_applescript(script)
-    if returncode != 0 or not stdout:
-        return []
 
+
+def _parse_playlist_lines(stdout: str) -> list[tuple[str, int]]:
     results = []
     for line in stdout.strip().split("\n"):
         if not line.strip():
@@ -760,9 +1123,24 @@ end tell
     return results
 
 
+def stream_playlists() -> tuple[int, Iterator[list[tuple[str, int]]]]:
+    """Get all playlists as (name, track_count) tuples, in chunks (see _streamed)."""
+
+    def fetch(first: int, last: int) -> tuple[list[tuple[str, int]], int]:
+        stdout, _, returncode = run_applescript(_PLAYLISTS, [str(first), str(last)])
+        if returncode != 0:
+            return [], 0
+        count, lines = _split_count(stdout)
+        return _parse_playlist_lines(lines), count
+
+    return _streamed(fetch)
+
+
 # AirPlay
 
 
+@session.cached
+@coalesce
 def get_airplay_devices() -> list[tuple[str, str, bool, bool]]:
     """Get AirPlay devices. Returns list of (name, kind, available, selected) tuples."""
     script = """
@@ -796,6 +1174,7 @@ end tell
     return results
 
 
+@serialized
 def set_airplay_device(name: str, selected: bool) -> str | None:
     """Select or deselect an AirPlay device. Returns error or None on success."""
     script = """
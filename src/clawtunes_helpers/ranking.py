@@ -0,0 +1,55 @@
+"""Relevance ranking of library search matches.
+
+Music returns `whose name contains` matches in library order, so the first
+match for "love" is rarely the song called "Love". Matches are ordered by how
+well their name matches the query, then by rating, play count and how
+recently they were played. The sort is stable: matches that tie keep
+Music's order.
+"""
+
+import re
+from dataclasses import dataclass
+
+from clawtunes_helpers.library import normalize
+
+
+@dataclass(frozen=True)
+class Match:
+    """A search match with the properties it is ranked by."""
+
+    item_id: str
+    display: str
+    name: str
+    rating: int = 0
+    play_count: int = 0
+    # Seconds since the match was last played; None if never.
+    played_ago: float | None = None
+
+
+def name_score(query: str, name: str) -> int:
+    """Score a name: 3 exact, 2 prefix, 1 at a word boundary, 0 elsewhere."""
+    query, name = normalize(query), normalize(name)
+    if not query:
+        return 0
+    if name == query:
+        return 3
+    if name.startswith(query):
+        return 2
+    if re.search(rf"\b{re.escape(query)}", name):
+        return 1
+    return 0
+
+
+def rank(query: str, matches: list[Match]) -> list[Match]:
+    """Return matches best first."""
+
+    def key(match: Match) -> tuple[int, int, int, float]:
+        played_ago = float("inf") if match.played_ago is None else match.played_ago
+        return (
+            -name_score(query, match.name),
+            -match.rating,
+            -match.play_count,
+            played_ago,
+        )
+
+    return sorted(matches, key=key)
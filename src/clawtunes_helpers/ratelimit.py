@@ -0,0 +1,89 @@
+"""Token bucket rate limiter shared by clawtunes processes.
+
+The bucket lives in the cache directory, so scripts running many clawtunes
+processes together stay within the iTunes API's allowance (roughly 20
+requests a minute) instead of tripping it. Each request takes a token;
+tokens refill at a steady rate up to a small burst. When the API still asks
+to slow down, pause() makes every process wait.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from clawtunes_helpers.cache import cache_dir, env_float, file_lock, write_atomic
+
+# CLAWTUNES_CATALOG_RATE (requests per minute, 0 for no limit) and
+# CLAWTUNES_CATALOG_BURST override these.
+DEFAULT_CATALOG_RATE = 20.0
+DEFAULT_CATALOG_BURST = 5.0
+
+
+@dataclass
+class TokenBucket:
+    name: str
+    rate: float  # tokens per second
+    burst: float
+
+    def _path(self) -> Path:
+        return cache_dir() / f"{self.name}.ratelimit.json"
+
+    def _load(self, now: float) -> tuple[float, float, float]:
+        """Return (tokens, updated_at, paused_until)."""
+        try:
+            state = json.loads(self._path().read_text(encoding="utf-8"))
+            return state["tokens"], state["updated_at"], state["paused_until"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.burst, now, 0.0
+
+    def _save(self, tokens: float, updated_at: float, paused_until: float) -> None:
+        state = {
+            "tokens": tokens,
+            "updated_at": updated_at,
+            "paused_until": paused_until,
+        }
+        write_atomic(self._path(), json.dumps(state))
+
+    def try_acquire(self, now: float | None = None) -> float:
+        """Take a token if one is available.
+
+        Returns 0 on success, otherwise the seconds to wait before a token
+        can be available.
+        """
+        if self.rate <= 0:
+            return 0.0
+        if now is None:
+            now = time.time()
+        with file_lock(f"{self.name}-ratelimit"):
+            tokens, updated_at, paused_until = self._load(now)
+            if now < paused_until:
+                return paused_until - now
+            tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._save(tokens, now, paused_until)
+        return wait
+
+    def acquire(self) -> None:
+        """Take a token, waiting as long as needed."""
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float, now: float | None = None) -> None:
+        """Hand out no tokens for `seconds`, in every process."""
+        if now is None:
+            now = time.time()
+        with file_lock(f"{self.name}-ratelimit"):
+            _, _, paused_until = self._load(now)
+            self._save(0.0, now + seconds, max(paused_until, now + seconds))
+
+
+def catalog_bucket() -> TokenBucket:
+    """Return the bucket limiting requests to the iTunes API."""
+    per_minute = env_float("CLAWTUNES_CATALOG_RATE", DEFAULT_CATALOG_RATE)
+    burst = env_float("CLAWTUNES_CATALOG_BURST", DEFAULT_CATALOG_BURST)
+    return TokenBucket("catalog", per_minute / 60, max(burst, 1.0))
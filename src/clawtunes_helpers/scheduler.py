@@ -0,0 +1,156 @@
+"""Schedule AppleScript calls made by concurrent clients (server threads).
+
+- @coalesce: identical reads that overlap share one call and its result.
+- @serialized: writes run one at a time, in arrival order.
+- @supersedable(key): like @serialized, but a write still waiting in the queue
+  is dropped when a newer write with the same key arrives; the dropped call
+  returns the newer call's result. Called from inside another write, it runs
+  at once and is never dropped.
+
+In a single-threaded CLI process these add a lock round-trip and nothing else.
+"""
+
+import functools
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _WriteQueue:
+    """Reentrant lock that admits threads in the order they arrived."""
+
+    def __init__(self) -> None:
+        self._changed = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._owner: int | None = None
+        self._depth = 0
+        # Bumped after every write, so reads started before a write finished
+        # are never shared with reads started after it.
+        self.generation = 0
+
+    def __enter__(self) -> None:
+        me = threading.get_ident()
+        with self._changed:
+            if self._owner == me:
+                self._depth += 1
+                return
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._changed.wait_for(lambda: self._serving == ticket)
+            self._owner = me
+            self._depth = 1
+
+    def held(self) -> bool:
+        """Whether the current thread is running a write."""
+        with self._changed:
+            return self._owner == threading.get_ident()
+
+    def arrivals(self) -> int:
+        """Number of times a thread has joined the queue so far."""
+        with self._changed:
+            return self._next_ticket
+
+    def __exit__(self, *exc_info: object) -> None:
+        with self._changed:
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._serving += 1
+                self.generation += 1
+                self._changed.notify_all()
+
+
+_writes = _WriteQueue()
+
+_state_lock = threading.Lock()
+_in_flight: dict[Hashable, Future] = {}
+_latest_write: dict[Hashable, Future] = {}
+
+
+def coalesce(func: F) -> F:
+    """Share one call between identical concurrent calls of a read."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = (func, args, tuple(sorted(kwargs.items())), _writes.generation)
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        with _state_lock:
+            shared = _in_flight.get(key)
+            if shared is None:
+                future: Future = Future()
+                _in_flight[key] = future
+        if shared is not None:
+            return shared.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _state_lock:
+                del _in_flight[key]
+
+    return wrapper  # type: ignore[return-value]
+
+
+def serialized(func: F) -> F:
+    """Run a write only after all writes queued before it have finished."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _writes:
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def supersedable(key: Hashable) -> Callable[[F], F]:
+    """Serialize a write and drop it if a newer write with `key` is queued."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _writes.held():
+                # Part of a write already running (mute() sets the volume):
+                # waiting for a queued write would deadlock, and dropping
+                # this one would break the outer write, so run it now.
+                return func(*args, **kwargs)
+            future: Future = Future()
+            with _state_lock:
+                _latest_write[key] = future
+            with _writes:
+                with _state_lock:
+                    latest = _latest_write[key]
+                if latest is future:
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                        raise
+                    future.set_result(result)
+                    return result
+
+            # Superseded: wait outside the queue for the write that replaced
+            # this one (which may itself be superseded) and pass its result on.
+            try:
+                result = latest.result()
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            future.set_result(result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,5 +1,8 @@
 """Interactive selection helper."""
 
+import itertools
+from collections.abc import Callable, Iterable
+
 import click
 
 
@@ -14,6 +17,15 @@ def is_non_interactive() -> bool:
     return _get_flag("non_interactive")
 
 
+def is_first() -> bool:
+    """Whether -1 picks the first match instead of prompting."""
+    return _get_flag("first")
+
+
+# Longer lists are shown a page at a time by the picker, which also filters.
+PAGE_SIZE = 20
+
+
 def select_item(items: list[tuple[str, str]], prompt: str) -> str | None:
     """Display numbered list, prompt user, return selected ID.
 
@@ -23,6 +35,9 @@ def select_item(items: list[tuple[str, str]], prompt: str) -> str | None:
 
     Returns:
         The ID of the selected item, or None if cancelled
+
+    Lists longer than PAGE_SIZE are shown a page at a time and can be
+    filtered, except with -N, which lists every item.
     """
     if not items:
         return None
@@ -33,6 +48,9 @@ def select_item(items: list[tuple[str, str]], prompt: str) -> str | None:
     if _get_flag("first"):
         return items[0][0]
 
+    if len(items) > PAGE_SIZE and not _get_flag("non_interactive"):
+        return _pick(items, prompt)
+
     click.echo()
     for i, (_, display) in enumerate(items, 1):
         click.echo(f"  {i}. {display}")
@@ -50,3 +68,177 @@ def select_item(items: list[tuple[str, str]], prompt: str) -> str | None:
             click.echo(f"Please enter a number between 1 and {len(items)}")
         except click.Abort:
             return None
+
+
+def select_from_chunks(
+    chunks: Iterable[list[tuple[str, str]]], prompt: str
+) -> tuple[str, str] | None:
+    """Like select_item(), for items that arrive in chunks.
+
+    Returns the selected (id, display_text) tuple. With -1 the first item is
+    picked as soon as the first chunk arrives, and with -N each chunk is
+    listed as it arrives. The prompt needs every item, so it waits for all
+    of them.
+    """
+    chunks = iter(chunks)
+    items = next(chunks, [])
+    if _get_flag("first"):
+        return items[0] if items else None
+
+    if not _get_flag("non_interactive") or len(items) == 1:
+        items += [item for chunk in chunks for item in chunk]
+        selected_id = select_item(items, prompt)
+        return next((item for item in items if item[0] == selected_id), None)
+
+    if not items:
+        return None
+    click.echo()
+    # Each chunk is read only once the ones before it are listed.
+    arriving = itertools.chain(items, itertools.chain.from_iterable(chunks))
+    for i, (_, display) in enumerate(arriving, 1):
+        click.echo(f"  {i}. {display}")
+    click.echo()
+    return None
+
+
+def _pick(items: list[tuple[str, str]], prompt: str) -> str | None:
+    """Show items a page at a time; text entered narrows them down.
+
+    Items keep their numbers while filtered. A filter that extends the
+    previous one only searches the items still shown. Input starting with
+    "/" is always a filter, so a number or "n" can be searched for.
+    """
+    # Item numbers (from 0) and their text to match, computed once.
+    everything = [(i, display.casefold()) for i, (_, display) in enumerate(items)]
+    matches = everything
+    query = ""
+    page = 0
+    while True:
+        first = page * PAGE_SIZE
+        window = matches[first : first + PAGE_SIZE]
+        click.echo()
+        for i, _ in window:
+            click.echo(f"  {i + 1}. {items[i][1]}")
+        filtered = f" matching '{query}'" if query else ""
+        click.echo(f"  ({first + 1}-{first + len(window)} of {len(matches)}{filtered})")
+        click.echo()
+
+        has_next = first + PAGE_SIZE < len(matches)
+        hints = ["number", "text or /text to filter"]
+        if has_next:
+            hints.append("n: next page")
+        if page > 0:
+            hints.append("p: previous page")
+        if query:
+            hints.append("empty: clear filter")
+        try:
+            choice: str = click.prompt(
+                f"{prompt} ({', '.join(hints)})", default="", show_default=False
+            )
+        except click.Abort:
+            return None
+        choice = choice.strip()
+
+        if choice.isdigit() and 1 <= int(choice) <= len(items):
+            selected_id: str = items[int(choice) - 1][0]
+            return selected_id
+        elif choice.lower() == "n":
+            if has_next:
+                page += 1
+            else:
+                click.echo("No next page")
+        elif choice.lower() == "p":
+            if page > 0:
+                page -= 1
+            else:
+                click.echo("No previous page")
+        elif not choice:
+            matches, query, page = everything, "", 0
+        else:
+            # Other numbers filter too; "/" filters by any text, such as "n".
+            text = choice.removeprefix("/").casefold()
+            words = text.split()
+            pool = matches if query and text.startswith(query) else everything
+            narrowed = [m for m in pool if all(word in m[1] for word in words)]
+            if narrowed:
+                matches, query, page = narrowed, text, 0
+            else:
+                click.echo(f"Nothing matches '{choice}'")
+
+
+def select_from_pages(
+    get_page: Callable[[int], tuple[list[tuple[str, str]], bool]],
+    prompt: str,
+    prefetch: Callable[[int], None] | None = None,
+) -> str | None:
+    """Like select_item(), for items fetched a page at a time.
+
+    Args:
+        get_page: Returns the items of a page (numbered from 0) and whether
+            there is a page after it
+        prompt: The prompt message to show
+        prefetch: Called with the number of the next page while the user
+            is choosing, so it can be fetched in the background
+
+    Items are numbered across pages; `n` and `p` move to the next and
+    previous page. Only the first page is fetched with -1 or -N.
+    """
+    items, has_next = get_page(0)
+    if not items:
+        return None
+
+    if len(items) == 1 and not has_next:
+        return items[0][0]
+
+    if _get_flag("first"):
+        return items[0][0]
+
+    page = 0
+    # Number of the first item of each page shown so far.
+    starts = [1]
+    while True:
+        start = starts[page]
+        click.echo()
+        for i, (_, display) in enumerate(items, start):
+            click.echo(f"  {i}. {display}")
+        click.echo()
+
+        if _get_flag("non_interactive"):
+            return None
+
+        if has_next and prefetch is not None:
+            prefetch(page + 1)
+        moves = []
+        if has_next:
+            moves.append("n: next page")
+        if page > 0:
+            moves.append("p: previous page")
+        text = f"{prompt} ({', '.join(moves)})" if moves else prompt
+
+        while True:
+            try:
+                choice: str = click.prompt(text, type=str).strip().lower()
+            except click.Abort:
+                return None
+            if choice == "n" and has_next:
+                page += 1
+                break
+            if choice == "p" and page > 0:
+                page -= 1
+                break
+            if choice.isdigit() and start <= int(choice) < start + len(items):
+                selected_id: str = items[int(choice) - start][0]
+                return selected_id
+            click.echo(
+                f"Please enter a number between {start} and {start + len(items) - 1}"
+            )
+
+        if len(starts) == page:
+            starts.append(start + len(items))
+        items, has_next = get_page(page)
+        if not items:
+            # The page after the last full one can turn out to be empty.
+            click.echo("No more results")
+            page -= 1
+            items, has_next = get_page(page)
+            has_next = False
@@ -0,0 +1,85 @@
+"""State kept between commands of an interactive shell session.
+
+Outside a session (every normal CLI invocation) nothing is cached and
+remember() returns None.
+"""
+
+import functools
+import time
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Library searches, playlists and AirPlay devices are reused for this long.
+SESSION_CACHE_TTL = 300.0
+
+_enabled = False
+_cache: dict[Hashable, tuple[float, Any]] = {}
+
+# Numbered items listed by the last command that listed any, as
+# (kind, id, display), and the items listed by the running command.
+_results: list[tuple[str, str, str]] = []
+_new_results: list[tuple[str, str, str]] = []
+
+
+def enable() -> None:
+    """Start keeping results between commands."""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def invalidate() -> None:
+    """Forget cached results, e.g. after the library changed."""
+    _cache.clear()
+
+
+def cached(func: F) -> F:
+    """Reuse the result of a read for the rest of the session."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _enabled:
+            return func(*args, **kwargs)
+        key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        hit = _cache.get(key)
+        if hit is not None and now - hit[0] < SESSION_CACHE_TTL:
+            return hit[1]
+        result = func(*args, **kwargs)
+        _cache[key] = (now, result)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def begin_command() -> None:
+    _new_results.clear()
+
+
+def end_command() -> None:
+    """Make the items listed by the finished command the numbered results."""
+    if _new_results:
+        _results[:] = _new_results
+
+
+def remember(kind: str, item_id: str, display: str) -> int | None:
+    """Number a listed item so it can be referred to later in the session.
+
+    Returns the item's number, or None outside a session.
+    """
+    if not _enabled:
+        return None
+    _new_results.append((kind, item_id, display))
+    return len(_new_results)
+
+
+def lookup(number: int) -> tuple[str, str, str] | None:
+    """Return (kind, id, display) of a numbered item from the last listing."""
+    if 1 <= number <= len(_results):
+        return _results[number - 1]
+    return None
@@ -1,8 +1,32 @@
 """Now playing info."""
 
-from dataclasses import dataclass
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, replace
+from typing import Any
 
-from clawtunes_helpers.applescript import run_applescript
+from clawtunes_helpers.applescript import FIELD_SEP, run_applescript
+from clawtunes_helpers.cache import (
+    env_float,
+    file_lock,
+    status_cache_path,
+    write_atomic,
+)
+from clawtunes_helpers.scheduler import coalesce
+
+# Polling schedule for watch mode, in seconds. While playing, Music is asked
+# again shortly after the current track is expected to end, but at least every
+# PLAYING_POLL_INTERVAL so that skips and pauses are noticed.
+IDLE_POLL_INTERVAL = 10.0
+PLAYING_POLL_INTERVAL = 15.0
+MIN_POLL_INTERVAL = 1.0
+TRACK_END_MARGIN = 0.5
+
+# How long a status snapshot shared between processes stays valid, in seconds.
+# CLAWTUNES_STATUS_TTL overrides it; 0 disables the shared cache.
+DEFAULT_STATUS_CACHE_TTL = 0.3
 
 
 @dataclass
@@ -39,22 +63,7 @@ class NowPlaying:
         return "[" + "=" * filled + "-" * (width - filled) + "]"
 
 
-def _now_playing_script() -> str:
-    return """
-tell application "Music"
-    try
-        set t to current track
-    on error
-        return "not_playing"
-    end try
-
-    try
-        set trackName to name of t
-    on error
-        return "not_playing"
-    end try
-    if trackName is missing value then return "not_playing"
-
+_TRACK_PROPERTIES = """
     try
         set trackArtist to artist of t
     on error
@@ -82,10 +91,37 @@ tell application "Music"
         set playerPos to 0
     end try
     if playerPos is missing value then set playerPos to 0
+"""
+
+
+def _now_playing_script() -> str:
+    return (
+        """
+tell application "Music"
+    set fs to character id 31
+    try
+        set t to current track
+    on error
+        return "not_playing"
+    end try
 
-    return trackName & "|" & trackArtist & "|" & trackAlbum & "|" & (trackDuration as string) & "|" & (playerPos as string)
+    try
+        set trackName to name of t
+    on error
+        return "not_playing"
+    end try
+    if trackName is missing value then return "not_playing"
+"""
+        + _TRACK_PROPERTIES
+        + """
+    return trackName & fs & trackArtist & fs & trackAlbum & fs & (trackDuration as string) & fs & (playerPos as string)
 end tell
 """
+    )
+
+
+def _parse_seconds(value: str) -> float:
+    return float(value.replace(",", "."))
 
 
 def get_now_playing_raw() -> tuple[str, str, int]:
@@ -98,24 +134,23 @@ def parse_now_playing(stdout: str, returncode: int) -> NowPlaying | None:
     if returncode != 0 or stdout.strip() == "not_playing":
         return None
 
-    parts = stdout.strip().split("|")
+    parts = stdout.split(FIELD_SEP)
     if len(parts) < 5:
         return None
 
     try:
-        duration = parts[3].replace(",", ".")
-        position = parts[4].replace(",", ".")
         return NowPlaying(
             name=parts[0],
             artist=parts[1],
             album=parts[2],
-            duration=float(duration),
-            position=float(position),
+            duration=_parse_seconds(parts[3]),
+            position=_parse_seconds(parts[4]),
         )
     except (ValueError, IndexError):
         return None
 
 
+@coalesce
 def get_now_playing() -> NowPlaying | None:
     """Get information about the currently playing track.
 
@@ -125,6 +160,7 @@ def get_now_playing() -> NowPlaying | None:
     return parse_now_playing(stdout, returncode)
 
 
+@coalesce
 def get_player_state() -> str:
     """Get the current player state (playing, paused, stopped)."""
     script = """
@@ -138,3 +174,296 @@ end tell
         return "unknown"
 
     return stdout.strip()
+
+
+@dataclass
+class PlayerStatus:
+    """Full player snapshot: state, settings and the current track."""
+
+    player_state: str
+    volume: int
+    muted: bool
+    shuffle: bool
+    repeat: str
+    now_playing: NowPlaying | None
+    favorited: bool = False
+    disliked: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        track = None
+        if self.now_playing is not None:
+            track = {
+                "name": self.now_playing.name,
+                "artist": self.now_playing.artist,
+                "album": self.now_playing.album,
+                "duration": round(self.now_playing.duration, 1),
+                "position": int(self.now_playing.position),
+                "favorited": self.favorited,
+                "disliked": self.disliked,
+            }
+        return {
+            "state": self.player_state,
+            "volume": self.volume,
+            "muted": self.muted,
+            "shuffle": self.shuffle,
+            "repeat": self.repeat,
+            "track": track,
+        }
+
+
+def _player_status_script() -> str:
+    # One record with every field, always in the same order. The last field is
+    # never empty, so stripping the output cannot drop trailing separators.
+    return (
+        """
+tell application "Music"
+    set fs to character id 31
+
+    try
+        set playerState to player state as string
+    on error
+        set playerState to "unknown"
+    end try
+
+    try
+        set volumeValue to sound volume
+    on error
+        set volumeValue to 0
+    end try
+
+    try
+        set isMuted to mute
+    on error
+        set isMuted to false
+    end try
+
+    try
+        set shuffleValue to shuffle enabled
+    on error
+        set shuffleValue to false
+    end try
+
+    try
+        set repeatValue to song repeat as string
+    on error
+        set repeatValue to "off"
+    end try
+
+    set settings to playerState & fs & (volumeValue as string) & fs & (isMuted as string) & fs & (shuffleValue as string) & fs & repeatValue
+
+    try
+        set t to current track
+        set trackName to name of t
+    on error
+        set trackName to missing value
+    end try
+    if trackName is missing value then
+        return settings & fs & "false" & fs & fs & fs & fs & "0" & fs & "0" & fs & "false" & fs & "false"
+    end if
+"""
+        + _TRACK_PROPERTIES
+        + """
+    try
+        set isFavorited to favorited of t
+    on error
+        set isFavorited to false
+    end try
+
+    try
+        set isDisliked to disliked of t
+    on error
+        set isDisliked to false
+    end try
+
+    return settings & fs & "true" & fs & trackName & fs & trackArtist & fs & trackAlbum & fs & (trackDuration as string) & fs & (playerPos as string) & fs & (isFavorited as string) & fs & (isDisliked as string)
+end tell
+"""
+    )
+
+
+def get_player_status_raw() -> tuple[str, str, int]:
+    """Return raw AppleScript output for the player status."""
+    return run_applescript(_player_status_script())
+
+
+def parse_player_status(stdout: str, returncode: int) -> PlayerStatus | None:
+    """Parse the player status record into PlayerStatus data."""
+    if returncode != 0:
+        return None
+
+    parts = stdout.split(FIELD_SEP)
+    if len(parts) != 13:
+        return None
+
+    try:
+        now_playing = None
+        if parts[5] == "true":
+            now_playing = NowPlaying(
+                name=parts[6],
+                artist=parts[7],
+                album=parts[8],
+                duration=_parse_seconds(parts[9]),
+                position=_parse_seconds(parts[10]),
+            )
+        return PlayerStatus(
+            player_state=parts[0],
+            volume=int(parts[1]),
+            muted=parts[2] == "true",
+            shuffle=parts[3] == "true",
+            repeat=parts[4],
+            now_playing=now_playing,
+            favorited=parts[11] == "true",
+            disliked=parts[12] == "true",
+        )
+    except ValueError:
+        return None
+
+
+@coalesce
+def get_player_status() -> PlayerStatus | None:
+    """Get the full player snapshot with a single AppleScript call.
+
+    Returns None if Music could not be queried.
+    """
+    stdout, _, returncode = run_applescript(_player_status_script())
+    return parse_player_status(stdout, returncode)
+
+
+@dataclass
+class StatusSample:
+    """Player status sampled at a point in time.
+
+    `taken_at` may come from any clock, as long as the times passed to the
+    methods come from the same one: sample_status() defaults to
+    time.monotonic(), the shared status cache uses time.time().
+    """
+
+    status: PlayerStatus | None
+    taken_at: float
+
+    def _playing_track(self) -> NowPlaying | None:
+        if self.status is None or self.status.player_state != "playing":
+            return None
+        return self.status.now_playing
+
+    def at(self, now: float) -> PlayerStatus | None:
+        """Return the status with the track position interpolated to `now`."""
+        track = self._playing_track()
+        if self.status is None or track is None:
+            return self.status
+        position = track.position + max(0.0, now - self.taken_at)
+        if track.duration > 0:
+            position = min(position, track.duration)
+        return replace(self.status, now_playing=replace(track, position=position))
+
+    def next_poll_at(self) -> float:
+        """Return when Music should be sampled again."""
+        track = self._playing_track()
+        if track is None:
+            return self.taken_at + IDLE_POLL_INTERVAL
+        remaining = track.duration - track.position
+        delay = min(remaining + TRACK_END_MARGIN, PLAYING_POLL_INTERVAL)
+        return self.taken_at + max(delay, MIN_POLL_INTERVAL)
+
+
+def status_cache_ttl() -> float:
+    """Return the configured TTL of the shared status cache."""
+    return env_float("CLAWTUNES_STATUS_TTL", DEFAULT_STATUS_CACHE_TTL)
+
+
+def _read_status_cache(ttl: float) -> StatusSample | None:
+    """Return the cached sample if it is younger than `ttl` seconds."""
+    try:
+        data = json.loads(status_cache_path().read_text(encoding="utf-8"))
+        taken_at = float(data["taken_at"])
+        raw = data["status"]
+        player_status = None
+        if raw is not None:
+            track = raw.pop("now_playing")
+            now_playing = NowPlaying(**track) if track is not None else None
+            player_status = PlayerStatus(now_playing=now_playing, **raw)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if not 0 <= time.time() - taken_at < ttl:
+        return None
+    return StatusSample(player_status, taken_at)
+
+
+def _write_status_cache(player_status: PlayerStatus | None, taken_at: float) -> None:
+    data = {
+        "taken_at": taken_at,
+        "status": asdict(player_status) if player_status is not None else None,
+    }
+    try:
+        write_atomic(status_cache_path(), json.dumps(data))
+    except OSError:
+        pass
+
+
+def invalidate_status_cache() -> None:
+    """Drop the shared status snapshot after a command changed the player."""
+    status_cache_path().unlink(missing_ok=True)
+
+
+def get_player_status_cached(ttl: float | None = None) -> PlayerStatus | None:
+    """Get the player status through the cache shared by concurrent processes.
+
+    A snapshot younger than `ttl` seconds is reused with its position
+    extrapolated; otherwise one process refreshes it under a lock while the
+    others wait and then read the refreshed snapshot.
+    """
+    if ttl is None:
+        ttl = status_cache_ttl()
+    if ttl <= 0:
+        return get_player_status()
+
+    sample = _read_status_cache(ttl)
+    if sample is not None:
+        return sample.at(time.time())
+
+    with file_lock("status"):
+        sample = _read_status_cache(ttl)
+        if sample is not None:
+            return sample.at(time.time())
+        player_status = get_player_status()
+        _write_status_cache(player_status, time.time())
+    return player_status
+
+
+def sample_status(clock: Callable[[], float] = time.monotonic) -> StatusSample:
+    """Sample the player status with a single AppleScript call."""
+    player_status = get_player_status()
+    return StatusSample(player_status, clock())
+
+
+def watch(
+    tick: float = 1.0,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+    wake: threading.Event | None = None,
+) -> Iterator[PlayerStatus | None]:
+    """Yield the player status every `tick` seconds, forever.
+
+    Music is only queried on the adaptive schedule of StatusSample.next_poll_at;
+    in between, the playback position is interpolated locally. Setting `wake`
+    makes it query Music at once, e.g. after a command changed the player.
+    """
+    if wake is not None:
+        wake.clear()
+    sample = sample_status(clock)
+    while True:
+        now = clock()
+        woken = wake is not None and wake.is_set()
+        if woken or now >= sample.next_poll_at():
+            if wake is not None:
+                wake.clear()
+            sample = sample_status(clock)
+            now = sample.taken_at
+        yield sample.at(now)
+        delay = max(0.0, min(tick, sample.next_poll_at() - clock()))
+        if wake is not None:
+            wake.wait(delay)
+        else:
+            sleep(delay)
@@ -0,0 +1,58 @@
+"""AppleScript for playback controls and volume.
+
+Kept free of click and the other helpers: the CLI fast path
+(clawtunes.fast) runs these scripts without importing anything else.
+"""
+
+PAUSE_SCRIPT = """
+tell application "Music"
+    pause
+end tell
+"""
+
+RESUME_SCRIPT = """
+tell application "Music"
+    play
+end tell
+"""
+
+NEXT_TRACK_SCRIPT = """
+tell application "Music"
+    next track
+end tell
+"""
+
+PREVIOUS_TRACK_SCRIPT = """
+tell application "Music"
+    back track
+end tell
+"""
+
+GET_VOLUME_SCRIPT = """
+tell application "Music"
+    return (sound volume as string) & "|" & (mute as string)
+end tell
+"""
+
+
+def set_volume_script(volume: int) -> str:
+    """Return the script that sets the volume, clamped to 0-100."""
+    volume = max(0, min(100, volume))
+    return f"""
+tell application "Music"
+    set sound volume to {volume}
+end tell
+"""
+
+
+def parse_volume(stdout: str) -> tuple[int, bool] | None:
+    """Parse GET_VOLUME_SCRIPT output into (volume, is_muted)."""
+    parts = stdout.strip().split("|")
+    if len(parts) < 2:
+        return None
+    try:
+        volume = int(parts[0])
+        is_muted = parts[1].lower() == "true"
+        return (volume, is_muted)
+    except ValueError:
+        return None
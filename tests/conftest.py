@@ -0,0 +1,88 @@
+"""Shared test fixtures."""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from clawtunes_helpers import catalog, httpclient
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep caches written by the code under test out of the real home."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("CLAWTUNES_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def fast_catalog_retries(monkeypatch):
+    """Retry failed catalog requests without waiting seconds between tries."""
+    monkeypatch.setattr(catalog, "BACKOFF_BASE", 0.001)
+
+
+class _ITunesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        payload = self.server.payload
+        if callable(payload):
+            payload = payload(self.path)
+        body = json.dumps(payload).encode("utf-8")
+        compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+        if compressed:
+            body = gzip.compress(body)
+        statuses = self.server.statuses
+        self.send_response(statuses.pop(0) if statuses else self.server.status)
+        for name, value in self.server.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop_connections:
+            # Hang up without announcing it, like a server timing out.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def itunes_server(monkeypatch):
+    """Local stand-in for the iTunes API, answering every GET with `payload`.
+
+    `payload` is a dict, or a function returning one for the request path.
+    Responses have `status`, or the next of `statuses` while there are any,
+    and the extra `headers`.
+    Records request paths in `requests` and counts accepted `connections`;
+    with `drop_connections` set, closes each connection after one response.
+    Each response takes `delay` seconds.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ITunesHandler)
+    server.payload = {"resultCount": 0, "results": []}
+    server.status = 200
+    server.statuses = []
+    server.headers = {}
+    server.requests = []
+    server.connections = 0
+    server.drop_connections = False
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    monkeypatch.setenv("CLAWTUNES_ITUNES_URL", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    httpclient.close()
+    server.shutdown()
+    server.server_close()
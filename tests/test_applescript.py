@@ -0,0 +1,32 @@
+"""Tests for the AppleScript wrapper."""
+
+import subprocess
+from collections import OrderedDict
+
+from clawtunes_helpers import applescript
+
+
+def test_scripts_are_compiled_on_second_run_and_evicted(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        if command[0] == "osacompile":
+            (tmp_path / command[2]).write_text("compiled")
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    monkeypatch.setattr(applescript.subprocess, "run", fake_run)
+    monkeypatch.setattr(applescript, "_compiled_paths", OrderedDict())
+    monkeypatch.setattr(applescript, "MAX_COMPILED_SCRIPTS", 2)
+    monkeypatch.setattr(applescript, "_compiled_dir", None)
+    applescript.enable_compiled_scripts(tmp_path)
+
+    for script in ["pause", "pause", "pause", "volume 1", "volume 2"]:
+        applescript.run_applescript(script)
+
+    osacompiles = [c for c in commands if c[0] == "osacompile"]
+    assert [c[-1] for c in osacompiles] == ["pause"]
+    assert commands[2] == ["osascript", osacompiles[0][2]]
+    assert commands[-1] == ["osascript", "-e", "volume 2"]
+    # "pause" was the least recently run script, so its file is gone.
+    assert not list(tmp_path.glob("*.scpt"))
@@ -0,0 +1,64 @@
+"""Tests for clawtunes batch."""
+
+import json
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers.applescript import FIELD_SEP
+
+
+def _results(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@patch("clawtunes_helpers.playback.run_applescript")
+def test_batch_merges_simple_commands(mock_applescript):
+    mock_applescript.return_value = ("3", "", 0)
+    commands = 'volume 30\n# comment\n\n["shuffle", "ON"]\nclawtunes repeat all\n'
+
+    result = CliRunner().invoke(cli, ["batch"], input=commands)
+
+    assert result.exit_code == 0
+    assert mock_applescript.call_count == 1
+    script = mock_applescript.call_args[0][0]
+    assert "set sound volume to 30" in script
+    assert "set shuffle enabled to true" in script
+    assert "set song repeat to all" in script
+    results = _results(result.output)
+    assert [r["line"] for r in results] == [1, 4, 5]
+    assert [r["stdout"] for r in results] == [
+        "Volume: 30%\n",
+        "Shuffle: on\n",
+        "Repeat: all\n",
+    ]
+
+
+@patch("clawtunes_helpers.playback.run_applescript")
+def test_batch_reruns_failed_step_and_stops_on_error(mock_applescript):
+    mock_applescript.side_effect = [
+        ("1" + FIELD_SEP + "Music got an error", "", 0),
+        ("", "Music got an error", 1),
+    ]
+    commands = "pause\nnext\nprev\n"
+
+    result = CliRunner().invoke(cli, ["batch", "--stop-on-error"], input=commands)
+
+    assert result.exit_code == 1
+    results = _results(result.output)
+    assert [r["exit_code"] for r in results] == [0, 1]
+    assert results[0]["stdout"] == "Paused\n"
+    assert results[1]["stderr"].startswith("Failed to skip: Music got an error")
+
+
+def test_batch_reports_invalid_lines_and_continues():
+    commands = 'serve\n"unterminated\nno-such-command\n'
+
+    result = CliRunner().invoke(cli, ["batch"], input=commands)
+
+    assert result.exit_code == 1
+    results = _results(result.output)
+    assert [r["exit_code"] for r in results] == [2, 2, 2]
+    assert "cannot run inside a batch" in results[0]["stderr"]
+    assert "No such command" in results[2]["stderr"]
@@ -0,0 +1,64 @@
+"""Tests for the CLI benchmark suite and its simulated Music app."""
+
+import json
+
+from benchmarks import cli_bench
+from benchmarks.simulated_music import SimulatedMusic
+
+from clawtunes_helpers import playback
+
+
+def test_every_scenario_succeeds_against_simulated_music():
+    config = cli_bench.Config(
+        tracks=200, launch_ms=0, event_ms=0, connect_ms=0, http_ms=0, repeat=1
+    )
+
+    results = cli_bench.run_all(config)
+
+    failed = [name for name, metrics in results.items() if metrics["exit_code"]]
+    assert failed == []
+    assert results["pause"]["processes"] == 1
+    assert results["catalog search"]["http_requests"] == 3
+
+
+def test_simulated_music_counts_launches_and_events():
+    with SimulatedMusic(tracks=20) as music:
+        results = playback.search_songs("Track 1", limit=3)
+
+    # All prefix matches; the best rated, then most played, come first.
+    assert [display for _, display in results][:2] == [
+        "Track 11 Song - Artist 11 (Album 11)",
+        "Track 17 Song - Artist 17 (Album 17)",
+    ]
+    assert len(results) == 3
+    assert music.launches == 1
+    assert music.events == 8
+
+
+def test_compare_flags_growing_counts_and_slow_runs():
+    before = {"exit_code": 0, "wall_ms": 20.0, "processes": 1, "apple_events": 1}
+    before |= {"http_connections": 0, "http_requests": 0, "peak_kib": 100.0}
+    after = {**before, "wall_ms": 40.0, "processes": 2}
+
+    regressions = cli_bench.compare({"pause": after}, {"pause": before})
+
+    assert regressions == ["pause: processes 1 -> 2", "pause: wall_ms 20.0 -> 40.0"]
+    assert cli_bench.compare({"pause": before}, {"pause": before}) == []
+
+
+def test_counts_do_not_regress_against_the_baseline():
+    baseline = json.loads(cli_bench.BASELINE.read_text())
+    # Counts do not depend on simulated latency, so skip it to stay fast.
+    config = cli_bench.Config(
+        tracks=baseline["config"]["tracks"],
+        launch_ms=0,
+        event_ms=0,
+        connect_ms=0,
+        http_ms=0,
+        repeat=1,
+    )
+
+    results = cli_bench.run_all(config)
+
+    assert results.keys() == baseline["scenarios"].keys()
+    assert cli_bench.compare(results, baseline["scenarios"], cli_bench.COUNTS) == []
@@ -1,12 +1,26 @@
 """Tests for catalog helpers."""
 
 import json
+import time
+import types
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
-from clawtunes_helpers import catalog
+import pytest
+from click.testing import CliRunner
 
+from clawtunes.cli import cli
+from clawtunes_helpers import catalog, library, playback
 
-def test_search_catalog_parses_json(monkeypatch):
-    mock_response = {
+
+@pytest.fixture(autouse=True)
+def empty_library(monkeypatch):
+    """Match catalog songs against an empty library instead of Music."""
+    monkeypatch.setattr(library, "fetch_tracks", lambda: ([], ""))
+
+
+def test_search_catalog_parses_json(itunes_server):
+    itunes_server.payload = {
         "resultCount": 2,
         "results": [
             {
@@ -26,36 +40,89 @@ def test_search_catalog_parses_json(monkeypatch):
         ],
     }
 
-    class FakeResponse:
-        def read(self):
-            return json.dumps(mock_response).encode("utf-8")
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, *args):
-            pass
-
-    def fake_urlopen(url, timeout=None):
-        return FakeResponse()
-
-    monkeypatch.setattr(catalog.urllib.request, "urlopen", fake_urlopen)
-
     results = catalog.search_catalog("queen", limit=5)
 
     assert len(results) == 2
     assert results[0]["trackName"] == "Bohemian Rhapsody"
     assert results[1]["artistName"] == "Queen"
+    assert itunes_server.requests == [
+        "/search?term=queen&media=music&entity=song&limit=5"
+    ]
+
+
+def test_search_catalog_reuses_connection(itunes_server):
+    catalog.search_catalog("queen")
+    catalog.search_catalog("abba")
+
+    assert len(itunes_server.requests) == 2
+    assert itunes_server.connections == 1
 
 
 def test_search_catalog_handles_error(monkeypatch):
-    def fake_urlopen(url, timeout=None):
-        raise catalog.urllib.error.URLError("Network error")
+    # Nothing listens on port 9 (discard) here, so the connection fails.
+    monkeypatch.setenv("CLAWTUNES_ITUNES_URL", "http://127.0.0.1:9")
 
-    monkeypatch.setattr(catalog.urllib.request, "urlopen", fake_urlopen)
+    with pytest.raises(catalog.CatalogError, match="Could not reach"):
+        catalog.search_catalog("query")
 
+
+def test_search_catalog_gives_up_after_retries(itunes_server, monkeypatch):
+    itunes_server.status = 503
+    sleeps = []
+    monkeypatch.setattr(
+        catalog, "time", types.SimpleNamespace(time=time.time, sleep=sleeps.append)
+    )
+
+    with pytest.raises(catalog.CatalogError, match="HTTP 503"):
+        catalog.search_catalog("query")
+    assert len(itunes_server.requests) == catalog.MAX_ATTEMPTS
+    # No pointless wait after the last attempt.
+    assert len(sleeps) == catalog.MAX_ATTEMPTS - 1
+
+
+def test_search_catalog_retries_after_rate_limit(itunes_server):
+    itunes_server.statuses = [429]
+    itunes_server.headers = {"Retry-After": "0.2"}
+    itunes_server.payload = {"resultCount": 1, "results": [{"trackName": "A"}]}
+
+    started = time.monotonic()
     results = catalog.search_catalog("query")
-    assert results == []
+
+    assert results == [{"trackName": "A"}]
+    assert len(itunes_server.requests) == 2
+    assert time.monotonic() - started >= 0.2
+
+
+def test_search_catalog_does_not_retry_client_errors(itunes_server):
+    itunes_server.status = 400
+
+    with pytest.raises(catalog.CatalogError, match="HTTP 400"):
+        catalog.search_catalog("query")
+    assert len(itunes_server.requests) == 1
+
+
+def test_identical_concurrent_searches_share_one_request(itunes_server):
+    itunes_server.delay = 0.2
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: catalog.search_catalog("same"), range(3)))
+
+    assert results == [[], [], []]
+    assert len(itunes_server.requests) == 1
+
+
+def test_catalog_search_command_reports_errors_apart_from_no_results(
+    itunes_server,
+):
+    itunes_server.status = 503
+
+    result = CliRunner().invoke(cli, ["catalog", "search", "query", "-t", "song"])
+
+    assert result.exit_code == 1
+    assert "Failed to search songs: Apple Music catalog returned HTTP 503" in (
+        result.stderr
+    )
+    assert "No results" not in result.output
 
 
 def test_format_catalog_results():
@@ -100,3 +167,211 @@ def test_open_catalog_track(monkeypatch):
     assert result is True
     assert len(calls) == 1
     assert calls[0] == ["open", "music://music.apple.com/track/123"]
+
+
+def test_search_catalog_entities_runs_requests_concurrently(itunes_server):
+    itunes_server.delay = 0.3
+    entities = list(catalog.CATALOG_ENTITIES)
+
+    started = time.monotonic()
+    results, errors = catalog.search_catalog_entities("heroes", entities)
+    elapsed = time.monotonic() - started
+
+    assert list(results) == entities
+    assert errors == {}
+    assert sorted(path.split("entity=")[1] for path in itunes_server.requests) == [
+        "album&limit=10",
+        "musicArtist&limit=10",
+        "song&limit=10",
+    ]
+    assert elapsed < 0.6
+
+
+def test_match_score_follows_library_ranking():
+    def score(query, name):
+        song = {"trackName": name, "artistName": "David Bowie"}
+        return catalog._match_score(query, song)
+
+    assert score("heroes", "Heroes") == 4
+    assert score("heroes", "Heroes (Live)") == 3
+    assert score("heroes", "We Could Be Heroes") == 2
+    assert score("bowie heroes", "Heroes") == 1
+    assert score("heroes", "Space Oddity") == 0
+
+
+def test_rank_catalog_results_groups_by_best_match():
+    results = {
+        "song": [
+            {"trackName": "Heroes and Villains", "artistName": "The Beach Boys"},
+            {"trackName": "Heroes", "artistName": "David Bowie"},
+        ],
+        "album": [
+            {
+                "wrapperType": "collection",
+                "collectionName": "Heroes",
+                "artistName": "David Bowie",
+                "collectionViewUrl": "https://music.apple.com/album",
+            }
+        ],
+        "musicArtist": [],
+    }
+
+    ranked = catalog.rank_catalog_results("heroes", results)
+
+    assert [display for _, display in ranked] == [
+        "Song: Heroes - David Bowie (Unknown)",
+        "Song: Heroes and Villains - The Beach Boys (Unknown)",
+        "Album: Heroes - David Bowie",
+    ]
+    assert ranked[2][0] == "https://music.apple.com/album"
+
+
+def test_catalog_search_command_searches_selected_types(itunes_server, monkeypatch):
+    itunes_server.payload = {
+        "resultCount": 1,
+        "results": [
+            {
+                "wrapperType": "artist",
+                "artistName": "David Bowie",
+                "primaryGenreName": "Rock",
+                "artistLinkUrl": "https://music.apple.com/artist/1",
+            }
+        ],
+    }
+    opened = []
+    monkeypatch.setattr(
+        catalog, "open_catalog_track", lambda url: opened.append(url) or True
+    )
+
+    result = CliRunner().invoke(cli, ["catalog", "search", "bowie", "-t", "artist"])
+
+    assert result.exit_code == 0
+    assert "Opening in Apple Music: Artist: David Bowie (Rock)" in result.output
+    assert opened == ["https://music.apple.com/artist/1"]
+    assert len(itunes_server.requests) == 1
+
+
+def test_catalog_search_plays_songs_in_library_locally(itunes_server, monkeypatch):
+    itunes_server.payload = {
+        "resultCount": 1,
+        "results": [
+            {
+                "wrapperType": "track",
+                "trackName": "Heroes",
+                "artistName": "David Bowie",
+                "collectionName": "Heroes",
+                "trackTimeMillis": 371000,
+                "trackViewUrl": "https://music.apple.com/song/1",
+            }
+        ],
+    }
+    tracks = [library.TrackInfo(1, "77", "Heroes", "David Bowie", "Heroes", 371.2)]
+    monkeypatch.setattr(library, "fetch_tracks", lambda: (tracks, ""))
+    played = []
+    monkeypatch.setattr(
+        playback, "play_track_by_database_id", lambda i: played.append(i) or True
+    )
+    monkeypatch.setattr(catalog, "open_catalog_track", lambda url: False)
+
+    result = CliRunner().invoke(cli, ["catalog", "search", "heroes", "-t", "song"])
+
+    assert result.exit_code == 0
+    assert (
+        "Playing from library: Song: Heroes - David Bowie (Heroes) [in library]"
+        in result.output
+    )
+    assert played == ["77"]
+
+
+def _paged_payload(path):
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+    offset = int(query.get("offset", ["0"])[0])
+    limit = int(query["limit"][0])
+    # 25 results in all.
+    results = [
+        {
+            "wrapperType": "track",
+            "trackName": f"Love {i}",
+            "trackViewUrl": f"https://music.apple.com/song/{i}",
+        }
+        for i in range(offset + 1, min(offset + limit, 25) + 1)
+    ]
+    return {"resultCount": len(results), "results": results}
+
+
+def test_search_catalog_fetches_pages_by_offset(itunes_server):
+    itunes_server.payload = _paged_payload
+
+    first = catalog.search_catalog("love", limit=10)
+    third = catalog.search_catalog("love", limit=10, offset=20)
+
+    assert [r["trackName"] for r in first][-1] == "Love 10"
+    assert [r["trackName"] for r in third] == [f"Love {i}" for i in range(21, 26)]
+    assert itunes_server.requests[1].endswith("&offset=20")
+
+
+def test_catalog_search_pages_and_prefetches_next_page(itunes_server, monkeypatch):
+    itunes_server.payload = _paged_payload
+    opened = []
+    monkeypatch.setattr(
+        catalog, "open_catalog_track", lambda url: opened.append(url) or True
+    )
+
+    result = CliRunner().invoke(
+        cli, ["catalog", "search", "love", "-t", "song"], input="n\nn\np\n12\n"
+    )
+
+    assert result.exit_code == 0
+    assert "  21. Song: Love 21" in result.output
+    assert opened == ["https://music.apple.com/song/12"]
+    # Each page was requested once, before it was shown.
+    offsets = [
+        urllib.parse.parse_qs(urllib.parse.urlsplit(path).query).get("offset")
+        for path in itunes_server.requests
+    ]
+    assert offsets == [None, ["10"], ["20"]]
+
+
+def test_catalog_search_first_does_not_prefetch(itunes_server, monkeypatch):
+    itunes_server.payload = _paged_payload
+    monkeypatch.setattr(catalog, "open_catalog_track", lambda url: True)
+
+    result = CliRunner().invoke(cli, ["-1", "catalog", "search", "love", "-t", "song"])
+
+    assert result.exit_code == 0
+    assert "Opening in Apple Music: Song: Love 1" in result.output
+    assert len(itunes_server.requests) == 1
+
+
+def _lookup_payload(path):
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+    # Every third ID is missing from the catalog.
+    ids = [int(i) for i in query["id"][0].split(",") if int(i) % 3]
+    results = [{"wrapperType": "track", "trackId": i} for i in ids]
+    return {"resultCount": len(results), "results": results}
+
+
+def test_lookup_catalog_chunks_ids_and_keeps_input_order(itunes_server):
+    itunes_server.payload = _lookup_payload
+    ids = [str(i) for i in range(450, 0, -1)]
+
+    results = list(catalog.lookup_catalog(ids))
+
+    assert [r.id for r in results] == ids
+    assert all((r.result is None) == (int(r.id) % 3 == 0) for r in results)
+    sizes = sorted(len(p.split("id=")[1].split(",")) for p in itunes_server.requests)
+    assert sizes == [50, 200, 200]
+
+
+def test_catalog_lookup_command_prints_json_lines(itunes_server):
+    itunes_server.payload = _lookup_payload
+
+    result = CliRunner().invoke(cli, ["catalog", "lookup"], input="1, 3\nabc\n")
+
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert lines == [
+        {"id": "1", "result": {"wrapperType": "track", "trackId": 1}},
+        {"id": "3", "result": None},
+        {"id": "abc", "result": None, "error": "Invalid ID"},
+    ]
+    assert result.exit_code == 1
@@ -0,0 +1,89 @@
+"""Tests for the on-disk catalog response cache."""
+
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers import catalog, catalog_cache
+
+SONG = {"trackName": "Heroes", "trackViewUrl": "https://music.apple.com/1"}
+
+
+def test_repeated_search_is_served_from_cache(itunes_server):
+    itunes_server.payload = {"resultCount": 1, "results": [SONG]}
+
+    first = catalog.search_catalog("Bowie  Heroes")
+    second = catalog.search_catalog("bowie heroes")
+
+    assert first == second == [SONG]
+    assert len(itunes_server.requests) == 1
+    assert catalog.search_catalog("bowie heroes", limit=5) == [SONG]
+    assert len(itunes_server.requests) == 2
+
+
+def test_stale_entry_is_served_and_refreshed(itunes_server, monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_CATALOG_TTL", "0")
+    itunes_server.payload = {"resultCount": 1, "results": [SONG]}
+    catalog.search_catalog("heroes")
+    updated = {**SONG, "trackName": "Heroes (Remastered)"}
+    itunes_server.payload = {"resultCount": 1, "results": [updated]}
+
+    assert catalog.search_catalog("heroes") == [SONG]
+    catalog.wait_for_refreshes()
+
+    assert len(itunes_server.requests) == 2
+    assert catalog_cache.get(catalog_cache.cache_key("heroes", "song", 10, None))
+    assert catalog.search_catalog("heroes") == [updated]
+
+
+def test_failed_refresh_makes_one_attempt(itunes_server, monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_CATALOG_TTL", "0")
+    itunes_server.payload = {"resultCount": 1, "results": [SONG]}
+    catalog.search_catalog("heroes")
+    itunes_server.status = 503
+
+    assert catalog.search_catalog("heroes") == [SONG]
+    catalog.wait_for_refreshes()
+
+    assert len(itunes_server.requests) == 2
+    # The entry is still stale, so the next search tries to refresh it again.
+    assert catalog.search_catalog("heroes") == [SONG]
+    catalog.wait_for_refreshes()
+    assert len(itunes_server.requests) == 3
+
+
+def test_expired_entry_is_used_when_api_fails(itunes_server, monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_CATALOG_TTL", "0")
+    monkeypatch.setenv("CLAWTUNES_CATALOG_STALE_TTL", "0")
+    itunes_server.payload = {"resultCount": 1, "results": [SONG]}
+    catalog.search_catalog("heroes")
+    itunes_server.status = 503
+
+    assert catalog.search_catalog("heroes") == [SONG]
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_CATALOG_CACHE_MB", str(250 / 1024 / 1024))
+    results = [{"trackName": "x" * 80}]
+    catalog_cache.put("a", results, now=1)
+    catalog_cache.put("b", results, now=2)
+    catalog_cache.get("a", now=3)
+
+    catalog_cache.put("c", results, now=4)
+
+    assert catalog_cache.get("a", now=5) is not None
+    assert catalog_cache.get("b", now=5) is None
+    assert catalog_cache.get("c", now=5) is not None
+
+
+def test_cache_stats_and_clear_commands(itunes_server):
+    catalog.search_catalog("heroes")
+    catalog.search_catalog("heroes")
+    runner = CliRunner()
+
+    stats = runner.invoke(cli, ["catalog", "cache", "stats"])
+    cleared = runner.invoke(cli, ["catalog", "cache", "clear"])
+
+    assert "Entries: 1" in stats.output
+    assert "Hits: 1 fresh, 0 stale; misses: 1" in stats.output
+    assert cleared.output == "Removed 1 cached responses\n"
+    assert catalog_cache.stats().entries == 0
@@ -0,0 +1,127 @@
+"""Tests for importing lists of songs from the catalog."""
+
+import json
+import subprocess
+import urllib.parse
+
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers import catalog, catalog_import, library
+
+
+def _song(name, artist, track_id=1):
+    return {
+        "wrapperType": "track",
+        "trackId": track_id,
+        "trackName": name,
+        "artistName": artist,
+        "collectionName": name,
+        "trackViewUrl": f"https://music.apple.com/song/{track_id}",
+    }
+
+
+def test_classify_prefers_title_then_artist():
+    results = [
+        _song("Heroes (Live)", "David Bowie", 1),
+        _song("Heroes - 2017 Remaster", "David Bowie", 2),
+        _song("Heroes", "Peter Gabriel", 3),
+    ]
+
+    match = catalog_import.classify(1, "David Bowie - Heroes", results)
+
+    assert match.status == catalog_import.CONFIDENT
+    assert match.result["artistName"] == "David Bowie"
+
+
+def test_classify_ambiguous_and_missing():
+    covers = [_song("Hallelujah", "Jeff Buckley", 1), _song("Hallelujah", "k.d. lang")]
+
+    assert catalog_import.classify(1, "Hallelujah", covers).status == (
+        catalog_import.AMBIGUOUS
+    )
+    assert catalog_import.classify(2, "Nobody - Nothing", covers).status == (
+        catalog_import.MISSING
+    )
+    assert catalog_import.classify(3, "Nobody - Nothing", []).status == (
+        catalog_import.MISSING
+    )
+
+
+def _catalog_payload(path):
+    term = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)["term"][0]
+    songs = {
+        "Queen Bohemian Rhapsody": [_song("Bohemian Rhapsody", "Queen", 10)],
+        "David Bowie Heroes": [_song("Heroes", "David Bowie", 20)],
+    }
+    results = songs.get(term, [])
+    return {"resultCount": len(results), "results": results}
+
+
+def test_catalog_import_reports_lines_and_adds_owned_matches(
+    itunes_server, monkeypatch, tmp_path
+):
+    itunes_server.payload = _catalog_payload
+    owned = library.TrackInfo(1, "77", "Heroes", "David Bowie", "Heroes", 371.0)
+    monkeypatch.setattr(library, "fetch_tracks", lambda: ([owned], ""))
+    added = []
+
+    def fake_add(playlist_name, database_ids):
+        added.append((playlist_name, database_ids))
+        return True, f"Added {len(database_ids)} tracks to '{playlist_name}'"
+
+    monkeypatch.setattr(library, "add_playlist_entries", fake_add)
+    songs = tmp_path / "songs.txt"
+    songs.write_text(
+        "# Road trip\n"
+        "Queen - Bohemian Rhapsody\n"
+        "\n"
+        "David Bowie - Heroes\n"
+        "Nobody - Nothing\n"
+        "David Bowie - Heroes\n",
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(
+        cli, ["catalog", "import", str(songs), "--playlist", "Imported"]
+    )
+
+    assert result.exit_code == 0
+    report = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(r["line"], r["status"]) for r in report] == [
+        (2, "confident"),
+        (4, "confident"),
+        (5, "missing"),
+        (6, "confident"),
+    ]
+    assert report[0]["library_id"] is None
+    assert report[1]["library_id"] == "77"
+    assert added == [("Imported", ["77", "77"])]
+    assert "3 confident, 0 ambiguous, 1 missing, 0 failed" in result.stderr
+    assert "1 confident matches are not in the library" in result.stderr
+    # Repeated lines share one request.
+    assert len(itunes_server.requests) == 3
+
+
+def test_catalog_import_opens_missing_matches_in_one_call(
+    itunes_server, monkeypatch, tmp_path
+):
+    itunes_server.payload = _catalog_payload
+    monkeypatch.setattr(library, "fetch_tracks", lambda: ([], ""))
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    monkeypatch.setattr(catalog.subprocess, "run", fake_run)
+    songs = tmp_path / "songs.txt"
+    songs.write_text("Queen - Bohemian Rhapsody\nDavid Bowie - Heroes\n")
+
+    result = CliRunner().invoke(cli, ["catalog", "import", str(songs), "--open"])
+
+    assert result.exit_code == 0
+    assert commands == [
+        ["open", "music://music.apple.com/song/10", "music://music.apple.com/song/20"]
+    ]
+    assert "Opened 2 tracks in Apple Music" in result.stderr
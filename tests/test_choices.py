@@ -0,0 +1,106 @@
+"""Tests for remembered choices."""
+
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers import choices, playback
+from clawtunes_helpers.choices import Choice
+from clawtunes_helpers.ranking import Match
+
+
+def test_choices_are_per_normalized_query_and_evict_least_recently_used(
+    monkeypatch,
+):
+    monkeypatch.setattr(choices, "MAX_CHOICES", 2)
+
+    choices.remember("song", "Bohemian  Rhapsody", Choice("1", "A"))
+    choices.remember("album", "Bohemian Rhapsody", Choice("Opera", "B"))
+    choices.remember("song", "bohemian rhapsody", Choice("2", "C"))
+    choices.remember("song", "Heroes", Choice("3", "D"))
+
+    assert choices.recall("song", "BOHEMIAN RHAPSODY") == Choice("2", "C")
+    assert choices.recall("album", "Bohemian Rhapsody") is None
+    assert choices.recall("song", "Heroes") == Choice("3", "D")
+
+    choices.forget("song", "heroes")
+
+    assert choices.recall("song", "Heroes") is None
+
+
+def _search_and_play(monkeypatch, available):
+    searches = []
+    played = []
+
+    def fake_search(name, limit=None):
+        searches.append(name)
+        return [("1", "Song 1"), ("2", "Song 2")]
+
+    def fake_stream(name):
+        searches.append(name)
+        songs = [Match("1", "Song 1", "Song 1"), Match("2", "Song 2", "Song 2")]
+        return len(songs), iter([songs])
+
+    def fake_play(track_id):
+        played.append(track_id)
+        return track_id in available
+
+    monkeypatch.setattr(playback, "search_songs", fake_search)
+    monkeypatch.setattr(playback, "stream_songs", fake_stream)
+    monkeypatch.setattr(playback, "play_track_by_id", fake_play)
+    return searches, played
+
+
+def test_play_song_plays_remembered_pick_without_searching(monkeypatch):
+    searches, played = _search_and_play(monkeypatch, {"1", "2"})
+    runner = CliRunner()
+
+    picked = runner.invoke(cli, ["play", "song", "Song"], input="2\n")
+    again = runner.invoke(cli, ["play", "song", "song"])
+    fresh = runner.invoke(cli, ["-1", "play", "song", "song", "--fresh"])
+
+    assert picked.exit_code == again.exit_code == fresh.exit_code == 0
+    assert "Playing: Song 2" in again.output
+    assert played == ["2", "2", "1"]
+    assert searches == ["Song", "song"]
+    # Forgotten by --fresh; the pick made by -1 is not remembered.
+    assert choices.recall("song", "Song") is None
+
+
+def test_play_song_searches_again_when_remembered_pick_is_gone(monkeypatch):
+    choices.remember("song", "Song", Choice("9", "Deleted Song"))
+    searches, played = _search_and_play(monkeypatch, {"1", "2"})
+
+    result = CliRunner().invoke(cli, ["-1", "play", "song", "Song"])
+
+    assert result.exit_code == 0
+    assert "Deleted Song" not in result.output
+    assert played == ["9", "1"]
+    assert searches == ["Song"]
+    assert choices.recall("song", "Song") is None
+
+
+def test_non_interactive_lists_matches_instead_of_playing_remembered_pick(
+    monkeypatch,
+):
+    choices.remember("song", "Song", Choice("2", "Song 2"))
+    searches, played = _search_and_play(monkeypatch, {"1", "2"})
+
+    result = CliRunner().invoke(cli, ["-N", "play", "song", "Song"])
+
+    assert result.exit_code == 1
+    assert "  2. Song 2" in result.output
+    assert played == []
+    assert searches == ["Song"]
+    assert choices.recall("song", "Song") == Choice("2", "Song 2")
+
+
+def test_choices_clear_forgets_everything():
+    choices.remember("song", "Song", Choice("1", "Song 1"))
+    choices.remember("album", "Album", Choice("Album", "Album"))
+
+    result = CliRunner().invoke(cli, ["choices", "clear"])
+
+    assert result.exit_code == 0
+    assert "Forgot 2 remembered matches" in result.output
+    assert choices.recall("song", "Song") is None
+    assert choices.recall("album", "Album") is None
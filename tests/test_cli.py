@@ -1,10 +1,16 @@
 """Tests for the clawtunes CLI."""
 
+import json
+import os
+import subprocess
+import sys
 from unittest.mock import patch
 
+import click
 from click.testing import CliRunner
 
-from clawtunes.cli import cli
+from clawtunes.cli import COMMANDS, cli
+from clawtunes_helpers.applescript import FIELD_SEP
 
 
 def test_cli_help():
@@ -57,7 +63,20 @@ def test_cli_help_shows_non_interactive_and_first():
     assert "--first" in result.output
 
 
-MULTI_SONG_APPLESCRIPT_OUTPUT = "1|Song A|Artist A|Album A\n2|Song B|Artist B|Album B\n"
+# Song searches answer with one column per property: ids, ratings, play
+# counts, seconds since played, artists, albums and names.
+MULTI_SONG_APPLESCRIPT_OUTPUT = "\x1d".join(
+    "\x1e".join(column)
+    for column in (
+        ["1", "2"],
+        ["0", "0"],
+        ["0", "0"],
+        ["", ""],
+        ["Artist A", "Artist B"],
+        ["Album A", "Album B"],
+        ["Song A", "Song B"],
+    )
+)
 
 
 @patch("clawtunes_helpers.playback.run_applescript")
@@ -81,3 +100,57 @@ def test_first_auto_selects_first_match(mock_applescript):
     result = runner.invoke(cli, ["-1", "play", "song", "test"])
     assert "Playing: Song A" in result.output
     assert result.exit_code == 0
+
+
+@patch("clawtunes_helpers.status.run_applescript")
+def test_status_json_uses_single_applescript_call(mock_applescript):
+    fields = ["playing", "35", "false", "true", "all", "true"]
+    fields += ["Song | A", "Artist A", "Album A", "200.5", "12.25", "true", "false"]
+    mock_applescript.return_value = (FIELD_SEP.join(fields), "", 0)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["status", "--json"])
+    assert result.exit_code == 0
+    assert mock_applescript.call_count == 1
+    assert json.loads(result.output) == {
+        "state": "playing",
+        "volume": 35,
+        "muted": False,
+        "shuffle": True,
+        "repeat": "all",
+        "track": {
+            "name": "Song | A",
+            "artist": "Artist A",
+            "album": "Album A",
+            "duration": 200.5,
+            "position": 12,
+            "favorited": True,
+            "disliked": False,
+        },
+    }
+
+
+def test_command_registry_matches_commands():
+    ctx = click.Context(cli)
+    for name, (_, short_help) in COMMANDS.items():
+        command = cli.get_command(ctx, name)
+        assert command is not None
+        assert command.name == name
+        assert command.get_short_help_str(200) == short_help
+
+
+def test_cli_import_does_not_load_command_helpers():
+    code = (
+        "import sys, clawtunes.cli; "
+        "print(sorted(m for m in sys.modules if m.startswith("
+        "('clawtunes_helpers.catalog', 'clawtunes_helpers.playback', "
+        "'clawtunes.commands', 'urllib.request'))))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    assert result.stdout.strip() == "[]"
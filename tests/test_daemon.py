@@ -0,0 +1,72 @@
+"""Tests for clawtunesd and the forwarding client."""
+
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from clawtunes import client, daemon
+
+
+@pytest.fixture
+def running_daemon(monkeypatch):
+    # Unix socket paths are limited to ~100 bytes, so avoid pytest's tmp_path.
+    with tempfile.TemporaryDirectory(dir="/tmp") as socket_dir:
+        path = str(Path(socket_dir) / "clawtunesd.sock")
+        monkeypatch.setenv("CLAWTUNES_SOCKET", path)
+        server = daemon.create_server(path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        server.server_close()
+
+
+def test_run_command_captures_output_and_exit_code():
+    stdout, stderr, exit_code = daemon.run_command(["--help"])
+    assert exit_code == 0
+    assert "Control Apple Music" in stdout
+
+    stdout, stderr, exit_code = daemon.run_command(["no-such-command"])
+    assert exit_code == 2
+    assert "No such command" in stderr
+
+
+@patch("clawtunes_helpers.playback.run_applescript")
+def test_client_forwards_to_daemon(mock_applescript, running_daemon, capsys):
+    mock_applescript.return_value = ("", "", 0)
+
+    exit_code = client.run_via_daemon(["pause"])
+
+    assert exit_code == 0
+    assert capsys.readouterr().out == "Paused\n"
+    mock_applescript.assert_called_once()
+
+
+def test_client_falls_back_without_daemon(monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_SOCKET", "/nonexistent/clawtunesd.sock")
+    assert client.run_via_daemon(["pause"]) is None
+
+
+def test_client_keeps_interactive_selection_in_process(running_daemon):
+    assert client.run_via_daemon(["play", "song", "love"]) is None
+    assert client.run_via_daemon(["status", "--watch"]) is None
+
+
+def test_client_keeps_stdin_readers_in_process(running_daemon):
+    assert client.run_via_daemon(["-N", "catalog", "lookup"]) is None
+    assert client.run_via_daemon(["-1", "catalog", "lookup", "--country", "US"]) is None
+    assert client.run_via_daemon(["-N", "catalog", "import", "-"]) is None
+    assert (
+        client.run_via_daemon(
+            ["-N", "catalog", "import", "--playlist", "-", "-", "--open"]
+        )
+        is None
+    )
+
+
+def test_second_daemon_refuses_to_start(running_daemon):
+    with pytest.raises(daemon.click.ClickException):
+        daemon.create_server(running_daemon)
@@ -0,0 +1,69 @@
+"""Tests for the transport fast path."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clawtunes import fast
+from clawtunes.cli import cli
+from clawtunes_helpers import playback
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["pause"], ["resume"], ["next"], ["prev"], ["volume"], ["volume", "30"]],
+)
+@pytest.mark.parametrize("returncode", [0, 1])
+def test_fast_path_matches_cli(argv, returncode, monkeypatch, capsys):
+    def fake_run_applescript(script, args=None):
+        if returncode:
+            return "", "Not authorized to send Apple events (-1743)", 1
+        return "40|false", "", 0
+
+    monkeypatch.setattr(fast, "run_applescript", fake_run_applescript)
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+
+    exit_code = fast.run(argv)
+    captured = capsys.readouterr()
+    result = CliRunner().invoke(cli, argv)
+
+    assert exit_code == result.exit_code
+    assert captured.out == result.stdout
+    assert captured.err == result.stderr
+
+
+def test_relative_volume(monkeypatch, capsys):
+    scripts = []
+
+    def fake_run_applescript(script, args=None):
+        scripts.append(script)
+        return "95|false", "", 0
+
+    monkeypatch.setattr(fast, "run_applescript", fake_run_applescript)
+
+    assert fast.run(["volume", "+10"]) == 0
+    assert capsys.readouterr().out == "Volume: 100%\n"
+    assert "set sound volume to 100" in scripts[1]
+
+
+def test_other_commands_fall_through():
+    assert fast.run(["volume", "-10"]) is None
+    assert fast.run(["pause", "--help"]) is None
+    assert fast.run(["-1", "next"]) is None
+    assert fast.run(["status"]) is None
+
+
+def test_fast_path_does_not_import_click():
+    code = "import sys, clawtunes.fast; print('click' in sys.modules)"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,67 @@
+"""Tests for play history helpers."""
+
+import time
+
+import pytest
+
+from clawtunes_helpers import history
+from clawtunes_helpers.status import NowPlaying, PlayerStatus
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state(monkeypatch):
+    monkeypatch.setattr(history, "_last_observed", None)
+
+
+def _playing(name, artist="Artist", position=0.0, duration=180.0):
+    track = NowPlaying(name, artist, "Album", duration, position)
+    return PlayerStatus("playing", 50, False, False, "off", track)
+
+
+def test_observe_records_each_play_once(monkeypatch):
+    now = time.time()
+
+    assert history.observe(_playing("Song A"), now=now)
+    assert not history.observe(_playing("Song A", position=10.0), now=now + 10)
+    monkeypatch.setattr(history, "_last_observed", None)  # another process
+    assert not history.observe(_playing("Song A", position=20.0), now=now + 20)
+    assert history.observe(_playing("Song B"), now=now + 180)
+    assert history.observe(_playing("Song A"), now=now + 360)
+
+    plays = history.recent_plays(10)
+    assert [play.name for play in plays] == ["Song A", "Song B", "Song A"]
+    assert plays[-1].timestamp == now
+
+
+def test_observe_ignores_paused_player():
+    paused = _playing("Song A")
+    paused.player_state = "paused"
+
+    assert not history.observe(paused)
+    assert history.recent_plays() == []
+
+
+def test_summaries_use_daily_aggregates():
+    now = time.time()
+    for i, artist in enumerate(["Queen", "Bowie", "Queen", "Queen"]):
+        history.record_play(history.Play(now - i, f"Song {i}", artist, "Album"))
+    history.record_play(history.Play(now - 30 * 86400, "Old", "Bowie", "Album"))
+
+    assert history.top_artists(days=7) == [("Queen", 3), ("Bowie", 1)]
+    assert history.plays_per_day(days=7) == [(history._day(now), 4)]
+
+
+def test_log_is_rotated(monkeypatch, isolated_cache_dir):
+    monkeypatch.setattr(history, "MAX_LOG_BYTES", 100)
+    monkeypatch.setattr(history, "KEEP_LOGS", 2)
+
+    for i in range(10):
+        history.record_play(history.Play(float(i), f"Song {i}", "Artist", "Album"))
+
+    log_dir = isolated_cache_dir / "history"
+    assert sorted(p.name for p in log_dir.glob("plays.log*")) == [
+        "plays.log",
+        "plays.log.1",
+        "plays.log.2",
+    ]
+    assert len(history.recent_plays(100)) == 10
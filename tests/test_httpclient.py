@@ -0,0 +1,26 @@
+"""Tests for the pooled HTTP client."""
+
+import json
+
+from clawtunes_helpers import catalog, httpclient
+
+
+def test_get_decompresses_gzip(itunes_server):
+    itunes_server.payload = {"resultCount": 1, "results": [{"trackId": 1}]}
+
+    response = httpclient.get(f"{catalog.base_url()}/lookup?id=1")
+
+    assert response.status == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(response.body) == itunes_server.payload
+
+
+def test_get_retries_when_kept_alive_connection_was_closed(itunes_server):
+    itunes_server.drop_connections = True
+
+    first = httpclient.get(f"{catalog.base_url()}/search?term=a")
+    second = httpclient.get(f"{catalog.base_url()}/search?term=b")
+
+    assert first.status == second.status == 200
+    assert itunes_server.connections == 2
+    assert itunes_server.requests == ["/search?term=a", "/search?term=b"]
@@ -0,0 +1,134 @@
+"""Tests for library helpers."""
+
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers import library
+
+
+def _bulk_output(rows):
+    columns = zip(*rows)
+    return library.GROUP_SEP.join(library.RECORD_SEP.join(c) for c in columns)
+
+
+def test_fetch_tracks_parses_columns(monkeypatch):
+    captured = {}
+
+    def fake_run_applescript(script, args=None):
+        captured["script"] = script
+        captured["args"] = args
+        stdout = _bulk_output(
+            [
+                ("101", "Song | A", "Artist A", "Album A", "200,5"),
+                ("102", "Song B", "Artist B", "missing value", "180"),
+            ]
+        )
+        return stdout, "", 0
+
+    monkeypatch.setattr(library, "run_applescript", fake_run_applescript)
+
+    tracks, error = library.fetch_tracks("Road Trip")
+
+    assert error == ""
+    assert "on run argv" in captured["script"]
+    assert captured["args"] == ["Road Trip"]
+    assert tracks == [
+        library.TrackInfo(1, "101", "Song | A", "Artist A", "Album A", 200.5),
+        library.TrackInfo(2, "102", "Song B", "Artist B", "", 180.0),
+    ]
+
+
+def test_fetch_tracks_playlist_not_found(monkeypatch):
+    monkeypatch.setattr(
+        library,
+        "run_applescript",
+        lambda script, args=None: ("playlist_not_found", "", 0),
+    )
+
+    tracks, error = library.fetch_tracks("Missing")
+
+    assert tracks == []
+    assert "not found" in error
+
+
+def test_find_duplicates_groups_normalized_metadata():
+    tracks = [
+        library.TrackInfo(1, "1", "Heroes", "David Bowie", "Heroes", 371.2),
+        library.TrackInfo(2, "2", "Let's Dance", "David Bowie", "Let's Dance", 458.0),
+        library.TrackInfo(3, "3", "  heroes ", "DAVID  BOWIE", "Heroes", 370.9),
+        library.TrackInfo(4, "4", "Heroes", "David Bowie", "Live", 371.0),
+    ]
+
+    groups = library.find_duplicates(tracks)
+
+    assert groups == [[tracks[0], tracks[2]]]
+
+
+def test_library_index_matches_normalized_metadata_and_duration():
+    index = library.LibraryIndex(
+        [
+            library.TrackInfo(1, "11", "Heroes", "David Bowie", "Heroes", 371.2),
+            library.TrackInfo(2, "12", "Heroes", "David Bowie", "Live", 410.0),
+        ]
+    )
+
+    assert index.find(" HEROES", "david  bowie", "heroes", 370.0).database_id == "11"
+    assert index.find("Heroes", "David Bowie", "Live").database_id == "12"
+    assert index.find("Heroes", "David Bowie", "Heroes", 200.0) is None
+    assert index.find("Heroes", "Bowie", "Heroes") is None
+
+
+def test_library_index_is_cached_on_disk_until_invalidated(monkeypatch):
+    reads = []
+
+    def fake_fetch_tracks():
+        reads.append(1)
+        return [library.TrackInfo(1, "11", "Heroes", "David Bowie", "Heroes", 371)], ""
+
+    monkeypatch.setattr(library, "fetch_tracks", fake_fetch_tracks)
+
+    first, _ = library.library_index()
+    second, _ = library.library_index()
+    assert first.find("Heroes", "David Bowie", "Heroes") is not None
+    library.invalidate_index()
+    library.library_index()
+    monkeypatch.setenv("CLAWTUNES_LIBRARY_TTL", "-1")
+    library.library_index()
+
+    assert second.find("Heroes", "David Bowie", "Heroes").database_id == "11"
+    assert len(reads) == 3
+
+
+def test_remove_playlist_entries_deletes_last_first(monkeypatch):
+    captured = {}
+
+    def fake_run_applescript(script, args=None):
+        captured["args"] = args
+        return "2", "", 0
+
+    monkeypatch.setattr(library, "run_applescript", fake_run_applescript)
+
+    extras = [
+        library.TrackInfo(3, "30", "A", "", "", 0),
+        library.TrackInfo(7, "70", "B", "", "", 0),
+    ]
+    success, message = library.remove_playlist_entries("Road Trip", extras)
+
+    assert success is True
+    assert "Removed 2" in message
+    assert captured["args"] == ["Road Trip", "7", "70", "3", "30"]
+
+
+def test_dedupe_remove_non_interactive_requires_yes(monkeypatch):
+    tracks = [
+        library.TrackInfo(1, "1", "Heroes", "David Bowie", "Heroes", 371.0),
+        library.TrackInfo(2, "2", "Heroes", "David Bowie", "Heroes", 371.0),
+    ]
+    monkeypatch.setattr(library, "fetch_tracks", lambda playlist_name: (tracks, ""))
+
+    result = CliRunner().invoke(
+        cli, ["-N", "dedupe", "--playlist", "Road Trip", "--remove"]
+    )
+
+    assert result.exit_code == 1
+    assert "--yes is required" in result.stderr
@@ -1,6 +1,13 @@
 """Tests for playback helpers."""
 
 from clawtunes_helpers import playback
+from clawtunes_helpers.applescript import FIELD_SEP, GROUP_SEP, RECORD_SEP
+from clawtunes_helpers.status import NowPlaying
+
+
+def _columns(*columns):
+    """Format columns the way the bulk search scripts return them."""
+    return GROUP_SEP.join(RECORD_SEP.join(column) for column in columns)
 
 
 def test_search_songs_uses_args_and_parses(monkeypatch):
@@ -9,57 +16,112 @@ def test_search_songs_uses_args_and_parses(monkeypatch):
     def fake_run_applescript(script, args=None):
         captured["script"] = script
         captured["args"] = args
-        stdout = "1|Song A|Artist A|Album A\n2|Song B|Artist B|Album B\n"
+        stdout = _columns(
+            ["1", "2"],
+            ["0", "0"],
+            ["0", "0"],
+            ["", ""],
+            ["Artist A", "Artist B"],
+            ["Album A", "Album B"],
+            ["Song A", "Song B"],
+        )
         return stdout, "", 0
 
     monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
 
-    results = playback.search_songs("Bohemian Rhapsody", limit=5)
+    results = playback.search_songs("Song", limit=5)
 
     assert "on run argv" in captured["script"]
-    assert captured["args"] == ["Bohemian Rhapsody", "5"]
+    assert captured["args"] == ["Song"]
     assert results == [
         ("1", "Song A - Artist A (Album A)"),
         ("2", "Song B - Artist B (Album B)"),
     ]
 
 
-def test_search_albums_passes_limit(monkeypatch):
+def test_search_songs_ranks_before_limiting(monkeypatch):
+    stdout = _columns(
+        ["1", "2", "3", "4"],
+        ["100", "0", "0", "40"],
+        ["50", "3", "9", "0"],
+        ["60", "", "3600", "10"],
+        ["A", "B", "C", "D"],
+        ["X", "Y", "Z", "W"],
+        ["Lovesong", "I Love You", "Love", "Love"],
+    )
+    monkeypatch.setattr(playback, "run_applescript", lambda *a, **k: (stdout, "", 0))
+
+    results = playback.search_songs("love", limit=3)
+
+    assert [track_id for track_id, _ in results] == ["4", "3", "1"]
+
+
+def test_first_plays_exact_match_without_reading_every_match(monkeypatch):
+    calls = []
+
+    def fake_run_applescript(script, args=None):
+        calls.append(args)
+        first = int(args[1])
+        names = ["Lovesong", "Love", "Love"] if first == 1 else ["I Love You"]
+        ids = [str(i) for i in range(first, first + len(names))]
+        ratings = ["0", "0", "60"] if first == 1 else ["100"]
+        empty = [""] * len(names)
+        return _columns(ids, ratings, empty, empty, empty, empty, names, ["4"]), "", 0
+
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+    monkeypatch.setattr(playback, "STREAM_CHUNK_SIZE", 3)
+    monkeypatch.setattr(playback, "is_first", lambda: True)
+
+    assert playback._songs_to_pick("love") == [("3", "Love -  ()")]
+    assert calls == [["love", "1", "3"]]
+
+    calls.clear()
+    assert playback._songs_to_pick("you") == [("4", "I Love You -  ()")]
+    assert calls == [["you", "1", "3"], ["you", "4", "4"]]
+
+
+def test_search_albums_ranks_aggregated_albums(monkeypatch):
     captured = {}
 
     def fake_run_applescript(script, args=None):
         captured["script"] = script
         captured["args"] = args
-        stdout = "Album A|Artist A\nAlbum B|Artist B\n"
+        stdout = _columns(
+            ["Greatest Hits", "Hits", "Hits", "Big Hits"],
+            ["0", "0", "80", "0"],
+            ["7", "1", "2", "0"],
+            ["", "", "30", ""],
+            ["Queen", "Various", "Various", "Other"],
+        )
         return stdout, "", 0
 
     monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
 
-    results = playback.search_albums("Hits", limit=3)
+    results = playback.search_albums("Hits", limit=2)
 
     assert "on run argv" in captured["script"]
-    assert captured["args"] == ["Hits", "3"]
+    assert captured["args"] == ["Hits"]
     assert results == [
-        ("Album A", "Album A - Artist A"),
-        ("Album B", "Album B - Artist B"),
+        ("Hits", "Hits - Various"),
+        ("Greatest Hits", "Greatest Hits - Queen"),
     ]
 
 
-def test_search_playlists_unlimited_uses_zero_limit(monkeypatch):
+def test_search_playlists_ranks_and_limits_in_python(monkeypatch):
     captured = {}
 
     def fake_run_applescript(script, args=None):
         captured["script"] = script
         captured["args"] = args
-        stdout = "Chill Vibes|12\n"
+        stdout = _columns(["My Chill Vibes", "Chill Vibes"], ["3", "12"])
         return stdout, "", 0
 
     monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
 
-    results = playback.search_playlists("Chill Vibes")
+    results = playback.search_playlists("Chill Vibes", limit=1)
 
     assert "on run argv" in captured["script"]
-    assert captured["args"] == ["Chill Vibes", "0"]
+    assert captured["args"] == ["Chill Vibes"]
     assert results == [("Chill Vibes", "Chill Vibes (12 tracks)")]
 
 
@@ -198,3 +260,16 @@ def test_search_songs_in_playlist(monkeypatch):
         ("1", "Song A - Artist A (Album A)"),
         ("2", "Song B - Artist B (Album B)"),
     ]
+
+
+def test_play_track_by_id_records_started_track(monkeypatch):
+    recorded = []
+
+    def fake_run_applescript(script, args=None):
+        return FIELD_SEP.join(["Song A", "Artist A", "Album A", "200,5"]), "", 0
+
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+    monkeypatch.setattr(playback.history, "observe_track", recorded.append)
+
+    assert playback.play_track_by_id("42")
+    assert recorded == [NowPlaying("Song A", "Artist A", "Album A", 200.5, 0.0)]
@@ -0,0 +1,25 @@
+"""Tests for relevance ranking of library matches."""
+
+from clawtunes_helpers import ranking
+from clawtunes_helpers.ranking import Match
+
+
+def test_name_score_prefers_exact_then_prefix_then_word():
+    assert ranking.name_score("love", "Love") == 3
+    assert ranking.name_score("love", "Lovesong") == 2
+    assert ranking.name_score("love", "Crazy Little Thing Called Love") == 1
+    assert ranking.name_score("love", "Glove") == 0
+
+
+def test_rank_breaks_ties_by_rating_plays_and_recency_stably():
+    matches = [
+        Match("1", "a", "Love", play_count=5),
+        Match("2", "b", "Love", play_count=5, played_ago=60),
+        Match("3", "c", "Love", rating=20),
+        Match("4", "d", "Glove", rating=100),
+        Match("5", "e", "Love", play_count=5),
+    ]
+
+    ranked = ranking.rank("love", matches)
+
+    assert [match.item_id for match in ranked] == ["3", "2", "1", "5", "4"]
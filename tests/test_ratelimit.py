@@ -0,0 +1,30 @@
+"""Tests for the token bucket shared by processes."""
+
+import pytest
+
+from clawtunes_helpers import ratelimit
+
+
+def test_bucket_allows_a_burst_then_the_steady_rate():
+    bucket = ratelimit.TokenBucket("test", rate=2.0, burst=2.0)
+
+    assert bucket.try_acquire(now=100.0) == 0
+    assert bucket.try_acquire(now=100.0) == 0
+    assert bucket.try_acquire(now=100.0) == 0.5
+    assert bucket.try_acquire(now=100.5) == 0
+
+
+def test_pause_applies_to_every_process():
+    ratelimit.TokenBucket("test", rate=10.0, burst=5.0).pause(3.0, now=100.0)
+    # A bucket with the same name elsewhere shares the state on disk.
+    other = ratelimit.TokenBucket("test", rate=10.0, burst=5.0)
+
+    assert other.try_acquire(now=101.0) == pytest.approx(2.0)
+    assert other.try_acquire(now=103.5) == 0
+
+
+def test_catalog_rate_of_zero_disables_limiting(monkeypatch):
+    monkeypatch.setenv("CLAWTUNES_CATALOG_RATE", "0")
+    bucket = ratelimit.catalog_bucket()
+
+    assert all(bucket.try_acquire() == 0 for _ in range(100))
@@ -0,0 +1,145 @@
+"""Tests for the AppleScript call scheduler."""
+
+import threading
+import time
+
+from clawtunes_helpers import playback, scheduler, transport
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_identical_reads_share_one_call():
+    calls = []
+    release = threading.Event()
+
+    @scheduler.coalesce
+    def read(name):
+        calls.append(name)
+        release.wait(5)
+        return f"value of {name}"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(read("volume")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: calls)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["volume"]
+    assert results == ["value of volume"] * 5
+    assert read("volume") == "value of volume"
+    assert calls == ["volume", "volume"]
+
+
+def test_queued_volume_changes_keep_only_the_last(monkeypatch):
+    scripts = []
+    release = threading.Event()
+
+    def fake_run_applescript(script, args=None):
+        scripts.append(script)
+        return "", "", 0
+
+    started = threading.Event()
+
+    @scheduler.serialized
+    def slow_write():
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+    blocker = threading.Thread(target=slow_write)
+    blocker.start()
+    assert started.wait(5)
+
+    results = []
+    threads = []
+    for level in range(10):
+        arrivals = scheduler._writes.arrivals()
+        thread = threading.Thread(
+            target=lambda level=level: results.append(playback.set_volume(level))
+        )
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda n=arrivals: scheduler._writes.arrivals() > n)
+
+    release.set()
+    for thread in threads + [blocker]:
+        thread.join()
+
+    assert len(scripts) == 1
+    assert "set sound volume to 9" in scripts[0]
+    assert results == [None] * 10
+
+
+def test_writes_run_one_at_a_time_in_order():
+    order = []
+    running = []
+
+    @scheduler.serialized
+    def write(n):
+        running.append(n)
+        assert len(running) == 1
+        time.sleep(0.01)
+        order.append(n)
+        running.remove(n)
+
+    threads = []
+    for n in range(5):
+        arrivals = scheduler._writes.arrivals()
+        thread = threading.Thread(target=write, args=(n,))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda n=arrivals: scheduler._writes.arrivals() > n)
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_mute_is_not_superseded_by_a_volume_change_queued_meanwhile(
+    monkeypatch, tmp_path
+):
+    scripts = []
+    in_mute = threading.Event()
+    queued = threading.Event()
+
+    def fake_run_applescript(script, args=None):
+        scripts.append(script)
+        if script == transport.GET_VOLUME_SCRIPT:
+            in_mute.set()
+            assert queued.wait(5)
+            return "40|false", "", 0
+        return "", "", 0
+
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+    monkeypatch.setattr(playback, "_mute_state_path", lambda: tmp_path / "mute")
+    results = {}
+    muter = threading.Thread(target=lambda: results.update(mute=playback.mute()))
+    muter.start()
+    assert in_mute.wait(5)
+    arrivals = scheduler._writes.arrivals()
+    setter = threading.Thread(
+        target=lambda: results.update(volume=playback.set_volume(70))
+    )
+    setter.start()
+    _wait_for(lambda: scheduler._writes.arrivals() > arrivals)
+    queued.set()
+    muter.join(5)
+    setter.join(5)
+
+    assert not muter.is_alive() and not setter.is_alive()
+    assert results == {"mute": None, "volume": None}
+    volume_scripts = [s for s in scripts if "set sound volume" in s]
+    assert ["to 0" in s for s in volume_scripts] == [True, False]
+    assert "set sound volume to 70" in volume_scripts[1]
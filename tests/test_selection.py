@@ -0,0 +1,103 @@
+"""Tests for the interactive selection helpers."""
+
+import click
+from click.testing import CliRunner
+
+from clawtunes_helpers import selection
+
+ITEMS = [
+    (f"id{i}", f"Song {i} - {'Queen' if i % 10 == 0 else 'Other'}")
+    for i in range(1, 101)
+]
+
+
+def _select(args, input=None):
+    @click.command()
+    @click.option("-N", "non_interactive", is_flag=True)
+    @click.option("-1", "first", is_flag=True)
+    @click.pass_context
+    def pick(ctx, non_interactive, first):
+        ctx.obj = {"non_interactive": non_interactive, "first": first}
+        click.echo(f"selected={selection.select_item(ITEMS, 'Select a song')}")
+
+    return CliRunner().invoke(pick, args, input=input)
+
+
+def test_picker_shows_one_page_and_pages_on():
+    result = _select([], input="n\n25\n")
+
+    assert "  20. Song 20" in result.output
+    assert "(1-20 of 100)" in result.output
+    assert "(21-40 of 100)" in result.output
+    assert "  41. Song 41" not in result.output
+    assert "selected=id25" in result.output
+
+
+def test_picker_filters_incrementally_and_keeps_numbers():
+    result = _select([], input="queen\nqueen song 5\n50\n")
+
+    assert "(1-10 of 10 matching 'queen')" in result.output
+    assert "(1-1 of 1 matching 'queen song 5')" in result.output
+    assert "  50. Song 50 - Queen" in result.output
+    assert "selected=id50" in result.output
+
+
+def test_picker_keeps_filter_when_nothing_matches():
+    result = _select([], input="queen\nabba\n\n7\n")
+
+    assert "Nothing matches 'abba'" in result.output
+    assert result.output.count("(1-20 of 100)") == 2
+    assert "selected=id7" in result.output
+
+
+def test_picker_filters_by_numbers_and_rejects_missing_pages():
+    result = _select([], input="p\n/10\nn\n100\n")
+
+    assert "No previous page" in result.output
+    assert "(1-2 of 2 matching '10')" in result.output
+    assert "No next page" in result.output
+    assert "selected=id100" in result.output
+
+
+def test_picker_treats_numbers_out_of_range_as_filters():
+    result = _select([], input="1000\n5\n")
+
+    assert "Nothing matches '1000'" in result.output
+    assert "selected=id5" in result.output
+
+
+def test_non_interactive_lists_everything_and_first_picks_first():
+    listed = _select(["-N"])
+    first = _select(["-1"])
+
+    assert "  100. Song 100 - Queen" in listed.output
+    assert "selected=None" in listed.output
+    assert first.output == "selected=id1\n"
+
+
+def test_chunks_are_listed_and_picked_as_they_arrive():
+    def run(args):
+        @click.command()
+        @click.option("-N", "non_interactive", is_flag=True)
+        @click.option("-1", "first", is_flag=True)
+        @click.pass_context
+        def pick(ctx, non_interactive, first):
+            ctx.obj = {"non_interactive": non_interactive, "first": first}
+
+            def chunks():
+                for start in (0, 25):
+                    click.echo(f"reading from {start + 1}")
+                    yield ITEMS[start : start + 25]
+
+            click.echo(f"selected={selection.select_from_chunks(chunks(), 'Pick')}")
+
+        return CliRunner().invoke(pick, args).output
+
+    listed = run(["-N"])
+    first = run(["-1"])
+
+    assert listed.index("  25. Song 25") < listed.index("reading from 26")
+    assert "  50. Song 50" in listed
+    assert "selected=None" in listed
+    assert "reading from 26" not in first
+    assert "selected=('id1', 'Song 1 - Other')" in first
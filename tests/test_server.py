@@ -0,0 +1,152 @@
+"""Tests for the local HTTP API."""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from clawtunes import server
+from clawtunes_helpers import playback, status
+
+
+@pytest.fixture
+def api(monkeypatch):
+    def start(token=None):
+        httpd = server.create_server("127.0.0.1", 0, token=token)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        started.append(httpd)
+        return http.client.HTTPConnection("127.0.0.1", httpd.server_address[1])
+
+    started: list = []
+    yield start
+    for httpd in started:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _request(conn, method, path, body=None, headers=None):
+    payload = json.dumps(body) if body is not None else None
+    conn.request(method, path, body=payload, headers=headers or {})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_status_and_volume_share_one_connection(api, monkeypatch):
+    track = status.NowPlaying("Song", "Artist", "Album", 200.0, 12.0)
+    player_status = status.PlayerStatus("playing", 40, False, False, "off", track)
+    volume_writes = []
+    monkeypatch.setattr(status, "get_player_status_cached", lambda: player_status)
+    monkeypatch.setattr(playback, "get_volume", lambda: (40, False))
+    monkeypatch.setattr(
+        playback, "set_volume", lambda level: volume_writes.append(level)
+    )
+    conn = api()
+
+    code, body = _request(conn, "GET", "/status")
+    assert code == 200
+    assert body["track"]["name"] == "Song"
+
+    code, body = _request(conn, "POST", "/volume", {"delta": 70})
+    assert code == 200
+    assert body == {"volume": 100}
+    assert volume_writes == [100]
+
+
+def test_unknown_endpoint_and_bad_request(api):
+    conn = api()
+
+    code, body = _request(conn, "GET", "/nope")
+    assert code == 404
+    assert "error" in body
+
+    code, body = _request(conn, "POST", "/volume", {"level": "loud"})
+    assert code == 400
+
+
+def test_token_is_required_when_configured(api, monkeypatch):
+    monkeypatch.setattr(playback, "pause", lambda: None)
+    conn = api(token="secret")
+
+    code, _ = _request(conn, "POST", "/pause")
+    assert code == 401
+
+    code, body = _request(
+        conn, "POST", "/pause", headers={"Authorization": "Bearer secret"}
+    )
+    assert code == 200
+    assert body == {"ok": True}
+
+
+def test_bad_content_length_and_unauthorized_body_get_responses(api):
+    conn = api(token="secret")
+
+    headers = {"Authorization": "Bearer secret", "Content-Length": "lots"}
+    conn.request("POST", "/volume", headers=headers)
+    response = conn.getresponse()
+    assert response.status == 400
+    assert "Content-Length" in json.loads(response.read())["error"]
+
+    # Rejected before the body is read; the connection is closed instead.
+    conn.request("POST", "/volume", body=b"x" * 100_000)
+    response = conn.getresponse()
+    assert response.status == 401
+    assert response.getheader("Connection") == "close"
+
+
+def _next_event(response):
+    while True:
+        line = response.fp.readline().decode()
+        if line.startswith("data: "):
+            return json.loads(line.removeprefix("data: "))
+
+
+def test_writes_are_pushed_to_event_streams_at_once(api, monkeypatch):
+    state = {"player": "paused"}
+    monkeypatch.setattr(
+        status,
+        "get_player_status",
+        lambda: status.PlayerStatus(state["player"], 40, False, False, "off", None),
+    )
+    monkeypatch.setattr(playback, "resume", lambda: state.update(player="playing"))
+    events = api()
+    events.connect()
+    events.sock.settimeout(3)
+    events.request("GET", "/events")
+    stream = events.getresponse()
+
+    assert _next_event(stream)["state"] == "paused"
+    control = http.client.HTTPConnection(events.host, events.port)
+    code, _ = _request(control, "POST", "/resume")
+    # Well before the next poll, which is 10 seconds away while paused.
+    assert code == 200
+    assert _next_event(stream)["state"] == "playing"
+
+
+def test_event_stream_survives_a_failing_watcher(api, monkeypatch):
+    calls = []
+
+    def flaky_status():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("Music quit")
+        return status.PlayerStatus("stopped", 40, False, False, "off", None)
+
+    monkeypatch.setattr(status, "get_player_status", flaky_status)
+    monkeypatch.setattr(server.StatusBroadcaster, "RESTART_DELAY", 0.01)
+    events = api()
+    events.connect()
+    events.sock.settimeout(3)
+    events.request("GET", "/events")
+    stream = events.getresponse()
+
+    assert _next_event(stream)["state"] == "unknown"
+    assert _next_event(stream)["state"] == "stopped"
+
+
+def test_volume_rejects_booleans(api):
+    conn = api()
+
+    assert _request(conn, "POST", "/volume", {"level": True})[0] == 400
+    assert _request(conn, "POST", "/volume", {"delta": False})[0] == 400
@@ -0,0 +1,75 @@
+"""Tests for the interactive shell."""
+
+import pytest
+from click.testing import CliRunner
+
+from clawtunes.cli import cli
+from clawtunes_helpers import playback, session
+from clawtunes_helpers.applescript import GROUP_SEP, RECORD_SEP
+
+
+@pytest.fixture(autouse=True)
+def reset_session(monkeypatch):
+    monkeypatch.setattr(session, "_enabled", False)
+    yield
+    session.invalidate()
+    session._results.clear()
+
+
+def _columns(*columns):
+    return GROUP_SEP.join(RECORD_SEP.join(column) for column in columns)
+
+
+def test_shell_reuses_searches_and_plays_by_number(monkeypatch):
+    scripts = []
+
+    def fake_run_applescript(script, args=None):
+        scripts.append(script)
+        if "whose name contains" in script:
+            return (
+                _columns(
+                    ["11", "22"],
+                    ["0", "0"],
+                    ["0", "0"],
+                    ["", ""],
+                    ["Artist", "Other"],
+                    ["Album", "Record"],
+                    ["Love Song", "Lovely"],
+                ),
+                "",
+                0,
+            )
+        return "", "", 0
+
+    played = []
+    monkeypatch.setattr(playback, "run_applescript", fake_run_applescript)
+    monkeypatch.setattr(playback, "play_track_by_id", played.append)
+    commands = "search love --no-albums\nsearch love --no-albums\nplay 2\nexit\n"
+
+    result = CliRunner().invoke(cli, ["shell"], input=commands)
+
+    assert result.exit_code == 0
+    assert "1. Love Song - Artist (Album)" in result.output
+    assert "2. Lovely - Other (Record)" in result.output
+    assert "Playing: Lovely - Other (Record)" in result.output
+    assert played == ["22"]
+    assert len(scripts) == 1
+
+
+def test_shell_reports_unknown_number():
+    result = CliRunner().invoke(cli, ["shell"], input="play 5\n")
+
+    assert result.exit_code == 0
+    assert "No result 5" in result.output
+
+
+def test_search_output_is_not_numbered_outside_shell(monkeypatch):
+    stdout = _columns(["11"], ["0"], ["0"], [""], ["B"], ["C"], ["A"])
+    monkeypatch.setattr(
+        playback, "run_applescript", lambda script, args=None: (stdout, "", 0)
+    )
+
+    result = CliRunner().invoke(cli, ["search", "a", "--no-albums"])
+
+    assert "  A - B (C)" in result.output
+    assert "1." not in result.output
@@ -0,0 +1,122 @@
+"""Tests for status helpers."""
+
+from clawtunes_helpers import status
+from clawtunes_helpers.applescript import FIELD_SEP
+
+
+def _status(position=10.0, duration=200.0, player_state="playing"):
+    track = status.NowPlaying("Song", "Artist", "Album", duration, position)
+    return status.PlayerStatus(player_state, 50, False, False, "off", track)
+
+
+def test_parse_now_playing_allows_pipe_in_names():
+    stdout = FIELD_SEP.join(["Either | Or", "Artist", "Album", "200,5", "12"])
+
+    now_playing = status.parse_now_playing(stdout, 0)
+
+    assert now_playing == status.NowPlaying(
+        "Either | Or", "Artist", "Album", 200.5, 12.0
+    )
+
+
+def test_get_player_status_single_call(monkeypatch):
+    calls = []
+
+    def fake_run_applescript(script, args=None):
+        calls.append(script)
+        fields = ["playing", "35", "false", "true", "all", "true"]
+        fields += ["Song", "Artist", "", "200.5", "12.25", "true", "false"]
+        return FIELD_SEP.join(fields), "", 0
+
+    monkeypatch.setattr(status, "run_applescript", fake_run_applescript)
+
+    player_status = status.get_player_status()
+
+    assert len(calls) == 1
+    assert player_status == status.PlayerStatus(
+        player_state="playing",
+        volume=35,
+        muted=False,
+        shuffle=True,
+        repeat="all",
+        now_playing=status.NowPlaying("Song", "Artist", "", 200.5, 12.25),
+        favorited=True,
+        disliked=False,
+    )
+
+
+def test_parse_player_status_without_track():
+    fields = ["stopped", "80", "false", "false", "off", "false"]
+    fields += ["", "", "", "0", "0", "false", "false"]
+
+    player_status = status.parse_player_status(FIELD_SEP.join(fields), 0)
+
+    assert player_status is not None
+    assert player_status.now_playing is None
+    assert player_status.to_dict()["track"] is None
+
+
+def test_sample_interpolates_position_while_playing():
+    sample = status.StatusSample(_status(position=10.0), taken_at=100.0)
+
+    assert sample.at(104.5).now_playing.position == 14.5
+    assert sample.at(1000.0).now_playing.position == 200.0
+
+
+def test_sample_keeps_position_while_paused():
+    sample = status.StatusSample(_status(player_state="paused"), taken_at=100.0)
+
+    assert sample.at(150.0).now_playing.position == 10.0
+    assert sample.next_poll_at() == 100.0 + status.IDLE_POLL_INTERVAL
+
+
+def test_sample_polls_near_track_end():
+    sample = status.StatusSample(_status(position=195.0), taken_at=100.0)
+
+    assert sample.next_poll_at() == 100.0 + 5.0 + status.TRACK_END_MARGIN
+
+
+def test_watch_only_polls_on_schedule(monkeypatch):
+    polls = []
+    now = [0.0]
+
+    def fake_player_status():
+        polls.append(now[0])
+        return _status(position=0.0, duration=60.0)
+
+    def fake_sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(status, "get_player_status", fake_player_status)
+
+    watcher = status.watch(clock=lambda: now[0], sleep=fake_sleep)
+    positions = [int(next(watcher).now_playing.position) for _ in range(31)]
+
+    assert positions[:3] == [0, 1, 2]
+    assert positions[15] == 0
+    assert polls == [0.0, 15.0, 30.0]
+
+
+def test_cached_status_is_shared_and_extrapolated(monkeypatch):
+    calls = []
+    now = [1000.0]
+
+    def fake_player_status():
+        calls.append(now[0])
+        return _status(position=10.0)
+
+    monkeypatch.setattr(status, "get_player_status", fake_player_status)
+    monkeypatch.setattr(status.time, "time", lambda: now[0])
+
+    assert status.get_player_status_cached(ttl=0.5).now_playing.position == 10.0
+    now[0] += 0.25
+    assert status.get_player_status_cached(ttl=0.5).now_playing.position == 10.25
+    assert calls == [1000.0]
+
+    now[0] += 0.5
+    status.get_player_status_cached(ttl=0.5)
+    assert calls == [1000.0, 1000.75]
+
+    status.invalidate_status_cache()
+    status.get_player_status_cached(ttl=0.5)
+    assert len(calls) == 3